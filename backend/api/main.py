@@ -7,8 +7,12 @@ This module provides REST API endpoints for:
 - Health checks
 - Statistics
 """
+import threading
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
 from pydantic import BaseModel
 from typing import Dict, List, Any, Optional
 from loguru import logger
@@ -22,6 +26,7 @@ app = FastAPI(
     title="Kitakyu Facility Search API",
     description="AI-powered facility search for Kitakyushu disability welfare services",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Include routers
@@ -150,6 +155,35 @@ async def search_facilities(request: SearchRequest):
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 
+@app.post("/search/stream")
+async def search_facilities_stream(request: SearchRequest):
+    """
+    Search facilities and stream the generated answer.
+
+    The response is newline-delimited JSON: one "result" frame with
+    facilities and metadata, then "token" frames with answer fragments.
+
+    Args:
+        request: SearchRequest with query string
+
+    Returns:
+        StreamingResponse of NDJSON frames
+    """
+    logger.info(f"Streaming search request: {request.query}")
+
+    pipeline = get_rag_pipeline()
+
+    def frames():
+        try:
+            for frame in pipeline.search_stream(request.query):
+                yield orjson.dumps(frame) + b"\n"
+        except Exception as e:
+            logger.error(f"Streaming search failed: {e}")
+            yield orjson.dumps({"type": "error", "detail": f"Search failed: {str(e)}"}) + b"\n"
+
+    return StreamingResponse(frames(), media_type="application/x-ndjson")
+
+
 @app.get("/stats", response_model=StatsResponse)
 async def get_statistics():
     """Get database statistics."""
@@ -224,6 +258,26 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Neo4j connection failed: {e}")
 
+    # 論理削除フラグの正規化とインデックス作成（利用者検索の前提）
+    try:
+        from backend.services.user_service import get_user_service
+
+        get_user_service().ensure_deleted_flag()
+    except Exception as e:
+        logger.error(f"Deleted-flag normalization failed: {e}")
+
+    # 利用者詳細の初回表示に備え、ページキャッシュをバックグラウンドで温める
+    try:
+        from backend.services.user_detail_service import get_user_detail_service
+
+        threading.Thread(
+            target=get_user_detail_service().warm_page_cache,
+            name="neo4j-warmup",
+            daemon=True,
+        ).start()
+    except Exception as e:
+        logger.error(f"Neo4j page cache warm-up could not be started: {e}")
+
     try:
         from backend.llm.ollama_client import get_ollama_client
 
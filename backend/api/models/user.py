@@ -40,6 +40,20 @@ class UserCreate(UserBase):
     pass
 
 
+class UserBatchCreate(BaseModel):
+    """Model for creating multiple users at once."""
+
+    users: List[UserCreate] = Field(..., description="作成する利用者一覧", min_length=1)
+
+
+class UserDetailBatchRequest(BaseModel):
+    """Model for fetching details of multiple users at once."""
+
+    user_ids: List[str] = Field(
+        ..., description="詳細を取得する利用者ID一覧", min_length=1, max_length=50
+    )
+
+
 class UserUpdate(BaseModel):
     """Model for updating existing user (all fields optional)."""
 
@@ -108,7 +122,7 @@ class UserList(BaseModel):
     """Model for user list response."""
 
     users: List[User]
-    total: int = Field(..., description="総件数")
+    total: Optional[int] = Field(None, description="総件数（include_total=false の場合は None）")
     page: int = Field(1, description="現在のページ")
     page_size: int = Field(20, description="ページサイズ")
 
@@ -2,17 +2,20 @@
 """
 User management API routes.
 """
-from typing import Optional
+from datetime import date
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Query
 from loguru import logger
 
 from backend.api.models.user import (
     User,
     UserCreate,
+    UserBatchCreate,
     UserUpdate,
     UserList,
     UserFilter,
     UserDeleteResponse,
+    UserDetailBatchRequest,
 )
 from backend.services.user_service import get_user_service
 from backend.services.assessment_service import get_assessment_service
@@ -41,6 +44,26 @@ async def create_user(user_data: UserCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/batch", response_model=List[User], status_code=201)
+async def create_users(batch: UserBatchCreate):
+    """
+    Create multiple users in bulk.
+
+    Args:
+        batch: Users to create
+
+    Returns:
+        Created users
+    """
+    try:
+        service = get_user_service()
+        users = service.create_users([user.model_dump() for user in batch.users])
+        return users
+    except Exception as e:
+        logger.error(f"Error creating users in bulk: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("", response_model=UserList)
 async def list_users(
     page: int = Query(1, ge=1, description="ページ番号"),
@@ -51,6 +74,7 @@ async def list_users(
     age_max: Optional[int] = Query(None, le=120, description="最大年齢"),
     living_situation: Optional[str] = Query(None, description="居住状況フィルター"),
     search_query: Optional[str] = Query(None, description="名前・カナ検索"),
+    include_total: bool = Query(True, description="総件数を含める（不要な場合は false で集計を省略）"),
 ):
     """
     List users with pagination and filtering.
@@ -64,6 +88,7 @@ async def list_users(
         age_max: Maximum age
         living_situation: Filter by living situation
         search_query: Search by name or kana
+        include_total: Whether to compute the total count
 
     Returns:
         List of users with pagination
@@ -85,13 +110,50 @@ async def list_users(
         if search_query:
             filters["search_query"] = search_query
 
-        result = service.list_users(page=page, page_size=page_size, filters=filters)
+        result = service.list_users(
+            page=page,
+            page_size=page_size,
+            filters=filters,
+            include_total=include_total,
+        )
         return result
     except Exception as e:
         logger.error(f"Error listing users: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/lookup", response_model=User)
+async def lookup_user(
+    name: str = Query(..., min_length=1, description="氏名"),
+    birth_date: date = Query(..., description="生年月日"),
+    exclude_user_id: Optional[str] = Query(None, description="除外するユーザーID"),
+):
+    """
+    Find a user by name and birth date (duplicate check).
+
+    Args:
+        name: User name
+        birth_date: Birth date
+        exclude_user_id: User ID to exclude (e.g. the user being edited)
+
+    Returns:
+        Matching user
+    """
+    try:
+        service = get_user_service()
+        user = service.find_user(name, birth_date, exclude_user_id=exclude_user_id)
+
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        return user
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error looking up user {name}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{user_id}", response_model=User)
 async def get_user(user_id: str):
     """
@@ -208,13 +270,38 @@ async def get_user_detail(user_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/detail_batch")
+async def get_user_details(request: UserDetailBatchRequest):
+    """
+    Get comprehensive details for multiple users in one request.
+
+    Args:
+        request: User IDs to fetch
+
+    Returns:
+        Dict of user ID to user detail (unknown IDs are omitted)
+    """
+    try:
+        service = get_user_detail_service()
+        return service.get_user_details(request.user_ids)
+    except Exception as e:
+        logger.error(f"Error getting user details for {request.user_ids}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{user_id}/assessments")
-async def list_user_assessments(user_id: str):
+async def list_user_assessments(
+    user_id: str,
+    content_preview: Optional[int] = Query(
+        None, ge=1, description="interview_content を先頭から指定文字数に切り詰める"
+    ),
+):
     """
     Get all assessments for a user.
 
     Args:
         user_id: User ID
+        content_preview: Truncate interview_content to this many characters
 
     Returns:
         List of assessments
@@ -229,7 +316,9 @@ async def list_user_assessments(user_id: str):
 
         # Get assessments
         assessment_service = get_assessment_service()
-        assessments = assessment_service.list_user_assessments(user_id)
+        assessments = assessment_service.list_user_assessments(
+            user_id, content_preview=content_preview
+        )
 
         return assessments
     except HTTPException:
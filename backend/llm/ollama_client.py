@@ -1,6 +1,7 @@
 """
 Ollama client for local LLM inference.
 """
+import json
 from typing import Dict, List, Optional, Any, Iterator
 import httpx
 from loguru import logger
@@ -94,6 +95,61 @@ class OllamaClient:
             logger.error(f"Ollama generation failed: {e}")
             raise
 
+    def generate_stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Iterator[str]:
+        """
+        Generate text using Ollama, yielding fragments as they are produced.
+
+        Args:
+            prompt: User prompt
+            system: System prompt (optional)
+            temperature: Temperature for generation (optional)
+            max_tokens: Max tokens to generate (optional)
+
+        Yields:
+            Generated text fragments
+        """
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": True,
+            "options": {
+                "temperature": temperature or settings.ollama_temperature,
+                "num_predict": max_tokens or settings.ollama_max_tokens,
+            },
+        }
+
+        if system:
+            payload["system"] = system
+
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                with client.stream(
+                    "POST", f"{self.base_url}/api/generate", json=payload
+                ) as response:
+                    response.raise_for_status()
+                    # Ollama streams newline-delimited JSON objects
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        if text := chunk.get("response"):
+                            yield text
+                        if chunk.get("done"):
+                            break
+
+        except httpx.TimeoutException:
+            logger.error(f"Ollama stream timed out after {self.timeout}s")
+            raise
+        except Exception as e:
+            logger.error(f"Ollama stream generation failed: {e}")
+            raise
+
     def chat(
         self,
         messages: List[Dict[str, str]],
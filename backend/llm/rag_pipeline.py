@@ -7,13 +7,16 @@ This module combines:
 3. Context construction
 4. Answer generation using LLM
 """
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 from loguru import logger
 
 from backend.llm.ollama_client import get_ollama_client
 from backend.neo4j.client import get_neo4j_client
 
 
+NO_RESULTS_ANSWER = "申し訳ございません。該当する事業所が見つかりませんでした。検索条件を変えて再度お試しください。"
+
+
 class RAGPipeline:
     """RAG pipeline for natural language facility search."""
 
@@ -54,6 +57,35 @@ class RAGPipeline:
             "facility_count": len(facilities),
         }
 
+    def search_stream(self, user_query: str) -> Iterator[Dict[str, Any]]:
+        """
+        Execute RAG search pipeline, streaming the generated answer.
+
+        Args:
+            user_query: User's natural language question
+
+        Yields:
+            A "result" frame with facilities and metadata, followed by
+            "token" frames carrying answer fragments as they are generated
+        """
+        logger.info(f"Starting streaming RAG search for query: {user_query}")
+
+        search_params = self._analyze_query(user_query)
+        facilities = self._search_facilities(search_params)
+        logger.info(f"Found {len(facilities)} facilities")
+
+        # Facilities are known before generation starts, so send them first
+        yield {
+            "type": "result",
+            "query": user_query,
+            "facilities": facilities,
+            "search_params": search_params,
+            "facility_count": len(facilities),
+        }
+
+        for token in self._generate_answer_stream(user_query, facilities):
+            yield {"type": "token", "token": token}
+
     def _analyze_query(self, user_query: str) -> Dict[str, Any]:
         """
         Analyze user query to extract search parameters.
@@ -243,8 +275,67 @@ JSON形式のみで返答し、説明文は含めないでください。"""
             Natural language answer
         """
         if not facilities:
-            return "申し訳ございません。該当する事業所が見つかりませんでした。検索条件を変えて再度お試しください。"
+            return NO_RESULTS_ANSWER
 
+        system_prompt, prompt = self._build_answer_prompt(user_query, facilities)
+
+        try:
+            answer = self.llm.generate(
+                prompt=prompt, system=system_prompt, temperature=0.3, max_tokens=1024
+            )
+            return answer
+
+        except Exception as e:
+            logger.error(f"Answer generation failed: {e}")
+            # Fallback to basic facility list
+            return self._format_basic_list(facilities)
+
+    def _generate_answer_stream(
+        self, user_query: str, facilities: List[Dict[str, Any]]
+    ) -> Iterator[str]:
+        """
+        Generate answer like _generate_answer, yielding fragments as they arrive.
+
+        Args:
+            user_query: Original user question
+            facilities: Retrieved facilities from Neo4j
+
+        Yields:
+            Answer text fragments
+        """
+        if not facilities:
+            yield NO_RESULTS_ANSWER
+            return
+
+        system_prompt, prompt = self._build_answer_prompt(user_query, facilities)
+
+        emitted = False
+        try:
+            for token in self.llm.generate_stream(
+                prompt=prompt, system=system_prompt, temperature=0.3, max_tokens=1024
+            ):
+                emitted = True
+                yield token
+
+        except Exception as e:
+            logger.error(f"Streaming answer generation failed: {e}")
+            # Fallback to basic facility list (only if nothing was sent yet)
+            if not emitted:
+                yield self._format_basic_list(facilities)
+
+    def _build_answer_prompt(
+        self, user_query: str, facilities: List[Dict[str, Any]]
+    ) -> tuple[str, str]:
+        """
+        Build system prompt and user prompt for answer generation.
+
+        Args:
+            user_query: Original user question
+            facilities: Retrieved facilities from Neo4j
+
+        Returns:
+            Tuple of (system prompt, prompt)
+        """
         # Construct context from facilities
         context = self._build_context(facilities)
 
@@ -266,16 +357,7 @@ JSON形式のみで返答し、説明文は含めないでください。"""
 
 上記の事業所情報を基に、質問に対して適切な回答を生成してください。"""
 
-        try:
-            answer = self.llm.generate(
-                prompt=prompt, system=system_prompt, temperature=0.3, max_tokens=1024
-            )
-            return answer
-
-        except Exception as e:
-            logger.error(f"Answer generation failed: {e}")
-            # Fallback to basic facility list
-            return self._format_basic_list(facilities)
+        return system_prompt, prompt
 
     def _build_context(self, facilities: List[Dict[str, Any]]) -> str:
         """
@@ -275,16 +275,34 @@ class AssessmentService:
             logger.error(f"Error getting assessment {assessment_id}: {e}")
             raise
 
-    def list_user_assessments(self, user_id: str) -> list[Dict[str, Any]]:
-        """Get all assessments for a user."""
-        query = """
-        MATCH (u:User {user_id: $user_id})-[:HAS_ASSESSMENT]->(a:Assessment)
-        RETURN a
+    def list_user_assessments(
+        self, user_id: str, content_preview: Optional[int] = None
+    ) -> list[Dict[str, Any]]:
+        """
+        Get all assessments for a user.
+
+        Args:
+            user_id: User ID
+            content_preview: If given, interview_content is truncated to this
+                many characters in Cypher (keeps list payloads small)
+        """
+        if content_preview is None:
+            projection = "a"
+        else:
+            projection = (
+                "a {.*, interview_content: left(a.interview_content, $content_preview)} AS a"
+            )
+
+        query = f"""
+        MATCH (u:User {{user_id: $user_id}})-[:HAS_ASSESSMENT]->(a:Assessment)
+        RETURN {projection}
         ORDER BY a.created_at DESC
         """
 
         try:
-            result = self.db.execute_read(query, {"user_id": user_id})
+            result = self.db.execute_read(
+                query, {"user_id": user_id, "content_preview": content_preview}
+            )
             assessments = []
 
             for record in result:
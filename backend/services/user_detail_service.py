@@ -2,8 +2,11 @@
 """
 User detail service with comprehensive support information.
 """
+from datetime import date
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+
+import orjson
 from loguru import logger
 
 from backend.neo4j.client import get_neo4j_client
@@ -26,12 +29,65 @@ def _convert_neo4j_types(data: Dict[str, Any]) -> Dict[str, Any]:
     return result
 
 
+def _days_until(value: Any) -> Optional[int]:
+    """
+    日付値（Neo4jのDate/DateTime または ISO 形式の文字列）までの今日からの日数
+
+    過去の日付は負の値になる。未設定や日付として解釈できない値は None を返し、
+    1件の不正データで利用者詳細全体が失敗しないようにする。
+    """
+    if value is None:
+        return None
+    try:
+        return (date.fromisoformat(str(value)[:10]) - date.today()).days
+    except ValueError:
+        logger.warning("Unparseable date value: {!r}", value)
+        return None
+
+
+@lru_cache(maxsize=256)
+def _parse_service_evaluations(raw: str) -> List[Dict[str, Any]]:
+    """
+    service_evaluations_json をパース（同一文字列はキャッシュを再利用）
+
+    Neo4jのプロパティにはマップのリストを保存できないためJSON文字列のまま保持し、
+    読み出し側でパース結果を使い回す。戻り値は共有されるため変更しないこと。
+    """
+    try:
+        return orjson.loads(raw)
+    except ValueError:
+        logger.warning("Invalid service_evaluations_json; falling back to empty list")
+        return []
+
+
 class UserDetailService:
     """利用者詳細情報サービス"""
 
     def __init__(self):
         self.db = get_neo4j_client()
 
+    def warm_page_cache(self) -> None:
+        """
+        利用者詳細で参照するノード・リレーションをページキャッシュに載せる
+
+        再起動直後の初回 get_user_detail がディスク読み込みで遅くならないよう、
+        起動時にバックグラウンドで一度だけ実行する。
+        apoc.warmup.run は Neo4j 5 で廃止されたため、対象ノードを MATCH で走査して読み込む。
+        """
+        query = """
+        MATCH (n)
+        WHERE n:User OR n:Plan OR n:Assessment OR n:MonitoringRecord
+           OR n:Goal OR n:ServiceNeed
+        OPTIONAL MATCH (n)-[r]->()
+        RETURN count(n.user_id) + count(r) AS touched
+        """
+        try:
+            result = self.db.execute_read(query, {})
+            touched = result[0]["touched"] if result else 0
+            logger.info("Neo4j page cache warmed up ({} entries touched)", touched)
+        except Exception as e:
+            logger.warning("Neo4j page cache warmup failed: {}", e)
+
     def get_user_detail(self, user_id: str) -> Dict[str, Any]:
         """
         利用者の詳細情報を取得
@@ -52,64 +108,112 @@ class UserDetailService:
             user_result = self.db.execute_read(user_query, {"user_id": user_id})
 
             if not user_result:
-                logger.error(f"User {user_id} not found")
+                logger.error("User {} not found", user_id)
                 return None
 
             user_node = _convert_neo4j_types(dict(user_result[0]["u"]))
+            return self._build_user_details({user_id: user_node})[user_id]
+
+        except Exception as e:
+            logger.exception("Error getting user detail for {}: {}", user_id, e)
+            raise
+
+    def get_user_details(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        複数利用者の詳細情報をまとめて取得
+
+        付随情報の各クエリも利用者IDのリストで1回ずつ実行するため、
+        利用者数によらずクエリ回数は一定になる。
+
+        Returns:
+            利用者ID→詳細情報（存在しない利用者は含まない）
+        """
+        query = """
+        MATCH (u:User)
+        WHERE u.user_id IN $user_ids
+        RETURN u
+        """
+        try:
+            result = self.db.execute_read(query, {"user_ids": list(user_ids)})
+
+            user_nodes = {}
+            for record in result:
+                user_node = _convert_neo4j_types(dict(record["u"]))
+                user_nodes[user_node["user_id"]] = user_node
 
-            # 2. 現在利用中のサービス
-            current_services = self._get_current_services(user_id)
+            if not user_nodes:
+                return {}
+            return self._build_user_details(user_nodes)
 
-            # 3. 直近のモニタリング
-            recent_monitoring = self._get_recent_monitoring(user_id)
+        except Exception as e:
+            logger.exception("Error getting user details for {}: {}", user_ids, e)
+            raise
+
+    def _build_user_details(self, user_nodes: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """基本情報に付随情報（サービス・モニタリング・目標・タイムライン・アラート）を加える"""
+        user_ids = list(user_nodes)
 
-            # 4. 目標達成状況
-            goal_progress = self._get_goal_progress(user_id)
+        # 2. 現在利用中のサービス
+        current_services = self._get_current_services(user_ids)
 
-            # 5. 支援タイムライン
-            support_timeline = self._get_support_timeline(user_id)
+        # 3. 直近のモニタリング
+        recent_monitoring = self._get_recent_monitoring(user_ids)
 
-            # 6. アラート情報
-            alerts = self._get_alerts(user_id)
+        # 4. 目標達成状況
+        goal_progress = self._get_goal_progress(user_ids)
 
-            return {
+        # 5. 支援タイムライン
+        support_timeline = self._get_support_timeline(user_ids)
+
+        # 6. アラート情報
+        alerts = self._get_alerts(user_ids, recent_monitoring)
+
+        return {
+            user_id: {
                 "user_id": user_id,
                 "basic_info": user_node,
-                "current_services": current_services,
-                "recent_monitoring": recent_monitoring,
-                "goal_progress": goal_progress,
-                "support_timeline": support_timeline,
-                "alerts": alerts
+                "current_services": current_services.get(user_id, []),
+                "recent_monitoring": recent_monitoring.get(user_id),
+                "goal_progress": goal_progress.get(user_id, []),
+                "support_timeline": support_timeline.get(user_id, []),
+                "alerts": alerts.get(user_id, [])
             }
+            for user_id, user_node in user_nodes.items()
+        }
 
-        except Exception as e:
-            logger.error(f"Error getting user detail for {user_id}: {e}", exc_info=True)
-            raise
-
-    def _get_current_services(self, user_id: str) -> List[Dict[str, Any]]:
-        """現在利用中のサービス一覧"""
+    def _get_current_services(self, user_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """現在利用中のサービス一覧（利用者ID→サービス）"""
         query = """
-        MATCH (u:User {user_id: $user_id})-[:HAS_PLAN]->(p:Plan)
-        WHERE p.status = 'active'
+        MATCH (u:User)-[:HAS_PLAN]->(p:Plan)
+        WHERE u.user_id IN $user_ids AND p.status = 'active'
         MATCH (p)-[:INCLUDES_SERVICE]->(s:ServiceNeed)
-        RETURN DISTINCT s
+        WITH u.user_id AS user_id, s
         ORDER BY s.service_type
+        RETURN user_id, collect(DISTINCT s) AS services
         """
-        result = self.db.execute_read(query, {"user_id": user_id})
-        return [_convert_neo4j_types(dict(record["s"])) for record in result]
-
-    def _get_recent_monitoring(self, user_id: str) -> Optional[Dict[str, Any]]:
-        """直近のモニタリング記録"""
+        result = self.db.execute_read(query, {"user_ids": user_ids})
+        return {
+            record["user_id"]: [_convert_neo4j_types(dict(s)) for s in record["services"]]
+            for record in result
+        }
+
+    def _get_recent_monitoring(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """直近のモニタリング記録（利用者ID→記録。記録のない利用者は含まない）"""
         query = """
-        MATCH (u:User {user_id: $user_id})-[:HAS_PLAN]->(p:Plan)
+        MATCH (u:User)-[:HAS_PLAN]->(p:Plan)
+        WHERE u.user_id IN $user_ids
         MATCH (p)-[:HAS_MONITORING]->(m:MonitoringRecord)
-        RETURN m
+        WITH u.user_id AS user_id, m
         ORDER BY m.monitoring_date DESC
-        LIMIT 1
+        RETURN user_id, collect(m)[0] AS m
         """
-        result = self.db.execute_read(query, {"user_id": user_id})
-        if result:
-            monitoring = _convert_neo4j_types(dict(result[0]["m"]))
+        result = self.db.execute_read(query, {"user_ids": user_ids})
+
+        recent = {}
+        for record in result:
+            monitoring = _convert_neo4j_types(dict(record["m"]))
+            days_until = _days_until(monitoring.get("monitoring_date"))
+            monitoring["days_since_monitoring"] = -days_until if days_until is not None else None
             # プロパティ名のマッピング（overall_summary → overall_progress, created_by → conducted_by）
             if "overall_summary" in monitoring and "overall_progress" not in monitoring:
                 monitoring["overall_progress"] = monitoring["overall_summary"]
@@ -117,28 +221,26 @@ class UserDetailService:
                 monitoring["conducted_by"] = monitoring["created_by"]
 
             # JSON文字列をパース
-            if "service_evaluations_json" in monitoring:
-                import json
-                try:
-                    if isinstance(monitoring["service_evaluations_json"], str):
-                        monitoring["service_evaluations_json"] = json.loads(monitoring["service_evaluations_json"])
-                except:
-                    monitoring["service_evaluations_json"] = []
-
-            return monitoring
-        return None
+            if isinstance(monitoring.get("service_evaluations_json"), str):
+                monitoring["service_evaluations_json"] = _parse_service_evaluations(
+                    monitoring["service_evaluations_json"]
+                )
 
-    def _get_goal_progress(self, user_id: str) -> List[Dict[str, Any]]:
-        """目標達成状況（最新のモニタリング評価を含む）"""
+            recent[record["user_id"]] = monitoring
+        return recent
+
+    def _get_goal_progress(self, user_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """目標達成状況（利用者ID→目標。最新のモニタリング評価を含む）"""
         query = """
-        MATCH (u:User {user_id: $user_id})-[:HAS_PLAN]->(p:Plan)
+        MATCH (u:User)-[:HAS_PLAN]->(p:Plan)
+        WHERE u.user_id IN $user_ids
         MATCH (p)-[:HAS_GOAL]->(g:Goal)
-        RETURN g, p.plan_id as plan_id
+        RETURN u.user_id AS user_id, g, p.plan_id as plan_id
         ORDER BY g.goal_order
         """
-        result = self.db.execute_read(query, {"user_id": user_id})
+        result = self.db.execute_read(query, {"user_ids": user_ids})
 
-        goals = []
+        goals = {}
         for record in result:
             goal = _convert_neo4j_types(dict(record["g"]))
             goal["plan_id"] = record["plan_id"]
@@ -147,136 +249,138 @@ class UserDetailService:
             goal["achievement_status"] = "未評価"
             goal["achievement_rate"] = 0
 
-            goals.append(goal)
+            goals.setdefault(record["user_id"], []).append(goal)
 
         return goals
 
-    def _get_support_timeline(self, user_id: str) -> List[Dict[str, Any]]:
-        """支援タイムライン（時系列イベント）"""
+    def _get_support_timeline(self, user_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """支援タイムライン（利用者ID→時系列イベント。利用者ごとに新しい順で最大20件）"""
         query = """
-        MATCH (u:User {user_id: $user_id})-[:HAS_ASSESSMENT]->(a:Assessment)
+        MATCH (u:User)
+        WHERE u.user_id IN $user_ids
+        OPTIONAL MATCH (u)-[:HAS_ASSESSMENT]->(a:Assessment)
+        WITH u, collect(DISTINCT {
+            event_type: 'assessment',
+            event_id: a.assessment_id,
+            event_date: a.interview_date,
+            description: 'アセスメント実施',
+            plan_id: null
+        }) AS assessment_events
         OPTIONAL MATCH (u)-[:HAS_PLAN]->(p:Plan)
         OPTIONAL MATCH (p)-[:HAS_MONITORING]->(m:MonitoringRecord)
-        RETURN
-            'assessment' as event_type,
-            a.assessment_id as event_id,
-            a.interview_date as event_date,
-            'アセスメント実施' as description,
-            null as plan_id
-        UNION
-        MATCH (u:User {user_id: $user_id})-[:HAS_PLAN]->(p:Plan)
-        RETURN
-            'plan' as event_type,
-            p.plan_id as event_id,
-            p.created_at as event_date,
-            COALESCE(p.plan_type, '個別支援計画') as description,
-            p.plan_id as plan_id
-        UNION
-        MATCH (u:User {user_id: $user_id})-[:HAS_PLAN]->(p:Plan)
-        MATCH (p)-[:HAS_MONITORING]->(m:MonitoringRecord)
-        RETURN
-            'monitoring' as event_type,
-            m.monitoring_id as event_id,
-            m.monitoring_date as event_date,
-            COALESCE(m.overall_progress, 'モニタリング実施') as description,
-            p.plan_id as plan_id
-        ORDER BY event_date DESC
-        LIMIT 20
+        WITH u, assessment_events,
+             collect(DISTINCT {
+                 event_type: 'plan',
+                 event_id: p.plan_id,
+                 event_date: p.created_at,
+                 description: COALESCE(p.plan_type, '個別支援計画'),
+                 plan_id: p.plan_id
+             }) AS plan_events,
+             collect(DISTINCT {
+                 event_type: 'monitoring',
+                 event_id: m.monitoring_id,
+                 event_date: m.monitoring_date,
+                 description: COALESCE(m.overall_progress, 'モニタリング実施'),
+                 plan_id: p.plan_id
+             }) AS monitoring_events
+        UNWIND assessment_events + plan_events + monitoring_events AS ev
+        WITH u.user_id AS user_id, ev
+        WHERE ev.event_id IS NOT NULL
+        WITH user_id, ev
+        ORDER BY ev.event_date DESC
+        RETURN user_id, collect(ev)[..20] AS events
+        """
+        result = self.db.execute_read(query, {"user_ids": user_ids})
+        return {
+            record["user_id"]: [_convert_neo4j_types(dict(ev)) for ev in record["events"]]
+            for record in result
+        }
+
+    def _get_alerts(
+        self,
+        user_ids: List[str],
+        recent_monitoring: Dict[str, Dict[str, Any]],
+    ) -> Dict[str, List[Dict[str, str]]]:
         """
-        result = self.db.execute_read(query, {"user_id": user_id})
-        return [_convert_neo4j_types(dict(record)) for record in result]
+        アラート情報（契約更新、モニタリング期限等）
 
-    def _get_alerts(self, user_id: str) -> List[Dict[str, str]]:
-        """アラート情報（契約更新、モニタリング期限等）"""
-        alerts = []
+        Args:
+            user_ids: 利用者IDのリスト
+            recent_monitoring: 取得済みの直近モニタリング（_get_recent_monitoring の結果）
+
+        Returns:
+            利用者ID→アラート（アラートのない利用者は含まない）
+        """
+        alerts = {}
 
-        # ユーザー基本情報取得（手帳有効期限チェック用）
+        # 日付は _days_until で解釈し、解釈できない値はアラート判定から除外する
+        # 手帳有効期限チェック
         user_query = """
-        MATCH (u:User {user_id: $user_id})
-        RETURN u.mental_health_notebook as mental_health_notebook,
-               u.mental_health_notebook_grade as mental_health_notebook_grade,
-               u.mental_health_notebook_expiry as mental_health_notebook_expiry
+        MATCH (u:User)
+        WHERE u.user_id IN $user_ids
+          AND u.mental_health_notebook AND u.mental_health_notebook_expiry IS NOT NULL
+        RETURN u.user_id AS user_id, u.mental_health_notebook_expiry AS expiry
         """
-        user_result = self.db.execute_read(user_query, {"user_id": user_id})
-        if user_result and user_result[0]["mental_health_notebook"]:
-            expiry_date = user_result[0].get("mental_health_notebook_expiry")
-            if expiry_date:
-                try:
-                    # Neo4j Dateオブジェクトの処理
-                    if hasattr(expiry_date, 'iso_format'):
-                        expiry_date_str = expiry_date.iso_format()
-                    else:
-                        expiry_date_str = str(expiry_date)
-
-                    expiry_dt = datetime.fromisoformat(expiry_date_str[:10])
-                    days_until = (expiry_dt - datetime.now()).days
-
-                    if days_until < 0:
-                        alerts.append({
-                            "type": "mental_health_notebook_expired",
-                            "severity": "high",
-                            "message": f"精神保健福祉手帳の有効期限が切れています（{expiry_date_str[:10]}）"
-                        })
-                    elif days_until <= 90:  # 3ヶ月以内
-                        alerts.append({
-                            "type": "mental_health_notebook_expiring",
-                            "severity": "medium",
-                            "message": f"精神保健福祉手帳の有効期限まで{days_until}日です（{expiry_date_str[:10]}）"
-                        })
-                except:
-                    pass
+        for record in self.db.execute_read(user_query, {"user_ids": user_ids}):
+            days_until = _days_until(record["expiry"])
+            if days_until is None:
+                continue
+            expiry_date = str(record["expiry"])[:10]
+            if days_until < 0:
+                alerts.setdefault(record["user_id"], []).append({
+                    "type": "mental_health_notebook_expired",
+                    "severity": "high",
+                    "message": f"精神保健福祉手帳の有効期限が切れています（{expiry_date}）"
+                })
+            elif days_until <= 90:  # 3ヶ月以内
+                alerts.setdefault(record["user_id"], []).append({
+                    "type": "mental_health_notebook_expiring",
+                    "severity": "medium",
+                    "message": f"精神保健福祉手帳の有効期限まで{days_until}日です（{expiry_date}）"
+                })
 
         # モニタリング期限チェック
-        recent_monitoring = self._get_recent_monitoring(user_id)
-        if recent_monitoring:
-            monitoring_date_str = recent_monitoring.get("monitoring_date", "")
-            if monitoring_date_str:
-                try:
-                    monitoring_date = datetime.fromisoformat(monitoring_date_str[:10])
-                    days_since = (datetime.now() - monitoring_date).days
-                    if days_since > 180:  # 6ヶ月以上
-                        alerts.append({
-                            "type": "monitoring_overdue",
-                            "severity": "high",
-                            "message": f"モニタリングが{days_since}日実施されていません"
-                        })
-                    elif days_since > 150:  # 5ヶ月以上
-                        alerts.append({
-                            "type": "monitoring_reminder",
-                            "severity": "medium",
-                            "message": "モニタリング実施期限が近づいています"
-                        })
-                except:
-                    pass
-
-        # 計画更新チェック
+        for user_id, monitoring in recent_monitoring.items():
+            days_since = monitoring.get("days_since_monitoring")
+            if days_since is None:
+                continue
+            if days_since > 180:  # 6ヶ月以上
+                alerts.setdefault(user_id, []).append({
+                    "type": "monitoring_overdue",
+                    "severity": "high",
+                    "message": f"モニタリングが{days_since}日実施されていません"
+                })
+            elif days_since > 150:  # 5ヶ月以上
+                alerts.setdefault(user_id, []).append({
+                    "type": "monitoring_reminder",
+                    "severity": "medium",
+                    "message": "モニタリング実施期限が近づいています"
+                })
+
+        # 計画更新チェック（利用者ごとに最も早い終了日で判定）
         plan_query = """
-        MATCH (u:User {user_id: $user_id})-[:HAS_PLAN]->(p:Plan)
-        WHERE p.status = '実施中'
-        RETURN p.plan_end_date as end_date
-        ORDER BY p.plan_end_date
-        LIMIT 1
+        MATCH (u:User)-[:HAS_PLAN]->(p:Plan)
+        WHERE u.user_id IN $user_ids
+          AND p.status = '実施中' AND p.plan_end_date IS NOT NULL
+        RETURN u.user_id AS user_id, collect(p.plan_end_date) AS end_dates
         """
-        plan_result = self.db.execute_read(plan_query, {"user_id": user_id})
-        if plan_result and plan_result[0]["end_date"]:
-            end_date_str = str(plan_result[0]["end_date"])[:10]
-            try:
-                end_date = datetime.fromisoformat(end_date_str)
-                days_until = (end_date - datetime.now()).days
-                if days_until < 0:
-                    alerts.append({
-                        "type": "plan_expired",
-                        "severity": "high",
-                        "message": "支援計画の期限が切れています"
-                    })
-                elif days_until < 30:
-                    alerts.append({
-                        "type": "plan_renewal",
-                        "severity": "medium",
-                        "message": f"支援計画の更新が{days_until}日後に必要です"
-                    })
-            except:
-                pass
+        for record in self.db.execute_read(plan_query, {"user_ids": user_ids}):
+            days = [d for d in map(_days_until, record["end_dates"]) if d is not None]
+            if not days:
+                continue
+            days_until = min(days)
+            if days_until < 0:
+                alerts.setdefault(record["user_id"], []).append({
+                    "type": "plan_expired",
+                    "severity": "high",
+                    "message": "支援計画の期限が切れています"
+                })
+            elif days_until < 30:
+                alerts.setdefault(record["user_id"], []).append({
+                    "type": "plan_renewal",
+                    "severity": "medium",
+                    "message": f"支援計画の更新が{days_until}日後に必要です"
+                })
 
         return alerts
 
@@ -6,11 +6,74 @@ Handles CRUD operations for User nodes in Neo4j.
 """
 import uuid
 from datetime import datetime, date
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Tuple
 from loguru import logger
 
 from backend.neo4j.client import get_neo4j_client
 
+# UNWIND による一括書き込みの1トランザクションあたりの件数
+BATCH_SIZE = 10000
+
+
+# User ノードの返却用射影。日付型はCypher側で文字列化し、Python側の変換を不要にする
+_USER_PROJECTION = """u {
+        .*,
+        birth_date: toString(u.birth_date),
+        mental_health_notebook_expiry: toString(u.mental_health_notebook_expiry),
+        created_at: toString(u.created_at),
+        updated_at: toString(u.updated_at),
+        deleted_at: toString(u.deleted_at)
+    } AS u"""
+
+
+# list_users のフィルター条件（キー, WHERE句）。順序はクエリ文字列の生成順を兼ねる
+_USER_FILTER_CONDITIONS = (
+    # disability_type は「知的障害, 精神障害」のようなカンマ区切りの複数指定を含む
+    ("disability_type", "$disability_type IN [d IN split(u.disability_type, ',') | trim(d)]"),
+    ("support_level", "u.support_level = $support_level"),
+    ("age_min", "u.age >= $age_min"),
+    ("age_max", "u.age <= $age_max"),
+    ("living_situation", "u.living_situation = $living_situation"),
+    ("search_query", "(u.name CONTAINS $search_query OR u.kana CONTAINS $search_query)"),
+)
+
+
+@lru_cache(maxsize=64)
+def _build_list_queries(filter_keys: Tuple[str, ...]) -> Tuple[str, str]:
+    """
+    Build (count_query, list_query) for the given set of active filters.
+
+    Cached per filter shape so identical Cypher text is reused, which also
+    keeps Neo4j's query plan cache warm.
+    """
+    conditions = [
+        condition for key, condition in _USER_FILTER_CONDITIONS if key in filter_keys
+    ]
+
+    # 削除されていないユーザーのみを対象とする条件を追加
+    # （フラグ未設定の既存ユーザーは、起動時の補完が失敗していても未削除として扱う）
+    conditions.append("coalesce(u.deleted, false) = false")
+
+    where_clause = " AND ".join(conditions)
+
+    count_query = f"""
+    MATCH (u:User)
+    WHERE {where_clause}
+    RETURN count(u) as total
+    """
+
+    list_query = f"""
+    MATCH (u:User)
+    WHERE {where_clause}
+    RETURN {_USER_PROJECTION}
+    ORDER BY u.name
+    SKIP $skip
+    LIMIT $limit
+    """
+
+    return count_query, list_query
+
 
 class UserService:
     """Service for managing users."""
@@ -19,6 +82,34 @@ class UserService:
         """Initialize user service."""
         self.db = get_neo4j_client()
 
+    def ensure_deleted_flag(self) -> None:
+        """
+        Normalize User.deleted to a boolean and index it.
+
+        Nodes created before the flag was always written are backfilled with
+        ``false``. Read queries still treat a missing flag as not deleted, so
+        a failed backfill does not hide those users.
+        """
+        self.db.execute_query(
+            """
+            CREATE INDEX user_deleted IF NOT EXISTS
+            FOR (u:User) ON (u.deleted)
+            """,
+            {},
+        )
+        result = self.db.execute_query(
+            """
+            MATCH (u:User)
+            WHERE u.deleted IS NULL
+            SET u.deleted = false
+            RETURN count(u) AS updated
+            """,
+            {},
+        )
+        updated = result[0]["updated"] if result else 0
+        if updated:
+            logger.info("Backfilled deleted=false on {} users", updated)
+
     def calculate_age(self, birth_date: date) -> int:
         """Calculate age from birth date."""
         today = date.today()
@@ -27,6 +118,23 @@ class UserService:
             age -= 1
         return age
 
+    def _prepare_user_row(self, user_data: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """Build the property map written for a new User node."""
+        row = dict(user_data)
+        row["user_id"] = str(uuid.uuid4())
+
+        # Calculate age
+        # (date values are passed as-is; the driver encodes them as Neo4j Date)
+        if isinstance(row.get("birth_date"), date):
+            row["age"] = self.calculate_age(row["birth_date"])
+        else:
+            row["age"] = None
+
+        row["deleted"] = False
+        row["created_at"] = now.isoformat()
+        row["updated_at"] = now.isoformat()
+        return row
+
     def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create new user.
@@ -37,96 +145,55 @@ class UserService:
         Returns:
             Created user dict with user_id
         """
-        user_id = str(uuid.uuid4())
-        now = datetime.now()
+        try:
+            created_users = self.create_users([user_data])
+            if created_users:
+                created_user = created_users[0]
+                logger.success("Created user: {}", created_user["user_id"])
+                return created_user
+            else:
+                raise Exception("Failed to create user")
 
-        # Calculate age
-        if "birth_date" in user_data and isinstance(user_data["birth_date"], date):
-            age = self.calculate_age(user_data["birth_date"])
-        else:
-            age = None
+        except Exception as e:
+            logger.error("Error creating user: {}", e)
+            raise
 
-        # Convert date to ISO string for Neo4j
-        if "birth_date" in user_data and isinstance(user_data["birth_date"], date):
-            user_data["birth_date"] = user_data["birth_date"].isoformat()
+    def create_users(self, users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create users in bulk.
 
-        # Convert mental health notebook expiry date if present
-        if "mental_health_notebook_expiry" in user_data and isinstance(user_data["mental_health_notebook_expiry"], date):
-            user_data["mental_health_notebook_expiry"] = user_data["mental_health_notebook_expiry"].isoformat()
+        Rows are written with UNWIND, one transaction per BATCH_SIZE users.
 
-        query = """
-        CREATE (u:User {
-            user_id: $user_id,
-            name: $name,
-            kana: $kana,
-            birth_date: date($birth_date),
-            age: $age,
-            gender: $gender,
-            disability_type: $disability_type,
-            disability_grade: $disability_grade,
-            support_level: $support_level,
-            therapy_notebook: $therapy_notebook,
-            therapy_notebook_grade: $therapy_notebook_grade,
-            mental_health_notebook: $mental_health_notebook,
-            mental_health_notebook_grade: $mental_health_notebook_grade,
-            mental_health_notebook_expiry: CASE WHEN $mental_health_notebook_expiry IS NOT NULL THEN date($mental_health_notebook_expiry) ELSE NULL END,
-            medical_care_needs: $medical_care_needs,
-            behavioral_support_needs: $behavioral_support_needs,
-            living_situation: $living_situation,
-            family_structure: $family_structure,
-            guardian_name: $guardian_name,
-            guardian_relation: $guardian_relation,
-            contact_phone: $contact_phone,
-            contact_address: $contact_address,
-            created_at: datetime($created_at),
-            updated_at: datetime($updated_at)
-        })
-        RETURN u
+        Args:
+            users: List of user data dicts
+
+        Returns:
+            Created user dicts in input order
         """
+        now = datetime.now()
+        rows = [self._prepare_user_row(user_data, now) for user_data in users]
 
-        params = {
-            "user_id": user_id,
-            "age": age,
-            "created_at": now.isoformat(),
-            "updated_at": now.isoformat(),
-            **user_data,
-        }
+        query = f"""
+        UNWIND $rows AS r
+        CREATE (u:User)
+        SET u = r,
+            u.created_at = datetime(r.created_at),
+            u.updated_at = datetime(r.updated_at)
+        RETURN {_USER_PROJECTION}
+        """
 
+        created_users = []
         try:
-            result = self.db.execute_query(query, params)
-            if result:
-                user_node = result[0]["u"]
-                created_user = dict(user_node)
-
-                # Convert Neo4j types to Python types
-                if "birth_date" in created_user:
-                    created_user["birth_date"] = (
-                        created_user["birth_date"].to_native().isoformat()
-                    )
-                if "mental_health_notebook_expiry" in created_user and created_user["mental_health_notebook_expiry"]:
-                    created_user["mental_health_notebook_expiry"] = (
-                        created_user["mental_health_notebook_expiry"].to_native().isoformat()
-                    )
-                if "created_at" in created_user:
-                    created_user["created_at"] = (
-                        created_user["created_at"].iso_format()
-                        if hasattr(created_user["created_at"], "iso_format")
-                        else str(created_user["created_at"])
-                    )
-                if "updated_at" in created_user:
-                    created_user["updated_at"] = (
-                        created_user["updated_at"].iso_format()
-                        if hasattr(created_user["updated_at"], "iso_format")
-                        else str(created_user["updated_at"])
-                    )
-
-                logger.success(f"Created user: {user_id}")
-                return created_user
-            else:
-                raise Exception("Failed to create user")
+            for start in range(0, len(rows), BATCH_SIZE):
+                result = self.db.execute_query(
+                    query, {"rows": rows[start:start + BATCH_SIZE]}
+                )
+                created_users.extend(dict(record["u"]) for record in result)
+
+            return created_users
 
         except Exception as e:
-            logger.error(f"Error creating user: {e}")
+            logger.error("Error creating users in bulk: {}", e)
             raise
 
     def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
@@ -139,42 +206,63 @@ class UserService:
         Returns:
             User dict or None if not found
         """
-        query = """
-        MATCH (u:User {user_id: $user_id})
-        WHERE (u.deleted IS NULL OR u.deleted = false)
-        RETURN u
+        query = f"""
+        MATCH (u:User {{user_id: $user_id}})
+        WHERE coalesce(u.deleted, false) = false
+        RETURN {_USER_PROJECTION}
         """
 
         try:
             result = self.db.execute_query(query, {"user_id": user_id})
             if result:
-                user_node = result[0]["u"]
-                user = dict(user_node)
-
-                # Convert Neo4j types
-                if "birth_date" in user:
-                    user["birth_date"] = user["birth_date"].to_native().isoformat()
-                if "mental_health_notebook_expiry" in user and user["mental_health_notebook_expiry"]:
-                    user["mental_health_notebook_expiry"] = user["mental_health_notebook_expiry"].to_native().isoformat()
-                if "created_at" in user:
-                    user["created_at"] = (
-                        user["created_at"].iso_format()
-                        if hasattr(user["created_at"], "iso_format")
-                        else str(user["created_at"])
-                    )
-                if "updated_at" in user:
-                    user["updated_at"] = (
-                        user["updated_at"].iso_format()
-                        if hasattr(user["updated_at"], "iso_format")
-                        else str(user["updated_at"])
-                    )
-
-                return user
+                return dict(result[0]["u"])
             else:
                 return None
 
         except Exception as e:
-            logger.error(f"Error getting user {user_id}: {e}")
+            logger.error("Error getting user {}: {}", user_id, e)
+            raise
+
+    def find_user(
+        self,
+        name: str,
+        birth_date: date,
+        exclude_user_id: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a user by name and birth date (duplicate check).
+
+        Args:
+            name: User name
+            birth_date: Birth date
+            exclude_user_id: User ID to ignore (the user being edited)
+
+        Returns:
+            Matching user dict or None
+        """
+        query = f"""
+        MATCH (u:User {{name: $name, birth_date: $birth_date}})
+        WHERE coalesce(u.deleted, false) = false
+          AND ($exclude_user_id IS NULL OR u.user_id <> $exclude_user_id)
+        RETURN {_USER_PROJECTION}
+        LIMIT 1
+        """
+
+        params = {
+            "name": name,
+            "birth_date": birth_date,
+            "exclude_user_id": exclude_user_id,
+        }
+
+        try:
+            result = self.db.execute_query(query, params)
+            if result:
+                return dict(result[0]["u"])
+            else:
+                return None
+
+        except Exception as e:
+            logger.error("Error looking up user {}: {}", name, e)
             raise
 
     def list_users(
@@ -182,6 +270,7 @@ class UserService:
         page: int = 1,
         page_size: int = 20,
         filters: Optional[Dict[str, Any]] = None,
+        include_total: bool = True,
     ) -> Dict[str, Any]:
         """
         List users with pagination and filtering.
@@ -190,100 +279,36 @@ class UserService:
             page: Page number (1-indexed)
             page_size: Number of users per page
             filters: Optional filters
+            include_total: Whether to count all matching users (total is None otherwise)
 
         Returns:
             Dict with users list and pagination info
         """
-        conditions = []
         params = {}
-
         if filters:
-            if filters.get("disability_type"):
-                conditions.append("u.disability_type = $disability_type")
-                params["disability_type"] = filters["disability_type"]
+            params = {
+                key: filters[key] for key, _ in _USER_FILTER_CONDITIONS if filters.get(key)
+            }
 
-            if filters.get("support_level"):
-                conditions.append("u.support_level = $support_level")
-                params["support_level"] = filters["support_level"]
+        count_query, list_query = _build_list_queries(tuple(params))
 
-            if filters.get("age_min"):
-                conditions.append("u.age >= $age_min")
-                params["age_min"] = filters["age_min"]
-
-            if filters.get("age_max"):
-                conditions.append("u.age <= $age_max")
-                params["age_max"] = filters["age_max"]
-
-            if filters.get("living_situation"):
-                conditions.append("u.living_situation = $living_situation")
-                params["living_situation"] = filters["living_situation"]
-
-            if filters.get("search_query"):
-                conditions.append(
-                    "(u.name CONTAINS $search_query OR u.kana CONTAINS $search_query)"
-                )
-                params["search_query"] = filters["search_query"]
-
-        # 削除されていないユーザーのみを対象とする条件を追加
-        conditions.append("(u.deleted IS NULL OR u.deleted = false)")
-
-        where_clause = " AND ".join(conditions) if conditions else "true"
-
-        # Count total
-        count_query = f"""
-        MATCH (u:User)
-        WHERE {where_clause}
-        RETURN count(u) as total
-        """
-
-        total = self.db.execute_query(count_query, params)[0]["total"]
+        # Count total (callers that do not need it can skip this scan)
+        total = None
+        if include_total:
+            total = self.db.execute_query(count_query, params)[0]["total"]
 
         # Get paginated results
-        skip = (page - 1) * page_size
-        params["skip"] = skip
+        params["skip"] = (page - 1) * page_size
         params["limit"] = page_size
 
-        list_query = f"""
-        MATCH (u:User)
-        WHERE {where_clause}
-        RETURN u
-        ORDER BY u.name
-        SKIP $skip
-        LIMIT $limit
-        """
-
         try:
             result = self.db.execute_query(list_query, params)
-            users = []
-
-            for record in result:
-                user_node = record["u"]
-                user = dict(user_node)
-
-                # Convert Neo4j types
-                if "birth_date" in user:
-                    user["birth_date"] = user["birth_date"].to_native().isoformat()
-                if "mental_health_notebook_expiry" in user and user["mental_health_notebook_expiry"]:
-                    user["mental_health_notebook_expiry"] = user["mental_health_notebook_expiry"].to_native().isoformat()
-                if "created_at" in user:
-                    user["created_at"] = (
-                        user["created_at"].iso_format()
-                        if hasattr(user["created_at"], "iso_format")
-                        else str(user["created_at"])
-                    )
-                if "updated_at" in user:
-                    user["updated_at"] = (
-                        user["updated_at"].iso_format()
-                        if hasattr(user["updated_at"], "iso_format")
-                        else str(user["updated_at"])
-                    )
-
-                users.append(user)
+            users = [dict(record["u"]) for record in result]
 
             return {"users": users, "total": total, "page": page, "page_size": page_size}
 
         except Exception as e:
-            logger.error(f"Error listing users: {e}")
+            logger.error("Error listing users: {}", e)
             raise
 
     def update_user(
@@ -305,71 +330,63 @@ class UserService:
         if not update_data:
             return self.get_user(user_id)
 
-        # Convert date to ISO string if present
-        if "birth_date" in update_data and isinstance(update_data["birth_date"], date):
-            update_data["birth_date"] = update_data["birth_date"].isoformat()
-            # Recalculate age
-            update_data["age"] = self.calculate_age(
-                date.fromisoformat(update_data["birth_date"])
-            )
-
-        # Convert mental health notebook expiry date if present
-        if "mental_health_notebook_expiry" in update_data and isinstance(update_data["mental_health_notebook_expiry"], date):
-            update_data["mental_health_notebook_expiry"] = update_data["mental_health_notebook_expiry"].isoformat()
-
-        # Build SET clause
-        set_clauses = []
-        for key in update_data.keys():
-            if key == "mental_health_notebook_expiry":
-                # Handle date type with CASE statement
-                set_clauses.append(f"u.{key} = CASE WHEN ${key} IS NOT NULL THEN date(${key}) ELSE NULL END")
+        try:
+            updated_users = self.update_users([{"user_id": user_id, **update_data}])
+            if updated_users:
+                logger.success("Updated user: {}", user_id)
+                return updated_users[0]
             else:
-                set_clauses.append(f"u.{key} = ${key}")
-        set_clauses.append("u.updated_at = datetime($updated_at)")
+                return None
 
-        query = f"""
-        MATCH (u:User {{user_id: $user_id}})
-        SET {', '.join(set_clauses)}
-        RETURN u
+        except Exception as e:
+            logger.error("Error updating user {}: {}", user_id, e)
+            raise
+
+    def update_users(self, updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
+        Update users in bulk.
 
-        params = {
-            "user_id": user_id,
-            "updated_at": datetime.now().isoformat(),
-            **update_data,
-        }
+        Args:
+            updates: List of dicts, each with ``user_id`` and the fields to update
+                (None values are ignored)
+
+        Returns:
+            Updated user dicts (users that were not found are omitted)
+        """
+        rows = []
+        for update_data in updates:
+            props = {
+                k: v for k, v in update_data.items() if k != "user_id" and v is not None
+            }
+
+            # Recalculate age
+            if isinstance(props.get("birth_date"), date):
+                props["age"] = self.calculate_age(props["birth_date"])
+
+            rows.append({"user_id": update_data["user_id"], "props": props})
+
+        query = f"""
+        UNWIND $rows AS r
+        MATCH (u:User {{user_id: r.user_id}})
+        SET u += r.props,
+            u.updated_at = datetime($updated_at)
+        RETURN {_USER_PROJECTION}
+        """
 
+        updated_users = []
+        updated_at = datetime.now().isoformat()
         try:
-            result = self.db.execute_query(query, params)
-            if result:
-                user_node = result[0]["u"]
-                user = dict(user_node)
-
-                # Convert Neo4j types
-                if "birth_date" in user:
-                    user["birth_date"] = user["birth_date"].to_native().isoformat()
-                if "mental_health_notebook_expiry" in user and user["mental_health_notebook_expiry"]:
-                    user["mental_health_notebook_expiry"] = user["mental_health_notebook_expiry"].to_native().isoformat()
-                if "created_at" in user:
-                    user["created_at"] = (
-                        user["created_at"].iso_format()
-                        if hasattr(user["created_at"], "iso_format")
-                        else str(user["created_at"])
-                    )
-                if "updated_at" in user:
-                    user["updated_at"] = (
-                        user["updated_at"].iso_format()
-                        if hasattr(user["updated_at"], "iso_format")
-                        else str(user["updated_at"])
-                    )
-
-                logger.success(f"Updated user: {user_id}")
-                return user
-            else:
-                return None
+            for start in range(0, len(rows), BATCH_SIZE):
+                result = self.db.execute_query(
+                    query,
+                    {"rows": rows[start:start + BATCH_SIZE], "updated_at": updated_at},
+                )
+                updated_users.extend(dict(record["u"]) for record in result)
+
+            return updated_users
 
         except Exception as e:
-            logger.error(f"Error updating user {user_id}: {e}")
+            logger.error("Error updating users in bulk: {}", e)
             raise
 
     def delete_user(self, user_id: str) -> bool:
@@ -394,13 +411,13 @@ class UserService:
         try:
             result = self.db.execute_query(query, params)
             if result:
-                logger.success(f"Deleted user: {user_id}")
+                logger.success("Deleted user: {}", user_id)
                 return True
             else:
                 return False
 
         except Exception as e:
-            logger.error(f"Error deleting user {user_id}: {e}")
+            logger.error("Error deleting user {}: {}", user_id, e)
             raise
 
 
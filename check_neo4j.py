@@ -13,20 +13,16 @@ driver = GraphDatabase.driver(uri, auth=(user, password))
 database = os.getenv("NEO4J_DATABASE", "kitakyu-facilities")
 
 with driver.session(database=database) as session:
-    # Count users
-    users_result = session.run("MATCH (u:User) RETURN count(u) as count")
-    users_count = users_result.single()["count"]
-    print(f"利用者総数: {users_count}件")
-    
-    # Count assessments
-    assessments_result = session.run("MATCH (a:Assessment) RETURN count(a) as count")
-    assessments_count = assessments_result.single()["count"]
-    print(f"アセスメント総数: {assessments_count}件")
-    
-    # Count plans
-    plans_result = session.run("MATCH (p:Plan) RETURN count(p) as count")
-    plans_count = plans_result.single()["count"]
-    print(f"計画総数: {plans_count}件")
+    # Count users / assessments / plans in a single round-trip
+    counts = session.run("""
+        CALL { MATCH (u:User) RETURN count(u) AS users }
+        CALL { MATCH (a:Assessment) RETURN count(a) AS assessments }
+        CALL { MATCH (p:Plan) RETURN count(p) AS plans }
+        RETURN users, assessments, plans
+    """).single()
+    print(f"利用者総数: {counts['users']}件")
+    print(f"アセスメント総数: {counts['assessments']}件")
+    print(f"計画総数: {counts['plans']}件")
     
     # Get users with their assessments
     print("\n各利用者のアセスメント状況:")
@@ -4,12 +4,25 @@
 全利用者にアセスメントと計画を作成
 """
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 from loguru import logger
+from requests.adapters import HTTPAdapter
 
 API_BASE_URL = "http://localhost:8001/api"
+MAX_WORKERS = 16
 
-def create_assessment_and_plan(user_id: str, user_name: str):
+
+def create_session() -> requests.Session:
+    """接続プール付きのHTTPセッションを作成"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def create_assessment_and_plan(session: requests.Session, user_id: str, user_name: str):
     """利用者にアセスメントと計画を作成"""
 
     # 1. アセスメント作成
@@ -56,7 +69,7 @@ def create_assessment_and_plan(user_id: str, user_name: str):
     }
 
     try:
-        response = requests.post(
+        response = session.post(
             f"{API_BASE_URL}/assessments",
             json=assessment_data,
             timeout=10
@@ -112,7 +125,7 @@ def create_assessment_and_plan(user_id: str, user_name: str):
     }
 
     try:
-        response = requests.post(
+        response = session.post(
             f"{API_BASE_URL}/plans",
             json=plan_data,
             timeout=10
@@ -134,9 +147,11 @@ def main():
     print("ダミーデータ作成開始")
     print("=" * 60)
 
+    session = create_session()
+
     # 利用者一覧取得
     try:
-        response = requests.get(
+        response = session.get(
             f"{API_BASE_URL}/users",
             params={"page": 1, "page_size": 100},
             timeout=10
@@ -147,17 +162,19 @@ def main():
 
         print(f"\n対象利用者: {len(users)}件\n")
 
-        success_count = 0
-        for user in users:
-            user_id = user["user_id"]
-            user_name = user["name"]
-
-            print(f"処理中: {user_name} ({user_id[:8]}...)")
+        # 利用者ごとの処理を並列実行（通信待ちを重ねる）
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = []
+            for user in users:
+                user_id = user["user_id"]
+                user_name = user["name"]
 
-            if create_assessment_and_plan(user_id, user_name):
-                success_count += 1
+                print(f"処理中: {user_name} ({user_id[:8]}...)")
+                futures.append(
+                    executor.submit(create_assessment_and_plan, session, user_id, user_name)
+                )
 
-            print()
+            success_count = sum(1 for future in futures if future.result())
 
         print("=" * 60)
         print(f"完了: {success_count}/{len(users)}件")
@@ -165,6 +182,8 @@ def main():
 
     except Exception as e:
         logger.error(f"エラー: {e}")
+    finally:
+        session.close()
 
 
 if __name__ == "__main__":
@@ -4,21 +4,32 @@
 
 利用者の登録・編集・一覧表示を行います。
 """
+import hashlib
+import re
+import time
 import streamlit as st
 import requests
-import pandas as pd
-from datetime import date, datetime
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import date
+from typing import TYPE_CHECKING, Optional, Dict, Any, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# カタカナ（ァ-ヶ）→ひらがなの変換テーブル
+_KATA_TABLE = {c: c - 96 for c in range(ord('ァ'), ord('ヶ') + 1)}
 
 
 def kata_to_hira(text: str) -> str:
     """カタカナをひらがなに変換"""
-    if not text:
-        return ""
-    return "".join(
-        chr(ord(c) - 96) if 'ァ' <= c <= 'ヶ' else c
-        for c in text
-    )
+    return text.translate(_KATA_TABLE) if text else ""
+
+
+# ひらがな（ぁ-ん）、カタカナ（ァ-ヶ）、スペース、長音記号、中点のみ許可
+_KANA_RE = re.compile(r"[\u3041-\u3093\u30A1-\u30F6 \u3000ー・]*")
 
 
 def is_valid_kana(text: str) -> bool:
@@ -34,15 +45,7 @@ def is_valid_kana(text: str) -> bool:
     if not text:
         return True
 
-    for char in text:
-        # ひらがな（ぁ-ん）、カタカナ（ァ-ヶ）、スペース、長音記号、中点のみ許可
-        if not (
-            ('ぁ' <= char <= 'ん') or
-            ('ァ' <= char <= 'ヶ') or
-            char in [' ', '　', 'ー', '・']
-        ):
-            return False
-    return True
+    return _KANA_RE.fullmatch(text) is not None
 
 
 # ページ設定
@@ -54,39 +57,171 @@ st.set_page_config(
 
 # API設定
 API_BASE_URL = "http://localhost:8000/api"
+REQUEST_TIMEOUT = (3, 10)  # (接続, 読み込み) 秒
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """APIサーバーとの接続を使い回すためのHTTPセッション（プロセス内で共有）"""
+    session = requests.Session()
+    # 一時的な接続エラー・5xxはプール済みの接続上で短い間隔で再試行する
+    # （POSTは重複登録を避けるため再試行しない）
+    retries = Retry(
+        total=2,
+        backoff_factor=0.1,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET", "PUT", "DELETE"]),
+    )
+    session.mount(
+        "http://",
+        HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retries)
+    )
+    session.headers.update({"Accept": "application/json"})
+    return session
 
-# セッションステートの初期化
-if "selected_user_id" not in st.session_state:
-    st.session_state["selected_user_id"] = None
-if "edit_mode" not in st.session_state:
-    st.session_state["edit_mode"] = False
-if "view_user_id" not in st.session_state:
-    st.session_state["view_user_id"] = None
 
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """独立したAPI呼び出しを並行実行するためのスレッドプール（プロセス内で共有）"""
+    return ThreadPoolExecutor(max_workers=4)
 
-def get_users(page: int = 1, page_size: int = 50):
-    """利用者一覧を取得"""
-    try:
-        response = requests.get(
-            f"{API_BASE_URL}/users",
-            params={"page": page, "page_size": page_size}
-        )
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        st.error(f"利用者情報の取得に失敗しました: {e}")
-        return {"users": [], "total": 0, "page": 1, "page_size": page_size}
+
+# 選択肢（フォーム・絞り込みで共通）と、既定値から index を引くための辞書
+GENDERS = ["男性", "女性", "その他"]
+DISABILITY_TYPES = ["知的障害", "精神障害", "知的障害（発達障害）", "身体障害", "難病"]
+SUPPORT_LEVELS = ["未判定", "区分1", "区分2", "区分3", "区分4", "区分5", "区分6"]
+THERAPY_NOTEBOOK_GRADES = ["未取得", "A", "B1", "B2", "A3"]
+MENTAL_HEALTH_NOTEBOOK_GRADES = ["未取得", "1級", "2級", "3級"]
+
+_GENDER_IDX = {g: i for i, g in enumerate(GENDERS)}
+_SUPPORT_LEVEL_IDX = {s: i for i, s in enumerate(SUPPORT_LEVELS)}
+_THERAPY_GRADE_IDX = {g: i for i, g in enumerate(THERAPY_NOTEBOOK_GRADES)}
+_MENTAL_GRADE_IDX = {g: i for i, g in enumerate(MENTAL_HEALTH_NOTEBOOK_GRADES)}
+
+# セッションステートの初期化
+_SESSION_DEFAULTS = {
+    "selected_user_id": None,
+    "edit_mode": False,
+    "view_user_id": None,
+}
+for _key, _value in _SESSION_DEFAULTS.items():
+    st.session_state.setdefault(_key, _value)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_users(
+    page: int = 1,
+    page_size: int = 50,
+    disability_type: Optional[str] = None,
+    support_level: Optional[str] = None,
+):
+    """
+    利用者一覧を取得（30秒キャッシュ）
+
+    障害種別・支援区分の絞り込みはバックエンド側で行う。
+    失敗時は例外を送出する（例外はキャッシュされない）。エラー表示は呼び出し側で行う。
+    """
+    # 総件数は画面で使わないため数えさせない
+    params = {"page": page, "page_size": page_size, "include_total": False}
+    if disability_type:
+        params["disability_type"] = disability_type
+    if support_level:
+        params["support_level"] = support_level
+
+    response = get_session().get(
+        f"{API_BASE_URL}/users",
+        params=params,
+        timeout=REQUEST_TIMEOUT
+    )
+    response.raise_for_status()
+    return response.json()
 
 
+@st.cache_data(ttl=30, show_spinner=False)
 def get_user_detail(user_id: str):
-    """利用者詳細を取得"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/users/{user_id}")
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        st.error(f"利用者詳細の取得に失敗しました: {e}")
-        return None
+    """
+    利用者詳細を取得（30秒キャッシュ）
+
+    失敗時は例外を送出する（例外はキャッシュされない）。エラー表示は呼び出し側で行う。
+    """
+    response = get_session().get(f"{API_BASE_URL}/users/{user_id}", timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def build_search_index(
+    page: int = 1,
+    page_size: int = 50,
+    disability_type: Optional[str] = None,
+    support_level: Optional[str] = None,
+):
+    """
+    利用者一覧と検索キーの組を作成（30秒キャッシュ）
+
+    Returns:
+        (ひらがな化したふりがな, 小文字化した氏名, 利用者情報) のリスト
+    """
+    users = get_users(page, page_size, disability_type, support_level).get("users", [])
+    return [
+        (kata_to_hira((u.get("kana") or "").lower()), (u.get("name") or "").lower(), u)
+        for u in users
+    ]
+
+
+def request_history(path: str) -> list:
+    """履歴APIからJSONを取得（ワーカースレッドから呼べるよう st.* は使わない。失敗時は例外を送出）"""
+    response = get_session().get(f"{API_BASE_URL}{path}", timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_history_dfs(user_id: str) -> Tuple["pd.DataFrame", "pd.DataFrame"]:
+    """
+    アセスメント履歴・支援計画履歴を取得し表示用のDataFrameを作成（60秒キャッシュ）
+
+    2つの履歴は互いに独立しているため、HTTP取得のみスレッドプールで並行して行う。
+    """
+    # pandasは履歴表示でのみ使うため、ページ初回表示を遅らせないよう遅延インポート
+    import pandas as pd
+
+    executor = get_executor()
+    assessments_future = executor.submit(request_history, f"/assessments/user/{user_id}")
+    plans_future = executor.submit(request_history, f"/plans/user/{user_id}")
+
+    assessment_df = pd.DataFrame([
+        {
+            "実施日": a.get("interview_date", ""),
+            "参加者": a.get("interview_participants", ""),
+            "信頼度": f"{a.get('confidence_score', 0):.0%}" if a.get('confidence_score') else "未分析",
+            "作成日": a.get("created_at", "")[:10] if a.get("created_at") else "",
+            "ID": a.get("assessment_id", "")
+        }
+        for a in assessments_future.result()
+    ])
+    plan_df = pd.DataFrame([
+        {
+            "計画期間": f"{p.get('start_date', '')} 〜 {p.get('end_date', '')}",
+            "長期目標数": len(p.get('long_term_goals', [])),
+            "短期目標数": len(p.get('short_term_goals', [])),
+            "ステータス": p.get('status', ''),
+            "作成日": p.get("created_at", "")[:10] if p.get("created_at") else "",
+            "ID": p.get("plan_id", "")
+        }
+        for p in plans_future.result()
+    ])
+    return assessment_df, plan_df
+
+
+def clear_user_cache():
+    """登録・更新・削除後に利用者情報のキャッシュを破棄"""
+    # 他ページ（アセスメント等）のキャッシュキーを変え、次回表示時に再取得させる
+    st.session_state["users_updated_at"] = time.time()
+    get_users.clear()
+    get_user_detail.clear()
+    build_search_index.clear()
+    get_history_dfs.clear()
 
 
 def check_duplicate_user(name: str, birth_date: str, exclude_user_id: str = None) -> Optional[Dict[str, Any]]:
@@ -102,20 +237,21 @@ def check_duplicate_user(name: str, birth_date: str, exclude_user_id: str = None
         重複するユーザー情報、または None
     """
     try:
-        response = requests.get(f"{API_BASE_URL}/users", params={"page": 1, "page_size": 1000})
-        response.raise_for_status()
-        all_users = response.json().get("users", [])
-
-        for user in all_users:
+        params = {"name": name, "birth_date": birth_date}
+        if exclude_user_id:
             # 編集時は自分自身を除外
-            if exclude_user_id and user.get("user_id") == exclude_user_id:
-                continue
+            params["exclude_user_id"] = exclude_user_id
 
-            # 氏名と生年月日が一致する場合は重複
-            if user.get("name") == name and user.get("birth_date") == birth_date:
-                return user
-
-        return None
+        # 氏名と生年月日が一致する利用者をサーバー側で検索
+        response = get_session().get(
+            f"{API_BASE_URL}/users/lookup",
+            params=params,
+            timeout=REQUEST_TIMEOUT
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
     except Exception as e:
         st.warning(f"重複チェック中にエラーが発生しました: {e}")
         return None
@@ -124,8 +260,9 @@ def check_duplicate_user(name: str, birth_date: str, exclude_user_id: str = None
 def create_user(user_data: Dict[str, Any]):
     """利用者を登録"""
     try:
-        response = requests.post(f"{API_BASE_URL}/users", json=user_data)
+        response = get_session().post(f"{API_BASE_URL}/users", json=user_data, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
+        clear_user_cache()
         return response.json()
     except Exception as e:
         st.error(f"利用者登録に失敗しました: {e}")
@@ -135,8 +272,9 @@ def create_user(user_data: Dict[str, Any]):
 def update_user(user_id: str, user_data: Dict[str, Any]):
     """利用者情報を更新"""
     try:
-        response = requests.put(f"{API_BASE_URL}/users/{user_id}", json=user_data)
+        response = get_session().put(f"{API_BASE_URL}/users/{user_id}", json=user_data, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
+        clear_user_cache()
         return response.json()
     except Exception as e:
         st.error(f"利用者情報の更新に失敗しました: {e}")
@@ -146,8 +284,9 @@ def update_user(user_id: str, user_data: Dict[str, Any]):
 def delete_user(user_id: str):
     """利用者を削除"""
     try:
-        response = requests.delete(f"{API_BASE_URL}/users/{user_id}")
+        response = get_session().delete(f"{API_BASE_URL}/users/{user_id}", timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
+        clear_user_cache()
         return response.json()
     except Exception as e:
         st.error(f"利用者の削除に失敗しました: {e}")
@@ -156,12 +295,13 @@ def delete_user(user_id: str):
 
 def render_user_form(user_data: Optional[Dict[str, Any]] = None, is_edit: bool = False):
     """利用者登録・編集フォーム"""
+    today = date.today()
 
     # デフォルト値設定
     if user_data:
         default_name = user_data.get("name", "")
         default_kana = user_data.get("kana", "")
-        default_birth_date = datetime.strptime(user_data.get("birth_date", "2000-01-01"), "%Y-%m-%d").date()
+        default_birth_date = date.fromisoformat(user_data.get("birth_date", "2000-01-01")[:10])
         default_gender = user_data.get("gender", "その他")
         default_disability_types = user_data.get("disability_types", "").split(", ") if user_data.get("disability_types") else []
         default_support_level = user_data.get("support_level", "未判定")
@@ -205,25 +345,25 @@ def render_user_form(user_data: Optional[Dict[str, Any]] = None, is_edit: bool =
                 "生年月日",
                 value=default_birth_date,
                 min_value=date(1920, 1, 1),
-                max_value=date.today()
+                max_value=today
             )
             gender = st.selectbox(
                 "性別",
-                ["男性", "女性", "その他"],
-                index=["男性", "女性", "その他"].index(default_gender) if default_gender in ["男性", "女性", "その他"] else 2
+                GENDERS,
+                index=_GENDER_IDX.get(default_gender, 2)
             )
 
         with col2:
             disability_types = st.multiselect(
                 "障害種別（必須・複数選択可）",
-                ["知的障害", "精神障害", "知的障害（発達障害）", "身体障害", "難病"],
+                DISABILITY_TYPES,
                 default=default_disability_types,
                 help="最低1つは選択してください"
             )
             support_level = st.selectbox(
                 "障害支援区分",
-                ["未判定", "区分1", "区分2", "区分3", "区分4", "区分5", "区分6"],
-                index=["未判定", "区分1", "区分2", "区分3", "区分4", "区分5", "区分6"].index(default_support_level) if default_support_level in ["未判定", "区分1", "区分2", "区分3", "区分4", "区分5", "区分6"] else 0
+                SUPPORT_LEVELS,
+                index=_SUPPORT_LEVEL_IDX.get(default_support_level, 0)
             )
 
         st.subheader("手帳情報")
@@ -238,11 +378,9 @@ def render_user_form(user_data: Optional[Dict[str, Any]] = None, is_edit: bool =
             )
             therapy_notebook_grade = st.selectbox(
                 "療育手帳等級",
-                ["未取得", "A", "B1", "B2", "A3"],
-                index=0 if not therapy_notebook else (
-                    ["未取得", "A", "B1", "B2", "A3"].index(user_data.get("therapy_notebook_grade", "未取得"))
-                    if user_data and user_data.get("therapy_notebook_grade") in ["未取得", "A", "B1", "B2", "A3"]
-                    else 0
+                THERAPY_NOTEBOOK_GRADES,
+                index=0 if not therapy_notebook or not user_data else (
+                    _THERAPY_GRADE_IDX.get(user_data.get("therapy_notebook_grade"), 0)
                 ),
                 disabled=not therapy_notebook
             )
@@ -255,11 +393,9 @@ def render_user_form(user_data: Optional[Dict[str, Any]] = None, is_edit: bool =
             )
             mental_health_notebook_grade = st.selectbox(
                 "精神保健福祉手帳等級",
-                ["未取得", "1級", "2級", "3級"],
-                index=0 if not mental_health_notebook else (
-                    ["未取得", "1級", "2級", "3級"].index(user_data.get("mental_health_notebook_grade", "未取得"))
-                    if user_data and user_data.get("mental_health_notebook_grade") in ["未取得", "1級", "2級", "3級"]
-                    else 0
+                MENTAL_HEALTH_NOTEBOOK_GRADES,
+                index=0 if not mental_health_notebook or not user_data else (
+                    _MENTAL_GRADE_IDX.get(user_data.get("mental_health_notebook_grade"), 0)
                 ),
                 disabled=not mental_health_notebook
             )
@@ -270,16 +406,16 @@ def render_user_form(user_data: Optional[Dict[str, Any]] = None, is_edit: bool =
                 default_expiry = None
                 if user_data and user_data.get("mental_health_notebook_expiry"):
                     try:
-                        default_expiry = datetime.strptime(
-                            user_data.get("mental_health_notebook_expiry"), "%Y-%m-%d"
-                        ).date()
-                    except:
+                        default_expiry = date.fromisoformat(
+                            user_data.get("mental_health_notebook_expiry")[:10]
+                        )
+                    except ValueError:
                         default_expiry = None
 
                 mental_health_notebook_expiry = st.date_input(
                     "有効期限",
-                    value=default_expiry if default_expiry else date.today(),
-                    min_value=date.today(),
+                    value=default_expiry if default_expiry else today,
+                    min_value=today,
                     help="精神保健福祉手帳の有効期限（通常2年間）"
                 )
 
@@ -324,7 +460,7 @@ def render_user_form(user_data: Optional[Dict[str, Any]] = None, is_edit: bool =
                 return None
 
             # 重複チェック（新規登録時のみ、または編集時は自分以外）
-            birth_date_str = birth_date.strftime("%Y-%m-%d")
+            birth_date_str = birth_date.isoformat()
             exclude_id = user_data.get("user_id") if user_data else None
             duplicate_user = check_duplicate_user(name, birth_date_str, exclude_user_id=exclude_id)
 
@@ -341,7 +477,7 @@ def render_user_form(user_data: Optional[Dict[str, Any]] = None, is_edit: bool =
             user_data_dict = {
                 "name": name,
                 "kana": kana_hira,
-                "birth_date": birth_date.strftime("%Y-%m-%d"),
+                "birth_date": birth_date_str,
                 "gender": gender if gender else None,
                 "disability_type": ", ".join(disability_types) if disability_types else "未設定",  # 必須フィールド
                 "support_level": support_level if support_level else None,
@@ -349,7 +485,7 @@ def render_user_form(user_data: Optional[Dict[str, Any]] = None, is_edit: bool =
                 "therapy_notebook_grade": therapy_notebook_grade if therapy_notebook and therapy_notebook_grade != "未取得" else None,
                 "mental_health_notebook": mental_health_notebook,
                 "mental_health_notebook_grade": mental_health_notebook_grade if mental_health_notebook and mental_health_notebook_grade != "未取得" else None,
-                "mental_health_notebook_expiry": mental_health_notebook_expiry.strftime("%Y-%m-%d") if mental_health_notebook and mental_health_notebook_expiry else None,
+                "mental_health_notebook_expiry": mental_health_notebook_expiry.isoformat() if mental_health_notebook and mental_health_notebook_expiry else None,
                 "contact_address": address if address else None,  # addressではなくcontact_address
                 "contact_phone": phone if phone else None,  # phoneではなくcontact_phone
                 "guardian_name": guardian_name if guardian_name else None,
@@ -371,11 +507,6 @@ def render_user_list():
         st.success(st.session_state["delete_success_message"])
         del st.session_state["delete_success_message"]
 
-    # 検索フィルター
-    # 利用者一覧取得（フィルタリング前に全件取得）
-    users_data = get_users()
-    all_users = users_data.get("users", [])
-
     # 左右2列レイアウト
     left_col, right_col = st.columns([1, 2])
 
@@ -385,13 +516,13 @@ def render_user_list():
         # 障害種別で絞り込み
         filter_disability = st.selectbox(
             "障害種別",
-            ["すべて", "知的障害", "精神障害", "知的障害（発達障害）", "身体障害", "難病"]
+            ["すべて", *DISABILITY_TYPES]
         )
 
         # 支援区分で絞り込み
         filter_support_level = st.selectbox(
             "支援区分",
-            ["すべて", "未判定", "区分1", "区分2", "区分3", "区分4", "区分5", "区分6"]
+            ["すべて", *SUPPORT_LEVELS]
         )
 
         # 氏名検索（テキスト入力）
@@ -402,36 +533,32 @@ def render_user_list():
             key="user_search_input"
         )
 
-    # フィルタリング処理
-    filtered_users = all_users
-
-    # 障害種別でフィルタリング
-    if filter_disability != "すべて":
-        temp_users = []
-        for u in filtered_users:
-            # APIからはdisability_type（単数形）で返される
-            disability_type_str = u.get("disability_type", "")
-            if disability_type_str:
-                disability_list = [d.strip() for d in disability_type_str.split(",")]
-                if filter_disability in disability_list:
-                    temp_users.append(u)
-        filtered_users = temp_users
-
-    # 支援区分でフィルタリング
-    if filter_support_level != "すべて":
-        filtered_users = [u for u in filtered_users if filter_support_level == u.get("support_level", "")]
+    # 利用者一覧取得（障害種別・支援区分はバックエンドで絞り込み）
+    try:
+        search_index = build_search_index(
+            disability_type=None if filter_disability == "すべて" else filter_disability,
+            support_level=None if filter_support_level == "すべて" else filter_support_level,
+        )
+    except Exception as e:
+        st.error(f"利用者情報の取得に失敗しました: {e}")
+        search_index = []
+
+    # フィルタリング処理（検索キーは build_search_index で事前計算済み）
+    filtered_entries = search_index
 
     # 氏名でフィルタリング（ふりがなでの曖昧検索）
     if search_name:
         search_name_hira = kata_to_hira(search_name.lower())
         # ふりがな（kana）フィールドで検索（ひらがな・カタカナ両方に対応）
         # 例: 「さ」を入力すると「さとうたろう」または「サトウタロウ」が検索される
-        filtered_users = [
-            u for u in filtered_users
-            if search_name_hira in kata_to_hira((u.get("kana") or "").lower()) or  # ふりがなで検索（カタカナ→ひらがな変換）
-               search_name_hira in (u.get("name") or "").lower()      # 氏名でも検索
+        filtered_entries = [
+            (kana_key, name_key, u) for kana_key, name_key, u in filtered_entries
+            if search_name_hira in kana_key or  # ふりがなで検索（カタカナ→ひらがな変換済み）
+               search_name_hira in name_key     # 氏名でも検索
         ]
 
+    filtered_users = [entry[2] for entry in filtered_entries]
+
     # 右側に候補リスト表示
     with right_col:
         st.subheader(f"📋 該当利用者 ({len(filtered_users)}件)")
@@ -439,58 +566,68 @@ def render_user_list():
         if not filtered_users:
             st.info("該当する利用者がいません")
         else:
-            # シンプルなテーブル形式で表示
-            st.markdown("クリックして選択してください")
-
-            for idx, user in enumerate(filtered_users):
-                # 1行ずつ表示（クリック可能）
-                col1, col2, col3, col4, col5, col6 = st.columns([2, 2, 1, 2, 2, 2.5])
-
-                with col1:
-                    st.write(f"**{user['name']}**")
-                with col2:
-                    kana = user.get('kana') or '未登録'
-                    st.caption(f"({kana})")
-                with col3:
-                    st.write(f"{user['age']}歳")
-                with col4:
+            # 一覧は1つの表ウィジェットで描画し、操作ボタンは選択行に対してのみ表示
+            st.markdown("行をクリックして選択してください")
+
+            user_rows = [
+                {
+                    "氏名": user["name"],
+                    "ふりがな": user.get("kana") or "未登録",
+                    "年齢": user.get("age"),
                     # APIからはdisability_type（単数形）で返される
-                    disability = user.get('disability_type', '未設定')
-                    if len(disability) > 10:
-                        st.write(disability[:10] + "...")
-                    else:
-                        st.write(disability)
-                with col5:
-                    st.write(user.get('support_level', '未判定'))
-                with col6:
-                    action_col1, action_col2, action_col3, action_col4 = st.columns(4)
-                    with action_col1:
-                        if st.button("👁️", key=f"view_{user['user_id']}", help="詳細"):
-                            st.session_state["view_user_id"] = user["user_id"]
-                            st.rerun()
-                    with action_col2:
-                        if st.button("✏️", key=f"edit_{user['user_id']}", help="編集"):
-                            st.session_state["selected_user_id"] = user["user_id"]
-                            st.session_state["edit_mode"] = True
-                            st.rerun()
-                    with action_col3:
-                        if st.button("📊", key=f"assess_{user['user_id']}", help="アセスメント"):
-                            st.session_state["selected_user_id"] = user["user_id"]
-                            st.switch_page("pages/2_📊_Assessment.py")
-                    with action_col4:
-                        if st.button("🗑️", key=f"delete_{user['user_id']}", help="削除"):
-                            st.session_state["confirm_delete_list_user_id"] = user["user_id"]
-                            st.rerun()
+                    "障害種別": user.get("disability_type", "未設定"),
+                    "支援区分": user.get("support_level", "未判定"),
+                }
+                for user in filtered_users
+            ]
+            # 選択は行番号で返るため、表示中の利用者が変わったら（絞り込み変更・削除後）
+            # 表のキーを変えて選択を解除し、別の利用者を指さないようにする
+            listed_ids = hashlib.md5(
+                "\n".join(user["user_id"] for user in filtered_users).encode()
+            ).hexdigest()[:12]
+            event = st.dataframe(
+                user_rows,
+                use_container_width=True,
+                hide_index=True,
+                on_select="rerun",
+                selection_mode="single-row",
+                key=f"user_list_table_{listed_ids}",
+            )
 
-                # 削除確認ダイアログ（この利用者行の下に表示）
-                if st.session_state.get("confirm_delete_list_user_id") == user["user_id"]:
-                    st.warning(f"⚠️ 本当に **{user['name']}** さんを削除しますか？この操作は取り消せません。")
+            selected_rows = [i for i in event.selection.rows if i < len(filtered_users)]
+            if selected_rows:
+                user = filtered_users[selected_rows[0]]
+                user_id = user["user_id"]
+                user_name = user["name"]
+
+                st.write(f"**{user_name}** さんを選択中")
+                action_col1, action_col2, action_col3, action_col4 = st.columns(4)
+                with action_col1:
+                    if st.button("👁️ 詳細", key=f"view_{user_id}", use_container_width=True):
+                        st.session_state["view_user_id"] = user_id
+                        st.rerun()
+                with action_col2:
+                    if st.button("✏️ 編集", key=f"edit_{user_id}", use_container_width=True):
+                        st.session_state["selected_user_id"] = user_id
+                        st.session_state["edit_mode"] = True
+                        st.rerun()
+                with action_col3:
+                    if st.button("📊 アセスメント", key=f"assess_{user_id}", use_container_width=True):
+                        st.session_state["selected_user_id"] = user_id
+                        st.switch_page("pages/2_📊_Assessment.py")
+                with action_col4:
+                    if st.button("🗑️ 削除", key=f"delete_{user_id}", use_container_width=True):
+                        st.session_state["confirm_delete_list_user_id"] = user_id
+                        st.rerun()
+
+                # 削除確認ダイアログ（選択中の利用者の下に表示）
+                if st.session_state.get("confirm_delete_list_user_id") == user_id:
+                    st.warning(f"⚠️ 本当に **{user_name}** さんを削除しますか？この操作は取り消せません。")
                     confirm_col1, confirm_col2, confirm_col3 = st.columns([1, 1, 4])
 
                     with confirm_col1:
-                        if st.button("✓ 削除実行", type="primary", key=f"confirm_delete_{user['user_id']}", use_container_width=True):
-                            user_name = user['name']
-                            result = delete_user(user["user_id"])
+                        if st.button("✓ 削除実行", type="primary", key=f"confirm_delete_{user_id}", use_container_width=True):
+                            result = delete_user(user_id)
                             # 削除処理完了後、セッションステートをクリアして即座にリロード
                             st.session_state["confirm_delete_list_user_id"] = None
                             if result:
@@ -498,17 +635,18 @@ def render_user_list():
                             st.rerun()
 
                     with confirm_col2:
-                        if st.button("✗ キャンセル", key=f"cancel_delete_{user['user_id']}", use_container_width=True):
+                        if st.button("✗ キャンセル", key=f"cancel_delete_{user_id}", use_container_width=True):
                             st.session_state["confirm_delete_list_user_id"] = None
                             st.rerun()
 
-                if idx < len(filtered_users) - 1:
-                    st.divider()
-
 
 def render_user_detail(user_id: str):
     """利用者詳細表示"""
-    user = get_user_detail(user_id)
+    try:
+        user = get_user_detail(user_id)
+    except Exception as e:
+        st.error(f"利用者詳細の取得に失敗しました: {e}")
+        user = None
 
     if not user:
         st.error("利用者情報が見つかりません")
@@ -560,10 +698,8 @@ def render_user_detail(user_id: str):
 
                 # 有効期限警告
                 try:
-                    from datetime import datetime
-                    expiry_date = datetime.strptime(expiry_date_str, "%Y-%m-%d").date()
-                    today = datetime.now().date()
-                    days_until = (expiry_date - today).days
+                    expiry_date = date.fromisoformat(expiry_date_str)
+                    days_until = (expiry_date - date.today()).days
 
                     if days_until < 0:
                         expiry_info += " ⚠️期限切れ"
@@ -580,56 +716,31 @@ def render_user_detail(user_id: str):
 
     st.markdown("---")
 
-    # アセスメント履歴
-    st.write("### 📊 アセスメント履歴")
+    # アセスメント履歴・支援計画履歴（取得はまとめて行い、キャッシュする）
     try:
-        assessments_response = requests.get(f"{API_BASE_URL}/assessments/user/{user_id}")
-        if assessments_response.status_code == 200:
-            assessments = assessments_response.json()
-            if assessments:
-                assessment_df = pd.DataFrame([
-                    {
-                        "実施日": a.get("interview_date", ""),
-                        "参加者": a.get("interview_participants", ""),
-                        "信頼度": f"{a.get('confidence_score', 0):.0%}" if a.get('confidence_score') else "未分析",
-                        "作成日": a.get("created_at", "")[:10] if a.get("created_at") else "",
-                        "ID": a.get("assessment_id", "")
-                    }
-                    for a in assessments
-                ])
-                st.dataframe(assessment_df, use_container_width=True, hide_index=True)
-            else:
-                st.info("アセスメント履歴がありません")
-        else:
-            st.warning("アセスメント履歴の取得に失敗しました")
+        assessment_df, plan_df = get_history_dfs(user_id)
+    except requests.HTTPError:
+        st.warning("履歴の取得に失敗しました")
+        assessment_df = plan_df = None
     except Exception as e:
         st.error(f"エラー: {str(e)}")
+        assessment_df = plan_df = None
+
+    # アセスメント履歴
+    st.write("### 📊 アセスメント履歴")
+    if assessment_df is not None:
+        if not assessment_df.empty:
+            st.dataframe(assessment_df, use_container_width=True, hide_index=True)
+        else:
+            st.info("アセスメント履歴がありません")
 
     # 支援計画履歴
     st.write("### 🎯 支援計画履歴")
-    try:
-        plans_response = requests.get(f"{API_BASE_URL}/plans/user/{user_id}")
-        if plans_response.status_code == 200:
-            plans = plans_response.json()
-            if plans:
-                plan_df = pd.DataFrame([
-                    {
-                        "計画期間": f"{p.get('start_date', '')} 〜 {p.get('end_date', '')}",
-                        "長期目標数": len(p.get('long_term_goals', [])),
-                        "短期目標数": len(p.get('short_term_goals', [])),
-                        "ステータス": p.get('status', ''),
-                        "作成日": p.get("created_at", "")[:10] if p.get("created_at") else "",
-                        "ID": p.get("plan_id", "")
-                    }
-                    for p in plans
-                ])
-                st.dataframe(plan_df, use_container_width=True, hide_index=True)
-            else:
-                st.info("支援計画履歴がありません")
+    if plan_df is not None:
+        if not plan_df.empty:
+            st.dataframe(plan_df, use_container_width=True, hide_index=True)
         else:
-            st.warning("支援計画履歴の取得に失敗しました")
-    except Exception as e:
-        st.error(f"エラー: {str(e)}")
+            st.info("支援計画履歴がありません")
 
     # アクションボタン
     st.markdown("---")
@@ -736,7 +847,11 @@ with tab2:
 
 with tab3:
     if st.session_state.get("edit_mode") and st.session_state.get("selected_user_id"):
-        user = get_user_detail(st.session_state["selected_user_id"])
+        try:
+            user = get_user_detail(st.session_state["selected_user_id"])
+        except Exception as e:
+            st.error(f"利用者詳細の取得に失敗しました: {e}")
+            user = None
 
         if user:
             st.subheader(f"✏️ {user['name']} さんの情報を編集")
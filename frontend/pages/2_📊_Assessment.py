@@ -4,39 +4,200 @@
 """
 import streamlit as st
 import requests
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import date
+from typing import Optional
+from pathlib import Path
 from loguru import logger
 
 
+# カタカナ（ァ-ヶ）→ひらがなの変換テーブル
+_KATA_TABLE = {c: c - 96 for c in range(ord('ァ'), ord('ヶ') + 1)}
+
+
 def kata_to_hira(text: str) -> str:
     """カタカナをひらがなに変換"""
-    if not text:
-        return ""
-    return "".join(
-        chr(ord(c) - 96) if 'ァ' <= c <= 'ヶ' else c
-        for c in text
-    )
+    return text.translate(_KATA_TABLE) if text else ""
+
+
+SELECT_OFFSET_CSS_PATH = Path(__file__).parent.parent / "static" / "select_offset.css"
+
+
+@st.cache_data
+def load_css() -> str:
+    """セレクトボックスの表示位置を調整するCSSを読み込む"""
+    return SELECT_OFFSET_CSS_PATH.read_text(encoding="utf-8")
 
 
 # ページ設定
 st.set_page_config(page_title="アセスメント", page_icon="📊", layout="wide")
 
 # CSSでセレクトボックスのドロップダウンリストを右にオフセット
-st.markdown("""
-<style>
-    /* セレクトボックスのドロップダウンメニューを右に200pxずらす（約5cm） */
-    div[data-baseweb="select"] > div:last-child {
-        margin-left: 200px !important;
-    }
-    /* ドロップダウンリストの幅を調整 */
-    div[data-baseweb="popover"] {
-        margin-left: 200px !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+st.html(f"<style>{load_css()}</style>")
 
 # API設定
 API_BASE_URL = "http://localhost:8000/api"
+# リクエストボディは orjson で直列化して送るため Content-Type を明示する
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """APIサーバーとの接続を使い回すためのHTTPセッション（プロセス内で共有）"""
+    session = requests.Session()
+    # 一時的な接続エラー・5xxは短い間隔で再試行する
+    # （POSTはアセスメントの重複作成を避けるため再試行しない）
+    retries = Retry(
+        total=1,
+        backoff_factor=0.1,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+    )
+    session.mount(
+        "http://",
+        HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries)
+    )
+    session.headers.update({"Accept": "application/json"})
+    return session
+
+
+def request_followup_questions(interview_content: str) -> dict:
+    """追加質問の生成をAPIに依頼（ワーカースレッドから呼べるよう st.* は使わない。失敗時は例外を送出）"""
+    response = get_session().post(
+        f"{API_BASE_URL}/assessments/followup-questions",
+        data=orjson.dumps({"interview_content": interview_content}),
+        headers=JSON_HEADERS,
+        timeout=30
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_followup_questions(interview_content: str, _pending: Optional[Future] = None) -> dict:
+    """
+    ヒアリング内容に対する追加質問を生成（5分キャッシュ）
+
+    同じヒアリング内容で再実行した場合はAPIを呼び直さない。
+    _pending に先行して投入した request_followup_questions を渡すと、その結果を待って使う
+    （先頭が _ の引数はキャッシュキーに含まれない）。
+    失敗時は例外を送出する（例外はキャッシュされない）。エラー表示は呼び出し側で行う。
+    """
+    if _pending is not None:
+        return _pending.result()
+    return request_followup_questions(interview_content)
+
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """独立したAPI呼び出しを並行実行するためのスレッドプール（プロセス内で共有）"""
+    return ThreadPoolExecutor(max_workers=4)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_users(page: int = 1, page_size: int = 100, updated_at: float = 0.0) -> list:
+    """
+    利用者一覧を取得（60秒キャッシュ）
+
+    入力のたびに発生する再実行でAPIを呼び直さないようにキャッシュする。
+    updated_at には利用者管理ページで登録・更新した時刻を渡し、変更後は再取得させる。
+    失敗時は例外を送出する（例外はキャッシュされない）。エラー表示は呼び出し側で行う。
+    """
+    response = get_session().get(
+        f"{API_BASE_URL}/users",
+        params={"page": page, "page_size": page_size},
+        timeout=10
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content).get("users", [])
+
+
+@dataclass(frozen=True, slots=True)
+class UserRow:
+    """利用者選択・基本情報表示に使う項目のみを保持する利用者情報"""
+
+    user_id: str
+    name: str
+    kana: str
+    age: Optional[int]
+    disability_type: Optional[str]
+    support_level: Optional[str]
+    living_situation: Optional[str]
+    contact_phone: Optional[str]
+
+    @classmethod
+    def from_dict(cls, user: dict) -> "UserRow":
+        return cls(
+            user_id=user["user_id"],
+            name=user["name"],
+            kana=user.get("kana") or "",
+            age=user.get("age"),
+            disability_type=user.get("disability_type"),
+            support_level=user.get("support_level"),
+            living_situation=user.get("living_situation"),
+            contact_phone=user.get("contact_phone"),
+        )
+
+
+# 戻り値は再実行ごとに複製せず参照で共有する（UserRow は不変）
+@st.cache_resource(ttl=60, show_spinner=False)
+def build_user_options(page: int = 1, page_size: int = 100, updated_at: float = 0.0):
+    """
+    セレクトボックス用の選択肢を作成（60秒キャッシュ）
+
+    Returns:
+        (利用者ID→UserRow, 選択肢の表示名→利用者ID) の組
+    """
+    user_by_id = {}
+    # 表示文字列にひらがなも含めることで、ひらがな入力でも検索可能にする
+    user_select_options = {"選択してください": None}
+
+    for user in map(UserRow.from_dict, get_users(page, page_size, updated_at)):
+        # カタカナとひらがな両方を含む検索用文字列
+        kana = user.kana
+        hira = kata_to_hira(kana)
+        if hira == kana:
+            # ふりがなが空・ひらがなのみの場合は同じ表記を重ねない
+            display_name = f"{user.name}（{kana}） {user.age}歳"
+        else:
+            # 表示用の文字列（カタカナとひらがな両方を含める）
+            display_name = f"{user.name}（{kana} {hira}） {user.age}歳"
+        user_select_options[display_name] = user.user_id
+        user_by_id[user.user_id] = user
+
+    return user_by_id, user_select_options
+
+
+def render_numbered(items: list):
+    """番号付きリストを1つのMarkdown要素としてまとめて表示"""
+    st.markdown("\n\n".join(f"**{i}.** {item}" for i, item in enumerate(items, 1)))
+
+
+# ヒアリング項目（見出し, 入力欄のキー）。順序はAIに渡すヒアリング内容の並び順を兼ねる
+INTERVIEW_SECTIONS = (
+    ("本人の希望・目標", "user_wishes"),
+    ("家族の希望・心配事", "family_wishes"),
+    ("本人の強み・得意なこと", "strengths_input"),
+    ("生活状況・日常生活", "daily_life"),
+    ("支援が必要な課題", "challenges_input"),
+    ("社会参加・人との関わり", "social_participation"),
+    ("現在利用しているサービス", "current_services"),
+    ("健康状態・医療的ケア", "health_status"),
+    ("その他・特記事項", "other_notes"),
+)
+
+# ICF分類の項目（キー, 表示名）
+ICF_LABELS = (
+    ("body_functions", "心身機能"),
+    ("activities", "活動"),
+    ("participation", "参加"),
+    ("environmental_factors", "環境因子"),
+    ("personal_factors", "個人因子"),
+)
 
 # セッション状態の初期化
 if "selected_user_id" not in st.session_state:
@@ -49,99 +210,83 @@ if "assessment_id" not in st.session_state:
 # ページタイトル
 st.title("📊 アセスメント")
 
+@st.fragment
+def render_navigation():
+    """クイックナビゲーション（ボタン操作でページ全体を再実行しないようフラグメント化）"""
+    col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
+    with col1:
+        if st.button("👤 利用者管理", use_container_width=True):
+            st.switch_page("pages/1_👤_User_Management.py")
+    with col2:
+        if st.button("🎯 支援計画", use_container_width=True):
+            st.switch_page("pages/3_🎯_Plan_Creation.py")
+    with col3:
+        if st.button("🏥 施設検索", use_container_width=True):
+            st.switch_page("pages/4_🏥_Facility_Search.py")
+    with col4:
+        if st.button("📈 モニタリング", use_container_width=True):
+            st.switch_page("pages/4_📊_Monitoring.py")
+
+
 # クイックナビゲーション
-col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
-with col1:
-    if st.button("👤 利用者管理", use_container_width=True):
-        st.switch_page("pages/1_👤_User_Management.py")
-with col2:
-    if st.button("🎯 支援計画", use_container_width=True):
-        st.switch_page("pages/3_🎯_Plan_Creation.py")
-with col3:
-    if st.button("🏥 施設検索", use_container_width=True):
-        st.switch_page("pages/4_🏥_Facility_Search.py")
-with col4:
-    if st.button("📈 モニタリング", use_container_width=True):
-        st.switch_page("pages/4_📊_Monitoring.py")
+render_navigation()
 
 st.markdown("---")
 
 # 利用者選択セクション
 st.header("1️⃣ 利用者選択")
 
+# 利用者登録直後など、最新の一覧が必要な場合にキャッシュを破棄
+if st.button("🔄 再読込", key="reload_users"):
+    get_users.clear()
+    build_user_options.clear()
+
 try:
     # 利用者一覧を取得
-    response = requests.get(
-        f"{API_BASE_URL}/users",
-        params={"page": 1, "page_size": 100},
-        timeout=10
-    )
-
-    if response.status_code == 200:
-        users_data = response.json()
-        all_users = users_data.get("users", [])
+    # 利用者管理ページで登録・更新があった場合は最新の一覧を取得する
+    users_updated_at = st.session_state.get("users_updated_at", 0.0)
+    all_users = get_users(page=1, page_size=100, updated_at=users_updated_at)
+
+    if all_users:
+        # 利用者を名前とふりがなで選択できるようにする
+        user_by_id, user_select_options = build_user_options(
+            page=1, page_size=100, updated_at=users_updated_at
+        )
 
-        if all_users:
-            # 利用者を名前とふりがなで選択できるようにする
-            # セレクトボックスの選択肢に「氏名（ふりがな）年齢」を表示
-            user_options = {
-                f"{user['name']}（{user.get('kana', '')}） {user['age']}歳": user
-                for user in all_users
-            }
+        st.caption(f"登録利用者数: {len(all_users)}件")
 
-            st.caption(f"登録利用者数: {len(all_users)}件")
-
-            # セレクトボックスによる選択（曖昧検索対応）
-            st.caption("💡 セレクトボックスで氏名やふりがなの一部を入力すると絞り込めます（例: す、すずき、鈴木）")
-
-            # セレクトボックス用のオプションを作成（ひらがな検索対応）
-            # 表示文字列にひらがなも含めることで、ひらがな入力でも検索可能にする
-            user_select_options = {}
-            user_select_options["選択してください"] = None
-
-            for user in all_users:
-                # カタカナとひらがな両方を含む検索用文字列
-                kana = user.get('kana', '')
-                hira = kata_to_hira(kana)
-                # 表示用の文字列（カタカナとひらがな両方を含める）
-                display_name = f"{user['name']}（{kana} {hira}） {user['age']}歳"
-                # 元の表示名もマッピングに追加（既存のuser_optionsとの互換性のため）
-                original_display = f"{user['name']}（{kana}） {user['age']}歳"
-                user_select_options[display_name] = original_display
-                # 既存のuser_optionsも保持
-                user_options[original_display] = user
-
-            # セレクトボックス（Streamlitの標準検索機能を使用）
-            selected_search_name = st.selectbox(
-                "利用者選択",
-                options=list(user_select_options.keys()),
-                key="user_select"
-            )
+        # セレクトボックスによる選択（曖昧検索対応）
+        st.caption("💡 セレクトボックスで氏名やふりがなの一部を入力すると絞り込めます（例: す、すずき、鈴木）")
 
-            if selected_search_name != "選択してください":
-                # 元の表示名を取得
-                original_display_name = user_select_options[selected_search_name]
-                selected_user = user_options[original_display_name]
-                st.session_state.selected_user_id = selected_user["user_id"]
-                st.session_state.selected_user_name = selected_user["name"]
-
-                # 選択された利用者の基本情報を表示
-                with st.expander("📝 利用者基本情報", expanded=True):
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.write(f"**氏名**: {selected_user['name']}")
-                        st.write(f"**年齢**: {selected_user.get('age')}歳")
-                    with col2:
-                        st.write(f"**障害種別**: {selected_user.get('disability_type')}")
-                        st.write(f"**支援区分**: {selected_user.get('support_level')}")
-                    with col3:
-                        st.write(f"**居住状況**: {selected_user.get('living_situation')}")
-                        st.write(f"**電話番号**: {selected_user.get('contact_phone')}")
-        else:
-            st.warning("⚠️ 登録されている利用者がいません。先に利用者登録を行ってください。")
+        # セレクトボックス（Streamlitの標準検索機能を使用）
+        selected_search_name = st.selectbox(
+            "利用者選択",
+            options=list(user_select_options.keys()),
+            key="user_select"
+        )
 
+        if selected_search_name != "選択してください":
+            # 選択肢に対応する利用者IDから利用者情報を取得
+            selected_user = user_by_id[user_select_options[selected_search_name]]
+            # 選択が変わった場合のみセッション状態を更新
+            if st.session_state.selected_user_id != selected_user.user_id:
+                st.session_state.selected_user_id = selected_user.user_id
+                st.session_state.selected_user_name = selected_user.name
+
+            # 選択された利用者の基本情報を表示
+            with st.expander("📝 利用者基本情報", expanded=True):
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.write(f"**氏名**: {selected_user.name}")
+                    st.write(f"**年齢**: {selected_user.age}歳")
+                with col2:
+                    st.write(f"**障害種別**: {selected_user.disability_type}")
+                    st.write(f"**支援区分**: {selected_user.support_level}")
+                with col3:
+                    st.write(f"**居住状況**: {selected_user.living_situation}")
+                    st.write(f"**電話番号**: {selected_user.contact_phone}")
     else:
-        st.error(f"利用者一覧の取得に失敗しました: {response.text}")
+        st.warning("⚠️ 登録されている利用者がいません。先に利用者登録を行ってください。")
 
 except Exception as e:
     st.error(f"エラー: {e}")
@@ -153,141 +298,128 @@ if st.session_state.selected_user_id:
 
     st.info(f"**対象利用者**: {st.session_state.selected_user_name}")
 
-    # アセスメント情報入力
-    interview_date = st.date_input("ヒアリング実施日", value=date.today())
-
-    interview_participants = st.text_input(
-        "ヒアリング参加者",
-        placeholder="例: 本人、家族（母）、相談支援専門員",
-        help="面談に参加した方を記載してください"
-    )
+    # 入力中の再実行を抑えるため、送信ボタンが押されるまで入力をまとめて保持する
+    with st.form("assessment_form"):
+        # アセスメント情報入力
+        interview_date = st.date_input("ヒアリング実施日", value=date.today())
 
-    st.subheader("📝 ヒアリング内容")
-    st.caption("各項目について聞き取った内容を入力してください")
-
-    # 本人の希望
-    with st.expander("💭 本人の希望・目標", expanded=True):
-        st.caption("本人がどのような生活を送りたいか、何を目指しているか")
-        user_wishes = st.text_area(
-            "本人の希望",
-            height=100,
-            placeholder="例：\n- 働きたい\n- 一人暮らしをしたい\n- 友達を作りたい",
-            key="user_wishes",
-            label_visibility="collapsed"
+        interview_participants = st.text_input(
+            "ヒアリング参加者",
+            placeholder="例: 本人、家族（母）、相談支援専門員",
+            help="面談に参加した方を記載してください"
         )
 
-    # 家族の希望
-    with st.expander("👨‍👩‍👧 家族の希望・心配事", expanded=True):
-        st.caption("家族が期待していること、心配していること")
-        family_wishes = st.text_area(
-            "家族の希望",
-            height=100,
-            placeholder="例：\n- 無理のない範囲で社会参加してほしい\n- 健康管理をしっかりしてほしい",
-            key="family_wishes",
-            label_visibility="collapsed"
-        )
+        st.subheader("📝 ヒアリング内容")
+        st.caption("各項目について聞き取った内容を入力してください")
+
+        # 本人の希望
+        with st.expander("💭 本人の希望・目標", expanded=True):
+            st.caption("本人がどのような生活を送りたいか、何を目指しているか")
+            st.text_area(
+                "本人の希望",
+                height=100,
+                placeholder="例：\n- 働きたい\n- 一人暮らしをしたい\n- 友達を作りたい",
+                key="user_wishes",
+                label_visibility="collapsed"
+            )
 
-    # 本人の強み・得意なこと
-    with st.expander("✨ 本人の強み・得意なこと・好きなこと", expanded=True):
-        st.caption("本人ができること、得意なこと、興味があること")
-        strengths = st.text_area(
-            "強み",
-            height=100,
-            placeholder="例：\n- 単純作業は丁寧にできる\n- 服薬管理はできている\n- 音楽が好き",
-            key="strengths_input",
-            label_visibility="collapsed"
-        )
+        # 家族の希望
+        with st.expander("👨‍👩‍👧 家族の希望・心配事", expanded=True):
+            st.caption("家族が期待していること、心配していること")
+            st.text_area(
+                "家族の希望",
+                height=100,
+                placeholder="例：\n- 無理のない範囲で社会参加してほしい\n- 健康管理をしっかりしてほしい",
+                key="family_wishes",
+                label_visibility="collapsed"
+            )
 
-    # 生活状況・日常生活
-    with st.expander("🏠 生活状況・日常生活の様子", expanded=True):
-        st.caption("現在の生活環境、日常の過ごし方")
-        daily_life = st.text_area(
-            "生活状況",
-            height=100,
-            placeholder="例：\n- 現在は家族と同居\n- 生活リズムが不規則\n- 金銭管理が苦手",
-            key="daily_life",
-            label_visibility="collapsed"
-        )
+        # 本人の強み・得意なこと
+        with st.expander("✨ 本人の強み・得意なこと・好きなこと", expanded=True):
+            st.caption("本人ができること、得意なこと、興味があること")
+            st.text_area(
+                "強み",
+                height=100,
+                placeholder="例：\n- 単純作業は丁寧にできる\n- 服薬管理はできている\n- 音楽が好き",
+                key="strengths_input",
+                label_visibility="collapsed"
+            )
 
-    # 支援が必要な課題
-    with st.expander("⚠️ 支援が必要な課題・困りごと", expanded=True):
-        st.caption("本人が困っていること、支援が必要なこと")
-        challenges = st.text_area(
-            "課題",
-            height=100,
-            placeholder="例：\n- 対人関係に不安がある\n- 金銭管理ができない\n- コミュニケーションが苦手",
-            key="challenges_input",
-            label_visibility="collapsed"
-        )
+        # 生活状況・日常生活
+        with st.expander("🏠 生活状況・日常生活の様子", expanded=True):
+            st.caption("現在の生活環境、日常の過ごし方")
+            st.text_area(
+                "生活状況",
+                height=100,
+                placeholder="例：\n- 現在は家族と同居\n- 生活リズムが不規則\n- 金銭管理が苦手",
+                key="daily_life",
+                label_visibility="collapsed"
+            )
 
-    # 社会参加・人との関わり
-    with st.expander("🤝 社会参加・人との関わり", expanded=True):
-        st.caption("現在の社会参加状況、人間関係")
-        social_participation = st.text_area(
-            "社会参加",
-            height=100,
-            placeholder="例：\n- 外出は週1回程度\n- 友人はいない\n- デイサービスに通っている",
-            key="social_participation",
-            label_visibility="collapsed"
-        )
+        # 支援が必要な課題
+        with st.expander("⚠️ 支援が必要な課題・困りごと", expanded=True):
+            st.caption("本人が困っていること、支援が必要なこと")
+            st.text_area(
+                "課題",
+                height=100,
+                placeholder="例：\n- 対人関係に不安がある\n- 金銭管理ができない\n- コミュニケーションが苦手",
+                key="challenges_input",
+                label_visibility="collapsed"
+            )
 
-    # 現在利用しているサービス
-    with st.expander("🏢 現在利用しているサービス", expanded=True):
-        st.caption("既に利用している福祉サービス、医療機関等")
-        current_services = st.text_area(
-            "現在のサービス",
-            height=100,
-            placeholder="例：\n- 就労継続支援B型（週3日）\n- 精神科クリニック（月1回通院）",
-            key="current_services",
-            label_visibility="collapsed"
-        )
+        # 社会参加・人との関わり
+        with st.expander("🤝 社会参加・人との関わり", expanded=True):
+            st.caption("現在の社会参加状況、人間関係")
+            st.text_area(
+                "社会参加",
+                height=100,
+                placeholder="例：\n- 外出は週1回程度\n- 友人はいない\n- デイサービスに通っている",
+                key="social_participation",
+                label_visibility="collapsed"
+            )
 
-    # 健康状態・医療的ケア
-    with st.expander("💊 健康状態・医療的ケア", expanded=True):
-        st.caption("健康状態、服薬状況、医療的配慮が必要なこと")
-        health_status = st.text_area(
-            "健康状態",
-            height=100,
-            placeholder="例：\n- 統合失調症（服薬中）\n- てんかんの既往あり\n- アレルギーなし",
-            key="health_status",
-            label_visibility="collapsed"
-        )
+        # 現在利用しているサービス
+        with st.expander("🏢 現在利用しているサービス", expanded=True):
+            st.caption("既に利用している福祉サービス、医療機関等")
+            st.text_area(
+                "現在のサービス",
+                height=100,
+                placeholder="例：\n- 就労継続支援B型（週3日）\n- 精神科クリニック（月1回通院）",
+                key="current_services",
+                label_visibility="collapsed"
+            )
 
-    # その他・特記事項
-    with st.expander("📌 その他・特記事項", expanded=False):
-        st.caption("上記以外で重要な情報、特に配慮が必要なこと")
-        other_notes = st.text_area(
-            "特記事項",
-            height=100,
-            placeholder="例：\n- 大きな音が苦手\n- 視覚的な指示が分かりやすい\n- 午前中は調子が悪い",
-            key="other_notes",
-            label_visibility="collapsed"
-        )
+        # 健康状態・医療的ケア
+        with st.expander("💊 健康状態・医療的ケア", expanded=True):
+            st.caption("健康状態、服薬状況、医療的配慮が必要なこと")
+            st.text_area(
+                "健康状態",
+                height=100,
+                placeholder="例：\n- 統合失調症（服薬中）\n- てんかんの既往あり\n- アレルギーなし",
+                key="health_status",
+                label_visibility="collapsed"
+            )
+
+        # その他・特記事項
+        with st.expander("📌 その他・特記事項", expanded=False):
+            st.caption("上記以外で重要な情報、特に配慮が必要なこと")
+            st.text_area(
+                "特記事項",
+                height=100,
+                placeholder="例：\n- 大きな音が苦手\n- 視覚的な指示が分かりやすい\n- 午前中は調子が悪い",
+                key="other_notes",
+                label_visibility="collapsed"
+            )
 
-    if st.button("アセスメント実施 (AI分析)", type="primary"):
-        # 入力内容を統合
-        interview_sections = []
-
-        if user_wishes:
-            interview_sections.append(f"【本人の希望・目標】\n{user_wishes}")
-        if family_wishes:
-            interview_sections.append(f"【家族の希望・心配事】\n{family_wishes}")
-        if strengths:
-            interview_sections.append(f"【本人の強み・得意なこと】\n{strengths}")
-        if daily_life:
-            interview_sections.append(f"【生活状況・日常生活】\n{daily_life}")
-        if challenges:
-            interview_sections.append(f"【支援が必要な課題】\n{challenges}")
-        if social_participation:
-            interview_sections.append(f"【社会参加・人との関わり】\n{social_participation}")
-        if current_services:
-            interview_sections.append(f"【現在利用しているサービス】\n{current_services}")
-        if health_status:
-            interview_sections.append(f"【健康状態・医療的ケア】\n{health_status}")
-        if other_notes:
-            interview_sections.append(f"【その他・特記事項】\n{other_notes}")
-
-        interview_content = "\n\n".join(interview_sections)
+        submitted = st.form_submit_button("アセスメント実施 (AI分析)", type="primary")
+
+    if submitted:
+        # 入力内容を統合（入力のある項目のみ）
+        interview_content = "\n\n".join(
+            f"【{title}】\n{st.session_state[key]}"
+            for title, key in INTERVIEW_SECTIONS
+            if st.session_state.get(key)
+        )
 
         if not interview_content:
             st.error("少なくとも1つの項目にヒアリング内容を入力してください")
@@ -302,16 +434,20 @@ if st.session_state.selected_user_id:
 
             with st.spinner("AI分析中..."):
                 try:
-                    response = requests.post(
+                    response = get_session().post(
                         f"{API_BASE_URL}/assessments",
-                        json=assessment_data,
+                        data=orjson.dumps(assessment_data),
+                        headers=JSON_HEADERS,
                         timeout=60
                     )
 
                     if response.status_code == 201:
-                        assessment = response.json()
+                        assessment = orjson.loads(response.content)
                         st.session_state.assessment_id = assessment["assessment_id"]
 
+                        # 保存に成功した場合のみ追加質問の生成を開始し、分析結果の表示と並行して待つ
+                        followup_future = get_executor().submit(request_followup_questions, interview_content)
+
                         st.success("✅ アセスメント完了")
 
                         # 分析結果の表示
@@ -320,116 +456,102 @@ if st.session_state.selected_user_id:
 
                         # 分析されたニーズ
                         with st.expander("🎯 分析されたニーズ", expanded=True):
-                            if assessment.get("analyzed_needs"):
-                                for i, need in enumerate(assessment.get("analyzed_needs", []), 1):
-                                    st.markdown(f"**{i}.** {need}")
+                            needs = assessment.get("analyzed_needs")
+                            if needs:
+                                render_numbered(needs)
                             else:
                                 st.info("ニーズが分析されませんでした")
 
                         # 本人の強み
                         with st.expander("✨ 本人の強み・活用できる能力", expanded=True):
-                            if assessment.get("strengths"):
-                                for i, strength in enumerate(assessment.get("strengths", []), 1):
-                                    st.markdown(f"**{i}.** {strength}")
+                            strengths = assessment.get("strengths")
+                            if strengths:
+                                render_numbered(strengths)
                             else:
                                 st.info("強みが特定されませんでした")
 
                         # 支援が必要な課題
                         with st.expander("⚠️ 支援が必要な課題", expanded=True):
-                            if assessment.get("challenges"):
-                                for i, challenge in enumerate(assessment.get("challenges", []), 1):
-                                    st.markdown(f"**{i}.** {challenge}")
+                            challenges = assessment.get("challenges")
+                            if challenges:
+                                render_numbered(challenges)
                             else:
                                 st.info("課題が特定されませんでした")
 
                         # 本人の希望
-                        if assessment.get("preferences"):
+                        preferences = assessment.get("preferences")
+                        if preferences:
                             with st.expander("💭 本人の希望", expanded=False):
-                                for i, pref in enumerate(assessment.get("preferences", []), 1):
-                                    st.markdown(f"**{i}.** {pref}")
+                                render_numbered(preferences)
 
                         # 家族の希望
-                        if assessment.get("family_wishes"):
+                        family_wishes = assessment.get("family_wishes")
+                        if family_wishes:
                             with st.expander("👨‍👩‍👧 家族の希望", expanded=False):
-                                for i, wish in enumerate(assessment.get("family_wishes", []), 1):
-                                    st.markdown(f"**{i}.** {wish}")
+                                render_numbered(family_wishes)
 
                         # ICF分類（詳細情報として折りたたみ）
-                        if assessment.get("icf_classification"):
+                        icf = assessment.get("icf_classification")
+                        if icf:
                             with st.expander("📊 ICF分類による分析", expanded=False):
-                                icf = assessment.get("icf_classification", {})
-                                if icf.get("body_functions"):
-                                    st.markdown(f"**心身機能**: {icf.get('body_functions')}")
-                                if icf.get("activities"):
-                                    st.markdown(f"**活動**: {icf.get('activities')}")
-                                if icf.get("participation"):
-                                    st.markdown(f"**参加**: {icf.get('participation')}")
-                                if icf.get("environmental_factors"):
-                                    st.markdown(f"**環境因子**: {icf.get('environmental_factors')}")
-                                if icf.get("personal_factors"):
-                                    st.markdown(f"**個人因子**: {icf.get('personal_factors')}")
+                                for key, label in ICF_LABELS:
+                                    value = icf.get(key)
+                                    if value:
+                                        st.markdown(f"**{label}**: {value}")
 
                         # 追加質問の生成（エラーがあってもアセスメント結果は表示済み）
                         st.markdown("---")
                         try:
                             with st.spinner("追加質問を生成中..."):
-                                questions_response = requests.post(
-                                    f"{API_BASE_URL}/assessments/followup-questions",
-                                    json={"interview_content": interview_content},
-                                    timeout=30
-                                )
-
-                                if questions_response.status_code == 200:
-                                    questions_data = questions_response.json()
-
-                                    if not questions_data.get("is_sufficient", True):
-                                        st.warning("💡 さらに詳しくお聞かせください")
-                                        st.write(f"**不足している情報**: {', '.join(questions_data.get('missing_areas', []))}")
-
-                                        # 追加質問の表示
-                                        st.subheader("📝 追加のヒアリング項目")
-                                        for i, q in enumerate(questions_data.get("questions", []), 1):
-                                            with st.expander(f"{i}. {q.get('category')}: {q.get('question')}"):
-                                                st.write(f"**目的**: {q.get('purpose')}")
-                                                additional_answer = st.text_area(
-                                                    "回答",
-                                                    key=f"additional_q_{i}",
-                                                    placeholder="ここに回答を入力してください..."
+                                questions_data = get_followup_questions(interview_content, _pending=followup_future)
+
+                                if not questions_data.get("is_sufficient", True):
+                                    st.warning("💡 さらに詳しくお聞かせください")
+                                    st.write(f"**不足している情報**: {', '.join(questions_data.get('missing_areas', []))}")
+
+                                    # 追加質問の表示
+                                    st.subheader("📝 追加のヒアリング項目")
+                                    for i, q in enumerate(questions_data.get("questions", []), 1):
+                                        with st.expander(f"{i}. {q.get('category')}: {q.get('question')}"):
+                                            st.write(f"**目的**: {q.get('purpose')}")
+                                            additional_answer = st.text_area(
+                                                "回答",
+                                                key=f"additional_q_{i}",
+                                                placeholder="ここに回答を入力してください..."
+                                            )
+
+                                    # 追加情報を反映するボタン
+                                    if st.button("追加情報を反映して再分析", type="secondary"):
+                                        # 追加回答を収集（回答のある質問のみ）
+                                        additional_info = "\n\n".join(
+                                            f"Q: {q.get('question')}\nA: {st.session_state[f'additional_q_{i}']}"
+                                            for i, q in enumerate(questions_data.get("questions", []), 1)
+                                            if st.session_state.get(f"additional_q_{i}")
+                                        )
+
+                                        if additional_info:
+                                            # ヒアリング内容に追加
+                                            updated_content = f"{interview_content}\n\n【追加情報】\n{additional_info}"
+
+                                            # 再分析
+                                            with st.spinner("再分析中..."):
+                                                reanalyze_data = {
+                                                    "user_id": st.session_state.selected_user_id,
+                                                    "interview_date": str(interview_date),
+                                                    "interview_content": updated_content,
+                                                    "analyze": True,
+                                                }
+                                                response = get_session().post(
+                                                    f"{API_BASE_URL}/assessments",
+                                                    data=orjson.dumps(reanalyze_data),
+                                                    headers=JSON_HEADERS,
+                                                    timeout=60
                                                 )
-
-                                        # 追加情報を反映するボタン
-                                        if st.button("追加情報を反映して再分析", type="secondary"):
-                                            # 追加回答を収集
-                                            additional_info = []
-                                            for i, q in enumerate(questions_data.get("questions", []), 1):
-                                                answer = st.session_state.get(f"additional_q_{i}")
-                                                if answer:
-                                                    additional_info.append(f"Q: {q.get('question')}\nA: {answer}")
-
-                                            if additional_info:
-                                                # ヒアリング内容に追加
-                                                updated_content = interview_content + "\n\n【追加情報】\n" + "\n\n".join(additional_info)
-
-                                                # 再分析
-                                                with st.spinner("再分析中..."):
-                                                    reanalyze_data = {
-                                                        "user_id": st.session_state.selected_user_id,
-                                                        "interview_date": str(interview_date),
-                                                        "interview_content": updated_content,
-                                                        "analyze": True,
-                                                    }
-                                                    response = requests.post(
-                                                        f"{API_BASE_URL}/assessments",
-                                                        json=reanalyze_data,
-                                                        timeout=60
-                                                    )
-                                                    if response.status_code == 201:
-                                                        st.success("✅ 再分析完了しました。ページをリロードして確認してください。")
-                                                        st.rerun()
-                                    else:
-                                        st.success("✅ 十分な情報が揃っています")
+                                                if response.status_code == 201:
+                                                    st.success("✅ 再分析完了しました。ページをリロードして確認してください。")
+                                                    st.rerun()
                                 else:
-                                    st.info("追加質問の生成をスキップしました")
+                                    st.success("✅ 十分な情報が揃っています")
                         except Exception as e:
                             st.info("追加質問の生成をスキップしました（アセスメント結果は正常に保存されています）")
                             logger.warning(f"追加質問生成に失敗: {e}")
@@ -4,9 +4,16 @@
 
 アセスメント結果をもとに長期・短期目標を設定し、サービス利用計画を作成します。
 """
+import threading
+import time
 import streamlit as st
 import requests
-from datetime import date, datetime, timedelta
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from typing import Optional, Tuple
 from loguru import logger
 
 # ページ設定
@@ -19,112 +26,312 @@ st.set_page_config(
 
 # API設定
 API_BASE_URL = "http://localhost:8000/api"
+REQUEST_TIMEOUT = (3, 10)  # (接続, 読み込み) 秒
+LLM_REQUEST_TIMEOUT = (3, 60)  # AI目標提案（LLM呼び出し）用
+SAVE_REQUEST_TIMEOUT = (3, 30)  # 計画保存・計画書出力用
+DOCUMENT_CHUNK_SIZE = 64 * 1024  # 計画書ダウンロードの受信単位（バイト）
+
+# APIサーバーの障害が続いた場合に呼び出しを一時停止する（サーキットブレーカー）
+BREAKER_THRESHOLD = 3  # 連続失敗回数
+BREAKER_COOLDOWN = 30  # 停止する秒数
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """APIサーバーとの接続を使い回すためのHTTPセッション（プロセス内で共有）"""
+    session = requests.Session()
+    # 一時的な接続エラー・5xxは短い間隔で再試行する
+    # （POSTは計画の重複作成を避けるため再試行しない）
+    retries = Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+    )
+    session.mount(
+        "http://",
+        HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retries)
+    )
+    session.headers.update({"Accept": "application/json"})
+    return session
+
+
+class CircuitBreaker:
+    """5xx・接続エラーが続いたAPI呼び出しを一定時間止めるためのカウンタ（スレッドセーフ）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open_until = 0.0
+
+    def is_open(self) -> bool:
+        return time.monotonic() < self._open_until
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= BREAKER_THRESHOLD:
+                self._open_until = time.monotonic() + BREAKER_COOLDOWN
+                self._failures = 0
+
+
+@st.cache_resource
+def get_circuit_breaker() -> CircuitBreaker:
+    """APIサーバー用のサーキットブレーカー（プロセス内で共有）"""
+    return CircuitBreaker()
+
+
+def api_request(method: str, path: str, **kwargs) -> requests.Response:
+    """
+    APIを呼び出す（既定のタイムアウト・サーキットブレーカー付き）
+
+    json= で渡したリクエストボディは orjson で直列化する。
+
+    5xx・接続エラー・タイムアウトが BREAKER_THRESHOLD 回続いた場合、
+    BREAKER_COOLDOWN 秒間はAPIを呼ばずに requests.ConnectionError を送出する。
+    """
+    breaker = get_circuit_breaker()
+    if breaker.is_open():
+        raise requests.ConnectionError("APIサーバーが応答しないため、しばらく呼び出しを停止しています")
+
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    if "json" in kwargs:
+        # リクエストボディは orjson で直列化して送る
+        kwargs["data"] = orjson.dumps(kwargs.pop("json"))
+        kwargs["headers"] = {**kwargs.get("headers", {}), "Content-Type": "application/json"}
+    try:
+        response = get_session().request(method, f"{API_BASE_URL}{path}", **kwargs)
+    except (requests.ConnectionError, requests.Timeout):
+        breaker.record_failure()
+        raise
+
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+# 選択肢
+SERVICE_TYPES = (
+    "就労継続支援B型",
+    "就労継続支援A型",
+    "就労移行支援",
+    "生活介護",
+    "自立訓練（生活訓練）",
+    "自立訓練（機能訓練）",
+    "共同生活援助（グループホーム）",
+    "短期入所（ショートステイ）",
+    "居宅介護（ホームヘルプ）",
+    "重度訪問介護",
+    "同行援護",
+    "行動援護",
+    "その他",
+)
+LONG_TERM_EVALUATION_PERIODS = ("6ヶ月", "1年", "2年", "3年")
+SHORT_TERM_EVALUATION_PERIODS = ("1ヶ月", "3ヶ月", "6ヶ月")
+CONTACT_METHODS = ("電話", "訪問", "メール", "FAX", "その他")
+
+# アセスメント概要に表示する面談記録の文字数
+INTERVIEW_PREVIEW_CHARS = 300
+
+# SMART評価の項目（キー, 表示名）
+SMART_CRITERIA = (
+    ("is_specific", "Specific"),
+    ("is_measurable", "Measurable"),
+    ("is_achievable", "Achievable"),
+    ("is_relevant", "Relevant"),
+    ("is_time_bound", "Time-bound"),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Goal:
+    """採用した目標（長期・短期共通）。計画保存時にのみ辞書へ変換する"""
+
+    goal_text: str
+    goal_reason: str = ""
+    evaluation_period: str = ""
+    evaluation_method: str = ""
+    confidence: float = 1.0
+    # SMART_CRITERIA の順で各項目を満たすか（評価がない場合は空）
+    smart: Tuple[bool, ...] = ()
+    # 一覧の見出しに使う目標文の先頭（再実行ごとに切り出さないよう作成時に求める）
+    summary: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "summary", f"{self.goal_text[:50]}...")
+
+    @classmethod
+    def from_suggestion(cls, suggestion: dict) -> "Goal":
+        """AI提案（APIレスポンスの辞書）から作成"""
+        smart = suggestion.get("smart_evaluation") or {}
+        return cls(
+            goal_text=suggestion["goal_text"],
+            goal_reason=suggestion.get("goal_reason", ""),
+            evaluation_period=suggestion.get("evaluation_period", ""),
+            evaluation_method=suggestion.get("evaluation_method", ""),
+            confidence=suggestion.get("confidence", 0),
+            smart=tuple(bool(smart.get(key)) for key, _ in SMART_CRITERIA) if smart else (),
+        )
+
+    def to_payload(self) -> dict:
+        """計画保存APIに送る形式（goal / period / criteria）"""
+        return {
+            "goal": self.goal_text,
+            "period": self.evaluation_period,
+            "criteria": self.evaluation_method
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class ServiceRecord:
+    """サービス連絡記録"""
+
+    facility_name: str
+    service_type: str
+    contact_date: Optional[str]
+    contact_person: str
+    contact_method: str
+    contact_content: str
+    facility_id: Optional[str] = None
+    frequency: Optional[str] = None
+    start_date: Optional[str] = None
+
+    def to_payload(self) -> dict:
+        """計画保存APIに送る形式"""
+        return {
+            "service_type": self.service_type,
+            "facility_id": self.facility_id,
+            "facility_name": self.facility_name,
+            "frequency": self.frequency,
+            "start_date": self.start_date
+        }
+
 
 # セッションステート初期化
 if "selected_user_id" not in st.session_state:
     st.session_state["selected_user_id"] = None
+if "selected_user" not in st.session_state:
+    st.session_state["selected_user"] = None
 if "selected_assessment_id" not in st.session_state:
     st.session_state["selected_assessment_id"] = None
 if "current_plan_id" not in st.session_state:
     st.session_state["current_plan_id"] = None
+# 保存済み計画の計画書ダウンロード用（準備済みの形式の集合）
+if "saved_plan_id" not in st.session_state:
+    st.session_state["saved_plan_id"] = None
+if "prepared_plan_documents" not in st.session_state:
+    st.session_state["prepared_plan_documents"] = set()
 if "long_term_goals" not in st.session_state:
     st.session_state["long_term_goals"] = []
 if "short_term_goals" not in st.session_state:
     st.session_state["short_term_goals"] = []
 if "services" not in st.session_state:
     st.session_state["services"] = []
+# 採用済み目標の重複チェック用（目標文の集合）
+if "long_term_goal_keys" not in st.session_state:
+    st.session_state["long_term_goal_keys"] = set()
+if "short_term_goal_keys" not in st.session_state:
+    st.session_state["short_term_goal_keys"] = set()
 
 
-def adopt_long_term_goal(goal):
+def adopt_long_term_goal(suggestion):
     """長期目標を採用するコールバック関数"""
-    if goal not in st.session_state["long_term_goals"]:
+    goal = Goal.from_suggestion(suggestion)
+    key = goal.goal_text
+    if key not in st.session_state["long_term_goal_keys"]:
+        st.session_state["long_term_goal_keys"].add(key)
         st.session_state["long_term_goals"].append(goal)
         logger.info(f"Long-term goal adopted. Total: {len(st.session_state['long_term_goals'])}")
 
 
-def adopt_short_term_goal(goal):
+def adopt_short_term_goal(suggestion):
     """短期目標を採用するコールバック関数"""
-    if goal not in st.session_state["short_term_goals"]:
+    goal = Goal.from_suggestion(suggestion)
+    key = goal.goal_text
+    if key not in st.session_state["short_term_goal_keys"]:
+        st.session_state["short_term_goal_keys"].add(key)
         st.session_state["short_term_goals"].append(goal)
         logger.info(f"Short-term goal adopted. Total: {len(st.session_state['short_term_goals'])}")
 
 
-def get_user_detail(user_id: str):
-    """利用者詳細を取得"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/users/{user_id}")
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        logger.error(f"Error getting user: {e}")
-        return None
+@st.cache_data(ttl=60, show_spinner=False)
+def get_users(page: int = 1, page_size: int = 100) -> list:
+    """
+    利用者一覧を取得（60秒キャッシュ）
 
-
-def get_assessment_detail(assessment_id: str):
-    """アセスメント詳細を取得"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/assessments/{assessment_id}")
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        logger.error(f"Error getting assessment: {e}")
-        return None
+    以下の取得系関数は失敗時に例外を送出する（例外はキャッシュされない）。
+    エラー表示は呼び出し側で行う。
+    """
+    response = api_request("GET", "/users", params={"page": page, "page_size": page_size})
+    response.raise_for_status()
+    return orjson.loads(response.content).get("users", [])
 
 
+@st.cache_data(ttl=300, show_spinner=False)
 def get_user_assessments(user_id: str):
-    """利用者のアセスメント一覧を取得"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/users/{user_id}/assessments")
+    """
+    利用者のアセスメント一覧を取得（5分キャッシュ）
+
+    概要表示では面談記録の先頭しか使わないため、サーバー側で切り詰めて受け取る。
+    """
+    response = api_request(
+        "GET",
+        f"/users/{user_id}/assessments",
+        # 301文字目の有無で省略記号（...）を付けるかを判定する
+        params={"content_preview": INTERVIEW_PREVIEW_CHARS + 1}
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
+@st.cache_data(ttl=1800, show_spinner=False)
+def suggest_goals(assessment_id: str, goal_type: str):
+    """
+    AI目標提案を取得（30分キャッシュ）
+
+    同じアセスメント・目標種別で提案ボタンを押し直した場合はLLMを呼び直さない。
+    別の提案が必要な場合は「🔄 最新の情報に更新」でキャッシュを破棄する。
+    """
+    response = api_request(
+        "POST",
+        "/goals/suggest",
+        json={"assessment_id": assessment_id, "goal_type": goal_type},
+        timeout=LLM_REQUEST_TIMEOUT
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_plan_document(plan_id: str, fmt: str) -> bytes:
+    """計画書（pdf / word）をAPI経由で取得（10分キャッシュ、チャンク単位で受信）"""
+    response = api_request("GET", f"/plans/{plan_id}/{fmt}", stream=True, timeout=SAVE_REQUEST_TIMEOUT)
+    with response:
         response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        logger.error(f"Error getting assessments: {e}")
-        return []
+        return b"".join(response.iter_content(chunk_size=DOCUMENT_CHUNK_SIZE))
 
 
-def suggest_goals(assessment_id: str, goal_type: str):
-    """AI目標提案を取得"""
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/goals/suggest",
-            json={"assessment_id": assessment_id, "goal_type": goal_type},
-            timeout=60
-        )
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        logger.error(f"Error suggesting goals: {e}")
-        return None
+def format_user_label(user) -> str:
+    """利用者選択の表示名「氏名（ふりがな）年齢」"""
+    return f"{user['name']}（{user.get('kana', '')}） {user['age']}歳"
 
 
-def search_facilities(service_type: str = None, district: str = None, keyword: str = None):
-    """施設を検索"""
-    try:
-        params = {}
-        if service_type:
-            params["service_type"] = service_type
-        if district:
-            params["district"] = district
-        if keyword:
-            params["keyword"] = keyword
-
-        response = requests.get(f"{API_BASE_URL}/facilities", params=params)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        logger.error(f"Error searching facilities: {e}")
-        return []
+def format_assessment_label(assessment) -> str:
+    """アセスメント選択の表示名「実施日 (ID: 先頭8文字...)」"""
+    return f"{assessment['interview_date']} (ID: {assessment['assessment_id'][:8]}...)"
 
 
-def get_facility_detail(facility_id: str):
-    """施設詳細を取得"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/facilities/{facility_id}")
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        logger.error(f"Error getting facility: {e}")
-        return None
+def clear_plan_cache():
+    """他ページでの登録・更新を反映するため、このページのキャッシュを破棄"""
+    get_users.clear()
+    get_user_assessments.clear()
+    suggest_goals.clear()
 
 
 # ページタイトル
@@ -147,6 +354,10 @@ st.markdown("---")
 # Step 1: 利用者・アセスメント選択
 st.header("1️⃣ 利用者・アセスメント選択")
 
+# 他ページで利用者・アセスメントを登録した直後は、キャッシュを破棄して再取得する
+if st.button("🔄 最新の情報に更新", key="refresh_plan_cache"):
+    clear_plan_cache()
+
 col1, col2 = st.columns(2)
 
 with col1:
@@ -154,39 +365,43 @@ with col1:
 
     # 利用者一覧取得
     try:
-        response = requests.get(f"{API_BASE_URL}/users", params={"page": 1, "page_size": 100})
-        if response.status_code == 200:
-            users_data = response.json()
-            all_users = users_data.get("users", [])
-
-            if all_users:
-                # 利用者を名前とふりがなで選択できるようにする
-                # セレクトボックスの選択肢に「氏名（ふりがな）年齢」を表示
-                user_options = {
-                    f"{user['name']}（{user.get('kana', '')}） {user['age']}歳": user
-                    for user in all_users
-                }
-
-                st.caption(f"登録利用者数: {len(all_users)}件")
-
-                selected_user_display = st.selectbox(
+        all_users = get_users(page=1, page_size=100)
+
+        if all_users:
+            # 利用者を名前とふりがなで選択できるようにする
+            # 選択肢は利用者IDとし、表示時に「氏名（ふりがな）年齢」へ整形する
+            user_by_id = {user["user_id"]: user for user in all_users}
+
+            st.caption(f"登録利用者数: {len(all_users)}件")
+
+            # 選択途中の再実行で一覧・アセスメントを取り直さないよう、確定ボタンで反映する
+            with st.form("plan_user_form", border=False):
+                selected_user_id = st.selectbox(
                     "利用者を選択",
-                    options=["選択してください"] + list(user_options.keys()),
+                    options=[None, *user_by_id],
+                    format_func=lambda user_id: "選択してください" if user_id is None else format_user_label(user_by_id[user_id]),
                     key="plan_user_selector",
                     help="ドロップダウンをクリックして、氏名やふりがなの一部を入力すると絞り込まれます"
                 )
-
-                if selected_user_display != "選択してください":
-                    selected_user = user_options[selected_user_display]
-                    st.session_state["selected_user_id"] = selected_user["user_id"]
-
-                    st.success(f"✅ {selected_user['name']} さんを選択")
-                    st.write(f"**障害種別**: {selected_user.get('disability_type', '未設定')}")
-                    st.write(f"**支援区分**: {selected_user.get('support_level', '未判定')}")
-            else:
-                st.warning("利用者が登録されていません")
-                if st.button("利用者管理へ →", type="primary"):
-                    st.switch_page("pages/1_👤_User_Management.py")
+                user_submitted = st.form_submit_button("確定", use_container_width=True)
+
+            if (user_submitted and selected_user_id is not None
+                    and selected_user_id != st.session_state["selected_user_id"]):
+                st.session_state["selected_user_id"] = selected_user_id
+                # 別の利用者のアセスメントが選択されたまま残らないようにする
+                st.session_state["selected_assessment_id"] = None
+
+            selected_user = user_by_id.get(st.session_state["selected_user_id"])
+            # 一覧取得時の利用者情報を保持し、計画書プレビューで再取得しない
+            st.session_state["selected_user"] = selected_user
+            if selected_user:
+                st.success(f"✅ {selected_user['name']} さんを選択")
+                st.write(f"**障害種別**: {selected_user.get('disability_type', '未設定')}")
+                st.write(f"**支援区分**: {selected_user.get('support_level', '未判定')}")
+        else:
+            st.warning("利用者が登録されていません")
+            if st.button("利用者管理へ →", type="primary"):
+                st.switch_page("pages/1_👤_User_Management.py")
     except Exception as e:
         st.error(f"利用者情報の取得に失敗: {e}")
 
@@ -194,24 +409,30 @@ with col2:
     st.subheader("アセスメント選択")
 
     if st.session_state.get("selected_user_id"):
-        assessments = get_user_assessments(st.session_state["selected_user_id"])
+        try:
+            assessments = get_user_assessments(st.session_state["selected_user_id"])
+        except Exception as e:
+            logger.error(f"Error getting assessments: {e}")
+            st.error(f"アセスメント一覧の取得に失敗: {e}")
+            assessments = []
 
         if assessments:
-            assessment_options = {
-                f"{a['interview_date']} (ID: {a['assessment_id'][:8]}...)": a
-                for a in assessments
-            }
-
-            selected_assessment_display = st.selectbox(
-                "アセスメントを選択",
-                options=["選択してください"] + list(assessment_options.keys()),
-                key="plan_assessment_selector"
-            )
+            assessment_by_id = {a["assessment_id"]: a for a in assessments}
+
+            with st.form("plan_assessment_form", border=False):
+                selected_assessment_id = st.selectbox(
+                    "アセスメントを選択",
+                    options=[None, *assessment_by_id],
+                    format_func=lambda assessment_id: "選択してください" if assessment_id is None else format_assessment_label(assessment_by_id[assessment_id]),
+                    key="plan_assessment_selector"
+                )
+                assessment_submitted = st.form_submit_button("確定", use_container_width=True)
 
-            if selected_assessment_display != "選択してください":
-                selected_assessment = assessment_options[selected_assessment_display]
-                st.session_state["selected_assessment_id"] = selected_assessment["assessment_id"]
+            if assessment_submitted and selected_assessment_id is not None:
+                st.session_state["selected_assessment_id"] = selected_assessment_id
 
+            selected_assessment = assessment_by_id.get(st.session_state["selected_assessment_id"])
+            if selected_assessment:
                 st.success(f"✅ {selected_assessment['interview_date']} のアセスメントを選択")
 
                 # アセスメントサマリー表示
@@ -237,8 +458,8 @@ with col2:
                         st.write("**面談記録**:")
                         # 長い場合は最初の300文字だけ表示
                         content = selected_assessment["interview_content"]
-                        if len(content) > 300:
-                            st.write(content[:300] + "...")
+                        if len(content) > INTERVIEW_PREVIEW_CHARS:
+                            st.write(content[:INTERVIEW_PREVIEW_CHARS] + "...")
                         else:
                             st.write(content)
 
@@ -264,7 +485,7 @@ if st.session_state.get("selected_assessment_id"):
     with st.expander("🐛 デバッグ情報", expanded=False):
         st.write(f"採用済み長期目標数: {len(st.session_state['long_term_goals'])}")
         if st.session_state["long_term_goals"]:
-            st.json(st.session_state["long_term_goals"])
+            st.json([asdict(goal) for goal in st.session_state["long_term_goals"]])
 
     tab1, tab2 = st.tabs(["AI提案", "手動入力"])
 
@@ -273,33 +494,31 @@ if st.session_state.get("selected_assessment_id"):
 
         if st.button("💡 長期目標を提案してもらう", type="primary", use_container_width=True):
             with st.spinner("AIが長期目標を生成中..."):
-                suggestions = suggest_goals(st.session_state["selected_assessment_id"], "長期目標")
+                try:
+                    suggestions = suggest_goals(st.session_state["selected_assessment_id"], "長期目標")
+                except Exception as e:
+                    logger.error(f"Error suggesting goals: {e}")
+                    suggestions = None
 
                 if suggestions and suggestions.get("suggestions"):
                     st.success(f"✅ {len(suggestions['suggestions'])}件の目標を提案しました")
 
                     for i, goal in enumerate(suggestions["suggestions"], 1):
                         with st.expander(f"提案 {i}: {goal['goal_text'][:50]}...", expanded=(i == 1)):
-                            st.write(f"**目標**: {goal['goal_text']}")
-                            st.write(f"**理由**: {goal['goal_reason']}")
-                            st.write(f"**評価期間**: {goal['evaluation_period']}")
-                            st.write(f"**評価方法**: {goal['evaluation_method']}")
-
-                            # SMART評価
+                            # SMART評価は1行にまとめて表示
                             smart = goal.get("smart_evaluation", {})
-                            col1, col2, col3, col4, col5 = st.columns(5)
-                            with col1:
-                                st.metric("Specific", "✅" if smart.get("is_specific") else "❌")
-                            with col2:
-                                st.metric("Measurable", "✅" if smart.get("is_measurable") else "❌")
-                            with col3:
-                                st.metric("Achievable", "✅" if smart.get("is_achievable") else "❌")
-                            with col4:
-                                st.metric("Relevant", "✅" if smart.get("is_relevant") else "❌")
-                            with col5:
-                                st.metric("Time-bound", "✅" if smart.get("is_time_bound") else "❌")
-
-                            st.metric("信頼度", f"{goal.get('confidence', 0):.0%}")
+                            smart_line = " &nbsp; ".join(
+                                f"{'✅' if smart.get(key) else '❌'} {label}"
+                                for key, label in SMART_CRITERIA
+                            )
+                            st.markdown(
+                                f"**目標**: {goal['goal_text']}\n\n"
+                                f"**理由**: {goal['goal_reason']}\n\n"
+                                f"**評価期間**: {goal['evaluation_period']}\n\n"
+                                f"**評価方法**: {goal['evaluation_method']}\n\n"
+                                f"**SMART**: {smart_line}\n\n"
+                                f"**信頼度**: {goal.get('confidence', 0):.0%}"
+                            )
 
                             # コールバック関数を使ってsession_stateの更新を確実に実行
                             st.button(
@@ -324,7 +543,7 @@ if st.session_state.get("selected_assessment_id"):
 
             col1, col2 = st.columns(2)
             with col1:
-                evaluation_period = st.selectbox("評価期間", ["6ヶ月", "1年", "2年", "3年"])
+                evaluation_period = st.selectbox("評価期間", LONG_TERM_EVALUATION_PERIODS)
             with col2:
                 evaluation_method = st.text_input(
                     "評価方法",
@@ -340,23 +559,21 @@ if st.session_state.get("selected_assessment_id"):
             submitted = st.form_submit_button("長期目標を追加", type="primary", use_container_width=True)
 
             if submitted and goal_text:
-                manual_goal = {
-                    "goal_text": goal_text,
-                    "goal_reason": goal_reason,
-                    "evaluation_period": evaluation_period,
-                    "evaluation_method": evaluation_method,
-                    "confidence": 1.0,
-                    "smart_evaluation": {
-                        "is_specific": True,
-                        "is_measurable": True,
-                        "is_achievable": True,
-                        "is_relevant": True,
-                        "is_time_bound": True
-                    }
-                }
-                st.session_state["long_term_goals"].append(manual_goal)
-                st.success("✅ 長期目標を追加しました")
-                st.rerun()
+                manual_goal = Goal(
+                    goal_text=goal_text,
+                    goal_reason=goal_reason,
+                    evaluation_period=evaluation_period,
+                    evaluation_method=evaluation_method,
+                    confidence=1.0,
+                    smart=(True,) * len(SMART_CRITERIA),
+                )
+                if goal_text in st.session_state["long_term_goal_keys"]:
+                    st.warning("⚠️ 同じ長期目標が既に追加されています")
+                else:
+                    st.session_state["long_term_goal_keys"].add(goal_text)
+                    st.session_state["long_term_goals"].append(manual_goal)
+                    st.success("✅ 長期目標を追加しました")
+                    st.rerun()
 
     # 採用済み長期目標の表示
     if st.session_state["long_term_goals"]:
@@ -364,12 +581,18 @@ if st.session_state.get("selected_assessment_id"):
         st.subheader("📌 採用した長期目標")
 
         for i, goal in enumerate(st.session_state["long_term_goals"], 1):
-            with st.expander(f"長期目標 {i}: {goal['goal_text'][:50]}...", expanded=True):
-                st.write(f"**目標**: {goal['goal_text']}")
-                st.write(f"**評価期間**: {goal['evaluation_period']}")
+            with st.expander(f"長期目標 {i}: {goal.summary}", expanded=True):
+                st.markdown(
+                    f"**目標**: {goal.goal_text}\n\n"
+                    f"**評価期間**: {goal.evaluation_period}"
+                )
 
                 if st.button(f"削除", key=f"delete_long_{i}", type="secondary"):
-                    st.session_state["long_term_goals"].remove(goal)
+                    del st.session_state["long_term_goals"][i - 1]
+                    # 重複チェック用の集合は目標リストから作り直す
+                    st.session_state["long_term_goal_keys"] = {
+                        g.goal_text for g in st.session_state["long_term_goals"]
+                    }
                     st.rerun()
 
 st.markdown("---")
@@ -386,17 +609,23 @@ if st.session_state.get("selected_assessment_id") and st.session_state["long_ter
 
         if st.button("💡 短期目標を提案してもらう", type="primary", use_container_width=True):
             with st.spinner("AIが短期目標を生成中..."):
-                suggestions = suggest_goals(st.session_state["selected_assessment_id"], "短期目標")
+                try:
+                    suggestions = suggest_goals(st.session_state["selected_assessment_id"], "短期目標")
+                except Exception as e:
+                    logger.error(f"Error suggesting goals: {e}")
+                    suggestions = None
 
                 if suggestions and suggestions.get("suggestions"):
                     st.success(f"✅ {len(suggestions['suggestions'])}件の短期目標を提案しました")
 
                     for i, goal in enumerate(suggestions["suggestions"], 1):
                         with st.expander(f"提案 {i}: {goal['goal_text'][:50]}...", expanded=(i == 1)):
-                            st.write(f"**目標**: {goal['goal_text']}")
-                            st.write(f"**理由**: {goal['goal_reason']}")
-                            st.write(f"**評価期間**: {goal['evaluation_period']}")
-                            st.write(f"**評価方法**: {goal['evaluation_method']}")
+                            st.markdown(
+                                f"**目標**: {goal['goal_text']}\n\n"
+                                f"**理由**: {goal['goal_reason']}\n\n"
+                                f"**評価期間**: {goal['evaluation_period']}\n\n"
+                                f"**評価方法**: {goal['evaluation_method']}"
+                            )
 
                             # コールバック関数を使ってsession_stateの更新を確実に実行
                             st.button(
@@ -419,7 +648,7 @@ if st.session_state.get("selected_assessment_id") and st.session_state["long_ter
 
             col1, col2 = st.columns(2)
             with col1:
-                evaluation_period = st.selectbox("評価期間", ["1ヶ月", "3ヶ月", "6ヶ月"])
+                evaluation_period = st.selectbox("評価期間", SHORT_TERM_EVALUATION_PERIODS)
             with col2:
                 evaluation_method = st.text_input(
                     "評価方法",
@@ -429,16 +658,19 @@ if st.session_state.get("selected_assessment_id") and st.session_state["long_ter
             submitted = st.form_submit_button("短期目標を追加", type="primary", use_container_width=True)
 
             if submitted and goal_text:
-                manual_goal = {
-                    "goal_text": goal_text,
-                    "goal_reason": "",
-                    "evaluation_period": evaluation_period,
-                    "evaluation_method": evaluation_method,
-                    "confidence": 1.0
-                }
-                st.session_state["short_term_goals"].append(manual_goal)
-                st.success("✅ 短期目標を追加しました")
-                st.rerun()
+                manual_goal = Goal(
+                    goal_text=goal_text,
+                    evaluation_period=evaluation_period,
+                    evaluation_method=evaluation_method,
+                    confidence=1.0,
+                )
+                if goal_text in st.session_state["short_term_goal_keys"]:
+                    st.warning("⚠️ 同じ短期目標が既に追加されています")
+                else:
+                    st.session_state["short_term_goal_keys"].add(goal_text)
+                    st.session_state["short_term_goals"].append(manual_goal)
+                    st.success("✅ 短期目標を追加しました")
+                    st.rerun()
 
     # 採用済み短期目標の表示
     if st.session_state["short_term_goals"]:
@@ -446,12 +678,18 @@ if st.session_state.get("selected_assessment_id") and st.session_state["long_ter
         st.subheader("📌 採用した短期目標")
 
         for i, goal in enumerate(st.session_state["short_term_goals"], 1):
-            with st.expander(f"短期目標 {i}: {goal['goal_text'][:50]}...", expanded=True):
-                st.write(f"**目標**: {goal['goal_text']}")
-                st.write(f"**評価期間**: {goal['evaluation_period']}")
+            with st.expander(f"短期目標 {i}: {goal.summary}", expanded=True):
+                st.markdown(
+                    f"**目標**: {goal.goal_text}\n\n"
+                    f"**評価期間**: {goal.evaluation_period}"
+                )
 
                 if st.button(f"削除", key=f"delete_short_{i}", type="secondary"):
-                    st.session_state["short_term_goals"].remove(goal)
+                    del st.session_state["short_term_goals"][i - 1]
+                    # 重複チェック用の集合は目標リストから作り直す
+                    st.session_state["short_term_goal_keys"] = {
+                        g.goal_text for g in st.session_state["short_term_goals"]
+                    }
                     st.rerun()
 
 st.markdown("---")
@@ -477,21 +715,7 @@ if st.session_state["long_term_goals"] and st.session_state["short_term_goals"]:
                 )
                 service_type = st.selectbox(
                     "サービス種別",
-                    [
-                        "就労継続支援B型",
-                        "就労継続支援A型",
-                        "就労移行支援",
-                        "生活介護",
-                        "自立訓練（生活訓練）",
-                        "自立訓練（機能訓練）",
-                        "共同生活援助（グループホーム）",
-                        "短期入所（ショートステイ）",
-                        "居宅介護（ホームヘルプ）",
-                        "重度訪問介護",
-                        "同行援護",
-                        "行動援護",
-                        "その他"
-                    ],
+                    SERVICE_TYPES,
                     key="service_type_select"
                 )
                 contact_date = st.date_input(
@@ -508,7 +732,7 @@ if st.session_state["long_term_goals"] and st.session_state["short_term_goals"]:
                 )
                 contact_method = st.selectbox(
                     "連絡方法",
-                    ["電話", "訪問", "メール", "FAX", "その他"],
+                    CONTACT_METHODS,
                     key="service_contact_method"
                 )
 
@@ -522,14 +746,14 @@ if st.session_state["long_term_goals"] and st.session_state["short_term_goals"]:
             submitted = st.form_submit_button("✅ 記録を追加", use_container_width=True)
 
             if submitted and facility_name and contact_content:
-                service_data = {
-                    "facility_name": facility_name,
-                    "service_type": service_type,
-                    "contact_date": contact_date.isoformat() if contact_date else None,
-                    "contact_person": contact_person,
-                    "contact_method": contact_method,
-                    "contact_content": contact_content
-                }
+                service_data = ServiceRecord(
+                    facility_name=facility_name,
+                    service_type=service_type,
+                    contact_date=contact_date.isoformat() if contact_date else None,
+                    contact_person=contact_person,
+                    contact_method=contact_method,
+                    contact_content=contact_content,
+                )
 
                 st.session_state["services"].append(service_data)
                 st.success(f"✅ {facility_name}の連絡記録を追加しました")
@@ -541,16 +765,16 @@ if st.session_state["long_term_goals"] and st.session_state["short_term_goals"]:
         st.subheader("📋 サービス連絡記録")
 
         for i, service in enumerate(st.session_state["services"], 1):
-            with st.expander(f"記録 {i}: {service['facility_name']} ({service.get('contact_date', '日付未設定')})", expanded=True):
+            with st.expander(f"記録 {i}: {service.facility_name} ({service.contact_date or '日付未設定'})", expanded=True):
                 col1, col2 = st.columns([4, 1])
 
                 with col1:
-                    st.write(f"**事業所名**: {service['facility_name']}")
-                    st.write(f"**サービス種別**: {service.get('service_type', '未設定')}")
-                    st.write(f"**連絡日**: {service.get('contact_date', '未設定')}")
-                    st.write(f"**対応者**: {service.get('contact_person', '未記載')}")
-                    st.write(f"**連絡方法**: {service.get('contact_method', '未記載')}")
-                    st.write(f"**連絡内容**:\n{service.get('contact_content', '')}")
+                    st.write(f"**事業所名**: {service.facility_name}")
+                    st.write(f"**サービス種別**: {service.service_type}")
+                    st.write(f"**連絡日**: {service.contact_date or '未設定'}")
+                    st.write(f"**対応者**: {service.contact_person}")
+                    st.write(f"**連絡方法**: {service.contact_method}")
+                    st.write(f"**連絡内容**:\n{service.contact_content}")
 
                 with col2:
                     if st.button("削除", key=f"delete_service_{i}", type="secondary"):
@@ -566,33 +790,42 @@ if st.session_state["long_term_goals"]:
     st.header("5️⃣ 計画書プレビュー")
 
     with st.expander("📄 サービス等利用計画書（案）", expanded=True):
-        st.write("## サービス等利用計画書")
-
-        if st.session_state.get("selected_user_id"):
-            user = get_user_detail(st.session_state["selected_user_id"])
-            if user:
-                st.write(f"**利用者名**: {user['name']}")
-                st.write(f"**生年月日**: {user['birth_date']} ({user['age']}歳)")
-                st.write(f"**障害種別**: {user.get('disability_types', '未設定')}")
-
-        st.write("### 長期目標")
-        for i, goal in enumerate(st.session_state["long_term_goals"], 1):
-            st.write(f"{i}. {goal['goal_text']}")
-            st.write(f"   - 評価期間: {goal['evaluation_period']}")
-            st.write(f"   - 評価方法: {goal['evaluation_method']}")
+        # プレビュー全体を1つのMarkdownとして組み立てて表示する
+        parts = ["## サービス等利用計画書"]
+
+        # Step 1 で選択した利用者情報（一覧取得時のもの）をそのまま使う
+        user = st.session_state.get("selected_user")
+        if user:
+            parts.append(f"**利用者名**: {user['name']}")
+            parts.append(f"**生年月日**: {user['birth_date']} ({user['age']}歳)")
+            parts.append(f"**障害種別**: {user.get('disability_types', '未設定')}")
+
+        parts.append("### 長期目標")
+        parts.append("\n".join(
+            f"{i}. {goal.goal_text}\n"
+            f"   - 評価期間: {goal.evaluation_period}\n"
+            f"   - 評価方法: {goal.evaluation_method}"
+            for i, goal in enumerate(st.session_state["long_term_goals"], 1)
+        ))
 
         if st.session_state["short_term_goals"]:
-            st.write("### 短期目標")
-            for i, goal in enumerate(st.session_state["short_term_goals"], 1):
-                st.write(f"{i}. {goal['goal_text']}")
-                st.write(f"   - 評価期間: {goal['evaluation_period']}")
+            parts.append("### 短期目標")
+            parts.append("\n".join(
+                f"{i}. {goal.goal_text}\n"
+                f"   - 評価期間: {goal.evaluation_period}"
+                for i, goal in enumerate(st.session_state["short_term_goals"], 1)
+            ))
 
         if st.session_state["services"]:
-            st.write("### サービス調整")
-            for i, service in enumerate(st.session_state["services"], 1):
-                st.write(f"{i}. **{service['facility_name']}** ({service['service_type']})")
-                st.write(f"   - 利用頻度: {service.get('frequency', '未設定')}")
-                st.write(f"   - 利用開始予定日: {service.get('start_date', '未設定')}")
+            parts.append("### サービス調整")
+            parts.append("\n".join(
+                f"{i}. **{service.facility_name}** ({service.service_type})\n"
+                f"   - 利用頻度: {service.frequency or '未設定'}\n"
+                f"   - 利用開始予定日: {service.start_date or '未設定'}"
+                for i, service in enumerate(st.session_state["services"], 1)
+            ))
+
+        st.markdown("\n\n".join(parts))
 
         st.info("📝 正式な計画書生成機能（PDF/Word出力）は今後実装予定です")
 
@@ -615,51 +848,24 @@ if st.session_state["long_term_goals"]:
             else:
                 try:
                     # 計画データの準備
-                    long_term_goals_data = [
-                        {
-                            "goal": goal["goal_text"],
-                            "period": goal.get("evaluation_period", ""),
-                            "criteria": goal.get("evaluation_method", "")
-                        }
-                        for goal in st.session_state["long_term_goals"]
-                    ]
-
-                    short_term_goals_data = [
-                        {
-                            "goal": goal["goal_text"],
-                            "period": goal.get("evaluation_period", ""),
-                            "criteria": goal.get("evaluation_method", "")
-                        }
-                        for goal in st.session_state.get("short_term_goals", [])
-                    ]
-
-                    services_data = [
-                        {
-                            "service_type": service["service_type"],
-                            "facility_id": service.get("facility_id"),
-                            "facility_name": service.get("facility_name"),
-                            "frequency": service.get("frequency"),
-                            "start_date": service.get("start_date")
-                        }
-                        for service in st.session_state.get("services", [])
-                    ]
-
                     plan_data = {
                         "user_id": st.session_state["selected_user_id"],
                         "assessment_id": st.session_state["selected_assessment_id"],
-                        "long_term_goals": long_term_goals_data,
-                        "short_term_goals": short_term_goals_data,
-                        "services": services_data,
+                        "long_term_goals": [goal.to_payload() for goal in st.session_state["long_term_goals"]],
+                        "short_term_goals": [goal.to_payload() for goal in st.session_state.get("short_term_goals", [])],
+                        "services": [service.to_payload() for service in st.session_state.get("services", [])],
                         "plan_type": "個別支援計画",
                         "status": "draft"
                     }
 
-                    # API呼び出し
-                    response = requests.post(f"{API_BASE_URL}/plans", json=plan_data)
+                    # API呼び出し（完了までスピナーを表示する）
+                    with st.spinner("計画を保存中..."):
+                        response = api_request("POST", "/plans", json=plan_data, timeout=SAVE_REQUEST_TIMEOUT)
 
                     if response.status_code == 201:
-                        plan = response.json()
+                        plan = orjson.loads(response.content)
                         st.session_state["plan_id"] = plan["plan_id"]
+                        st.session_state["saved_plan_id"] = plan["plan_id"]
                         logger.info(f"Plan saved successfully: {plan['plan_id']}")
 
                         st.success(f"✅ 計画を保存しました（計画ID: {plan['plan_id']}）")
@@ -667,36 +873,17 @@ if st.session_state["long_term_goals"]:
 
                         # 保存後のアクション
                         with st.expander("🎉 保存完了！次のステップ"):
-                            st.write("**計画が正常に保存されました**")
-                            st.write(f"- 計画ID: `{plan['plan_id']}`")
-                            st.write(f"- 長期目標: {len(plan.get('long_term_goals', []))}件")
-                            st.write(f"- 短期目標: {len(plan.get('short_term_goals', []))}件")
-                            st.write(f"- サービス: {len(plan.get('services', []))}件")
-                            st.write("")
-                            st.write("**次にできること:**")
-                            st.write("1. モニタリングページで進捗を記録")
-                            st.write("2. 計画内容を修正（実装予定）")
-                            st.write("3. PDF/Wordで出力")
-
-                            # PDF/Wordダウンロードボタン
-                            st.markdown("---")
-                            col_pdf, col_word = st.columns(2)
-
-                            with col_pdf:
-                                pdf_url = f"{API_BASE_URL}/plans/{plan['plan_id']}/pdf"
-                                st.link_button(
-                                    "📄 PDFをダウンロード",
-                                    pdf_url,
-                                    use_container_width=True
-                                )
-
-                            with col_word:
-                                word_url = f"{API_BASE_URL}/plans/{plan['plan_id']}/word"
-                                st.link_button(
-                                    "📝 Wordをダウンロード",
-                                    word_url,
-                                    use_container_width=True
-                                )
+                            st.markdown(
+                                "**計画が正常に保存されました**\n\n"
+                                f"- 計画ID: `{plan['plan_id']}`\n"
+                                f"- 長期目標: {len(plan.get('long_term_goals', []))}件\n"
+                                f"- 短期目標: {len(plan.get('short_term_goals', []))}件\n"
+                                f"- サービス: {len(plan.get('services', []))}件\n\n"
+                                "**次にできること:**\n\n"
+                                "1. モニタリングページで進捗を記録\n"
+                                "2. 計画内容を修正（実装予定）\n"
+                                "3. PDF/Wordで出力"
+                            )
 
                     else:
                         st.error(f"❌ 保存に失敗しました: {response.text}")
@@ -705,3 +892,40 @@ if st.session_state["long_term_goals"]:
                 except Exception as e:
                     st.error(f"❌ エラーが発生しました: {str(e)}")
                     logger.error(f"Plan save error: {e}")
+
+    # 計画書ダウンロード（保存ボタンの外に置き、ダウンロード後の再実行でも表示し続ける）
+    saved_plan_id = st.session_state.get("saved_plan_id")
+    if saved_plan_id:
+        st.markdown("---")
+        st.markdown(f"#### 📥 計画書ダウンロード（計画ID: `{saved_plan_id}`）")
+        col_pdf, col_word = st.columns(2)
+
+        # 生成には時間がかかるため、押された形式だけを取得する
+        document_formats = (
+            (col_pdf, "pdf", "📄 PDF", "pdf", "application/pdf"),
+            (col_word, "word", "📝 Word", "docx",
+             "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+        )
+        for column, fmt, label, extension, mime in document_formats:
+            with column:
+                prepared_key = (saved_plan_id, fmt)
+                if prepared_key not in st.session_state["prepared_plan_documents"]:
+                    if not st.button(f"{label}を準備", use_container_width=True, key=f"prepare_plan_{fmt}"):
+                        continue
+                    st.session_state["prepared_plan_documents"].add(prepared_key)
+                try:
+                    with st.spinner(f"{label}を生成中..."):
+                        document = get_plan_document(saved_plan_id, fmt)
+                    st.download_button(
+                        f"{label}をダウンロード",
+                        data=document,
+                        file_name=f"plan_{saved_plan_id}.{extension}",
+                        mime=mime,
+                        on_click="ignore",
+                        use_container_width=True,
+                        key=f"download_plan_{fmt}"
+                    )
+                except requests.RequestException as e:
+                    st.session_state["prepared_plan_documents"].discard(prepared_key)
+                    st.warning(f"{label}の生成に失敗しました")
+                    logger.error(f"Plan document export error ({fmt}): {e}")
@@ -6,49 +6,134 @@ User-friendly chat interface for searching disability welfare facilities.
 """
 import streamlit as st
 import requests
-from typing import Dict, Any
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Dict, Any, Iterator, Tuple
+import orjson
 
 # API endpoint configuration
 API_BASE_URL = "http://localhost:8000"
 
 
-def get_health_status() -> Dict[str, Any]:
-    """Get API health status."""
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Shared HTTP session so API calls reuse keep-alive connections across reruns."""
+    session = requests.Session()
+    # Retry transient connection errors / 5xx on GET only
+    # (POST /search runs the LLM, so a retry could double a long wait)
+    retries = Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+    )
+    session.mount(
+        "http://",
+        HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retries)
+    )
+    session.headers.update({"Accept": "application/json"})
+    return session
+
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """Thread pool for running independent API calls concurrently."""
+    return ThreadPoolExecutor(max_workers=2)
+
+
+def request_health_status() -> Dict[str, Any]:
+    """Get API health status (plain request, safe to run on a worker thread)."""
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=5)
-        return response.json()
+        response = get_session().get(f"{API_BASE_URL}/health", timeout=(0.5, 2))
+        return orjson.loads(response.content)
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
+@st.cache_data(ttl=300, show_spinner=False)
 def get_stats() -> Dict[str, Any]:
-    """Get database statistics."""
+    """Get database statistics (cached for 5 minutes; errors are raised, not cached)."""
+    response = get_session().get(f"{API_BASE_URL}/stats", timeout=5)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
+# Short TTL: reruns within a few seconds reuse the last status. Errors are
+# cached too, so an unreachable API doesn't block every rerun on a timeout.
+@st.cache_data(ttl=10, show_spinner=False)
+def get_system_info() -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Get API health status and database statistics (cached for 10 seconds).
+
+    The health request runs on a worker thread while statistics are read
+    through get_stats() here, so a cold sidebar waits for the slower call only.
+    """
+    health_future = get_executor().submit(request_health_status)
     try:
-        response = requests.get(f"{API_BASE_URL}/stats", timeout=5)
-        return response.json()
+        stats = get_stats()
     except Exception as e:
-        return {"error": str(e)}
+        stats = {"error": str(e)}
+    return health_future.result(), stats
 
 
-def search_facilities(query: str) -> Dict[str, Any]:
-    """Search facilities using natural language."""
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/search",
-            json={"query": query},
-            timeout=60,
-        )
+def search_facilities(query: str, result: Dict[str, Any]) -> Iterator[str]:
+    """
+    Search facilities using natural language, streaming the answer.
+
+    Yields answer fragments as the LLM generates them. The facilities and
+    search metadata (sent before the answer) are stored into ``result``.
+    """
+    with get_session().post(
+        f"{API_BASE_URL}/search/stream",
+        data=orjson.dumps({"query": query}),
+        headers={"Content-Type": "application/json"},
+        stream=True,
+        timeout=60,
+    ) as response:
         response.raise_for_status()
-        data = response.json()
-        # Debug logging
-        print(f"DEBUG: API Response status={response.status_code}")
-        print(f"DEBUG: facility_count={data.get('facility_count', 0)}")
-        print(f"DEBUG: search_params={data.get('search_params')}")
-        return data
-    except Exception as e:
-        print(f"ERROR: {type(e).__name__}: {e}")
-        return {"error": str(e)}
+        # Newline-delimited JSON frames: "result", then "token"s (or "error")
+        for line in response.iter_lines():
+            if not line:
+                continue
+            frame = orjson.loads(line)
+            if frame["type"] == "token":
+                yield frame["token"]
+            elif frame["type"] == "error":
+                raise RuntimeError(frame["detail"])
+            else:
+                result.update(frame)
+
+
+# Columns shown in the facility result table (key -> column config)
+FACILITY_COLUMNS = {
+    "name": st.column_config.TextColumn("事業所名"),
+    "corporation_name": st.column_config.TextColumn("法人"),
+    "service_type": st.column_config.TextColumn("種別"),
+    "district": st.column_config.TextColumn("所在"),
+    "phone": st.column_config.TextColumn("電話"),
+    "capacity": st.column_config.NumberColumn("定員", format="%d名"),
+    "availability_status": st.column_config.TextColumn("空き"),
+    "website_url": st.column_config.LinkColumn("ホームページ", display_text="開く"),
+}
+
+
+def compact_facilities(facilities: list) -> tuple:
+    """Keep only the displayed fields, as one tuple per facility (in FACILITY_COLUMNS order)."""
+    return tuple(tuple(facility.get(key) for key in FACILITY_COLUMNS) for facility in facilities)
+
+
+def render_facilities(rows: tuple) -> None:
+    """Render compacted facility rows as a single table inside a collapsed expander."""
+    with st.expander(f"該当事業所 ({len(rows)}件)", expanded=False):
+        st.dataframe(
+            [dict(zip(FACILITY_COLUMNS, row)) for row in rows],
+            column_config=FACILITY_COLUMNS,
+            column_order=list(FACILITY_COLUMNS),
+            hide_index=True,
+            use_container_width=True,
+        )
 
 
 # Page configuration
@@ -84,8 +169,8 @@ st.markdown("AI搭載の自然言語検索で、必要なサービスをすぐ
 with st.sidebar:
     st.header("システム情報")
 
-    # Health check
-    health = get_health_status()
+    # Health check and statistics
+    health, stats = get_system_info()
     if health.get("status") == "healthy":
         st.success("✓ システム正常")
         st.caption(f"Neo4j: {'接続中' if health.get('neo4j_connected') else '切断'}")
@@ -99,8 +184,6 @@ with st.sidebar:
 
     # Statistics
     st.header("データベース統計")
-    stats = get_stats()
-
     if "error" not in stats:
         st.metric("総事業所数", stats.get("total_facilities", 0))
 
@@ -141,24 +224,8 @@ for message in st.session_state.messages:
         st.markdown(message["content"])
 
         # Display facility details if available
-        if message["role"] == "assistant" and "facilities" in message:
-            with st.expander(f"該当事業所 ({len(message['facilities'])}件)", expanded=False):
-                for i, facility in enumerate(message["facilities"], 1):
-                    st.markdown(f"**{i}. {facility.get('name', 'N/A')}**")
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.caption(f"法人: {facility.get('corporation_name', 'N/A')}")
-                        st.caption(f"種別: {facility.get('service_type', 'N/A')}")
-                        st.caption(f"所在: {facility.get('district', 'N/A')}")
-                    with col2:
-                        st.caption(f"電話: {facility.get('phone', 'N/A')}")
-                        st.caption(f"定員: {facility.get('capacity', 'N/A')}名")
-                        if availability := facility.get("availability_status"):
-                            st.caption(f"空き: {availability}")
-                        # ホームページリンク表示
-                        if website_url := facility.get("website_url"):
-                            st.markdown(f"🌐 [ホームページを開く]({website_url})")
-                    st.divider()
+        if message["role"] == "assistant" and message.get("facilities"):
+            render_facilities(message["facilities"])
 
 # Chat input
 if prompt := st.chat_input("事業所について質問してください..."):
@@ -169,57 +236,34 @@ if prompt := st.chat_input("事業所について質問してください..."):
 
     # Get AI response
     with st.chat_message("assistant"):
-        with st.spinner("検索中..."):
-            result = search_facilities(prompt)
-
-            if "error" in result:
-                error_msg = f"エラーが発生しました: {result['error']}"
-                st.error(error_msg)
-                st.session_state.messages.append(
-                    {"role": "assistant", "content": error_msg}
-                )
-            else:
-                # Display answer
-                answer = result.get("answer", "回答を生成できませんでした")
-                st.markdown(answer)
-
-                # Display facility cards
-                facilities = result.get("facilities", [])
-                if facilities:
-                    with st.expander(
-                        f"該当事業所 ({len(facilities)}件)", expanded=False
-                    ):
-                        for i, facility in enumerate(facilities, 1):
-                            st.markdown(f"**{i}. {facility.get('name', 'N/A')}**")
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                st.caption(
-                                    f"法人: {facility.get('corporation_name', 'N/A')}"
-                                )
-                                st.caption(
-                                    f"種別: {facility.get('service_type', 'N/A')}"
-                                )
-                                st.caption(f"所在: {facility.get('district', 'N/A')}")
-                            with col2:
-                                st.caption(f"電話: {facility.get('phone', 'N/A')}")
-                                st.caption(
-                                    f"定員: {facility.get('capacity', 'N/A')}名"
-                                )
-                                if availability := facility.get("availability_status"):
-                                    st.caption(f"空き: {availability}")
-                                # ホームページリンク表示
-                                if website_url := facility.get("website_url"):
-                                    st.markdown(f"🌐 [ホームページを開く]({website_url})")
-                            st.divider()
-
-                # Save to chat history
-                st.session_state.messages.append(
-                    {
-                        "role": "assistant",
-                        "content": answer,
-                        "facilities": facilities,
-                    }
-                )
+        result: Dict[str, Any] = {}
+        try:
+            tokens = search_facilities(prompt, result)
+            # Show the spinner only until the first fragment arrives
+            with st.spinner("検索中..."):
+                first_token = next(tokens, "")
+            # Display answer as it is generated
+            answer = st.write_stream(chain([first_token], tokens)) or "回答を生成できませんでした"
+        except Exception as e:
+            error_msg = f"エラーが発生しました: {e}"
+            st.error(error_msg)
+            st.session_state.messages.append(
+                {"role": "assistant", "content": error_msg}
+            )
+        else:
+            # Display facility table (history keeps only the displayed fields)
+            facilities = compact_facilities(result.get("facilities", []))
+            if facilities:
+                render_facilities(facilities)
+
+            # Save to chat history
+            st.session_state.messages.append(
+                {
+                    "role": "assistant",
+                    "content": answer,
+                    "facilities": facilities,
+                }
+            )
 
 # Footer
 st.divider()
@@ -2,10 +2,15 @@
 """
 モニタリング記録ページ
 """
+import pandas as pd
 import streamlit as st
 import requests
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from loguru import logger
 
 # ページ設定
@@ -18,6 +23,49 @@ st.set_page_config(
 # API設定
 API_BASE_URL = "http://localhost:8000/api"
 
+# 過去のモニタリング記録の1ページあたりの表示件数
+RECORDS_PAGE_SIZE = 10
+
+# 目標評価の達成状況の選択肢
+ACHIEVEMENT_STATUS_OPTIONS = ["未達成", "一部達成", "達成", "超過達成"]
+
+# 目標評価表の列設定（目標は表示のみ。達成率・達成状況は前回の評価を引き継ぐ）
+GOAL_EVALUATION_COLUMNS = {
+    "目標": st.column_config.TextColumn("目標", disabled=True, width="large"),
+    "達成率": st.column_config.NumberColumn("達成率 (%)", min_value=0, max_value=100, step=1, required=True),
+    "達成状況": st.column_config.SelectboxColumn("達成状況", options=ACHIEVEMENT_STATUS_OPTIONS, required=True),
+    "評価コメント": st.column_config.TextColumn("評価コメント"),
+    "根拠・具体例": st.column_config.TextColumn("根拠・具体例"),
+    "次のアクション": st.column_config.TextColumn("次のアクション"),
+}
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """APIサーバーとの接続を使い回すためのHTTPセッション（プロセス内で共有）"""
+    session = requests.Session()
+    # 一時的な接続エラー・5xxは短い間隔で再試行する
+    # （POSTはモニタリング記録の重複作成を避けるため再試行しない）
+    retries = Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+    )
+    session.mount(
+        "http://",
+        HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retries)
+    )
+    session.headers.update({"Accept": "application/json"})
+    return session
+
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """独立したAPI呼び出しを並行実行するためのスレッドプール（プロセス内で共有）"""
+    return ThreadPoolExecutor(max_workers=4)
+
+
 # セッション状態の初期化
 if "monitoring_step" not in st.session_state:
     st.session_state["monitoring_step"] = 0
@@ -40,64 +88,98 @@ if "monitoring_data" not in st.session_state:
 
 
 # API Helper Functions
+# 一覧・計画詳細はキャッシュする（エラー時は例外を送出し、キャッシュしない）
+@st.cache_data(ttl=300, show_spinner=False)
 def get_users():
-    """利用者一覧を取得"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/users")
-        response.raise_for_status()
-        data = response.json()
-        # APIは {"users": [...]} 形式で返すので、users配列を取り出す
-        return data.get("users", []) if isinstance(data, dict) else data
-    except Exception as e:
-        logger.error(f"Error fetching users: {e}")
-        return []
+    """利用者一覧を取得（5分キャッシュ）"""
+    response = get_session().get(f"{API_BASE_URL}/users")
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    # APIは {"users": [...]} 形式で返すので、users配列を取り出す
+    return data.get("users", []) if isinstance(data, dict) else data
 
 
+@st.cache_data(ttl=120, show_spinner=False)
 def get_user_plans(user_id: str):
-    """利用者の計画一覧を取得"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/plans/user/{user_id}")
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        logger.error(f"Error fetching plans: {e}")
-        return []
-
-
-def get_plan(plan_id: str):
-    """計画詳細を取得"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/plans/{plan_id}")
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        logger.error(f"Error fetching plan: {e}")
-        return None
+    """利用者の計画一覧を取得（2分キャッシュ）"""
+    response = get_session().get(f"{API_BASE_URL}/plans/user/{user_id}")
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
+# 選択肢は再実行ごとに作り直さず、参照で共有する
+@st.cache_resource(ttl=300, show_spinner=False)
+def build_user_options():
+    """利用者の選択肢（表示名→利用者ID）を作成（利用者一覧と同じく5分キャッシュ）"""
+    return {f"{user['name']} ({user['user_id'][:8]})": user['user_id'] for user in get_users()}
+
+
+@st.cache_resource(ttl=120, show_spinner=False)
+def build_plan_options(plan_summaries: tuple):
+    """
+    計画の選択肢（表示名→計画ID）を作成（モニタリング記録数の多い順）
+
+    Args:
+        plan_summaries: (計画ID, 計画種別, 作成日, モニタリング記録数) のタプル
+    """
+    plan_options = {}
+    for plan_id, plan_type, created_date, count in sorted(plan_summaries, key=lambda x: x[3], reverse=True):
+        if count > 0:
+            display_text = f"📊 {plan_type} (作成日: {created_date}) - モニタリング: {count}件"
+        else:
+            display_text = f"📄 {plan_type} (作成日: {created_date}) - 記録なし"
+        plan_options[display_text] = plan_id
+    return plan_options
+
+
+def clear_monitoring_cache():
+    """他ページでの登録・更新を反映するため、このページのキャッシュを破棄"""
+    get_users.clear()
+    get_user_plans.clear()
+    build_user_options.clear()
+    build_plan_options.clear()
+    fetch_monitoring_records.clear()
+
+
+def request_monitoring_records(plan_id: str):
+    """モニタリング記録一覧を取得（エラーは送出する。ワーカースレッドから呼ぶため画面表示はしない）"""
+    url = f"{API_BASE_URL}/monitoring/plans/{plan_id}/monitoring"
+    response = get_session().get(url)
+    response.raise_for_status()
+    records = orjson.loads(response.content)
+    logger.info(f"Fetched {len(records)} monitoring records for plan {plan_id}")
+    return records
+
+
+@st.cache_data(ttl=120, show_spinner=False)
+def fetch_monitoring_records(plan_ids: tuple) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    計画ごとのモニタリング記録を取得（2分キャッシュ）。戻り値は計画ID→記録一覧
+
+    HTTP取得のみスレッドプールで並行して行う。1件でも失敗した場合は例外を送出する（キャッシュされない）。
+    """
+    futures = {
+        plan_id: get_executor().submit(request_monitoring_records, plan_id)
+        for plan_id in plan_ids
+    }
+    return {plan_id: future.result() for plan_id, future in futures.items()}
 
 
-def get_monitoring_records(plan_id: str):
-    """モニタリング記録一覧を取得"""
+def monitoring_records_result(plan_ids: tuple) -> Dict[str, List[Dict[str, Any]]]:
+    """計画ごとのモニタリング記録を受け取る（取得エラーはここで表示し、記録なしとして扱う）"""
     try:
-        url = f"{API_BASE_URL}/monitoring/plans/{plan_id}/monitoring"
-        response = requests.get(url)
-        response.raise_for_status()
-        records = response.json()
-        logger.info(f"Fetched {len(records)} monitoring records for plan {plan_id}")
-        return records
+        return fetch_monitoring_records(plan_ids)
     except Exception as e:
-        logger.error(f"Error fetching monitoring records from {url}: {e}")
+        logger.error(f"Error fetching monitoring records for plans {plan_ids}: {e}")
         st.error(f"モニタリング記録の取得エラー: {str(e)}")
-        return []
+        return {plan_id: [] for plan_id in plan_ids}
 
 
-def get_latest_goal_evaluation(plan_id: str, goal_id: str) -> Dict[str, Any]:
-    """前回のモニタリング記録から目標評価を取得"""
-    records = get_monitoring_records(plan_id)
-    if not records:
+def get_latest_goal_evaluation(latest_record: Optional[Dict[str, Any]], goal_id: str) -> Dict[str, Any]:
+    """前回のモニタリング記録（最新の1件）から目標評価を取得"""
+    if not latest_record:
         return {"achievement_rate": 50, "achievement_status": "未達成"}
 
-    # 最新のモニタリング記録を取得
-    latest_record = records[0]
     goal_evaluations = latest_record.get("goal_evaluations", [])
 
     # 該当する目標の評価を検索
@@ -114,6 +196,51 @@ def get_latest_goal_evaluation(plan_id: str, goal_id: str) -> Dict[str, Any]:
     return {"achievement_rate": 50, "achievement_status": "未達成"}
 
 
+def render_goal_evaluations(goals: List[Dict[str, Any]], goal_type: str, key: str) -> List[Dict[str, Any]]:
+    """目標評価を1つの表（st.data_editor）で入力し、API送信用の評価リストを返す"""
+    if not goals:
+        return []
+
+    rows = []
+    for goal in goals:
+        # 前回の評価を引き継ぐ
+        previous_eval = get_latest_goal_evaluation(
+            st.session_state.get("monitoring_previous_record"),
+            goal.get("goal_id")
+        )
+        previous_status = previous_eval.get("achievement_status", "未達成")
+        rows.append({
+            "目標": goal.get("goal_text", goal.get("goal", "")),
+            "達成率": previous_eval.get("achievement_rate", 50),
+            "達成状況": previous_status if previous_status in ACHIEVEMENT_STATUS_OPTIONS else "未達成",
+            "評価コメント": "",
+            "根拠・具体例": "",
+            "次のアクション": "",
+        })
+
+    edited = st.data_editor(
+        pd.DataFrame(rows),
+        column_config=GOAL_EVALUATION_COLUMNS,
+        num_rows="fixed",
+        hide_index=True,
+        use_container_width=True,
+        key=key
+    )
+
+    return [
+        {
+            "goal_id": goal.get("goal_id"),
+            "goal_type": goal_type,
+            "achievement_rate": int(row["達成率"]),
+            "evaluation_comment": row["評価コメント"] or "",
+            "achievement_status": row["達成状況"],
+            "evidence": row["根拠・具体例"] or None,
+            "next_action": row["次のアクション"] or None
+        }
+        for goal, row in zip(goals, edited.to_dict("records"))
+    ]
+
+
 def create_monitoring_record(plan_id: str, record_data: Dict[str, Any]):
     """モニタリング記録を作成"""
     try:
@@ -121,12 +248,15 @@ def create_monitoring_record(plan_id: str, record_data: Dict[str, Any]):
         if isinstance(record_data.get("monitoring_date"), datetime):
             record_data["monitoring_date"] = record_data["monitoring_date"].isoformat()
 
-        response = requests.post(
+        response = get_session().post(
             f"{API_BASE_URL}/monitoring/plans/{plan_id}/monitoring",
-            json=record_data
+            data=orjson.dumps(record_data),
+            headers={"Content-Type": "application/json"}
         )
         response.raise_for_status()
-        return response.json()
+        # 記録数・記録一覧に新しい記録を反映する
+        fetch_monitoring_records.clear()
+        return orjson.loads(response.content)
     except Exception as e:
         logger.error(f"Error creating monitoring record: {e}")
         raise
@@ -134,6 +264,8 @@ def create_monitoring_record(plan_id: str, record_data: Dict[str, Any]):
 
 # ページタイトル
 st.title("📊 モニタリング記録")
+if st.button("🔄 最新の情報に更新", help="利用者・計画の一覧を再取得します"):
+    clear_monitoring_cache()
 st.markdown("---")
 
 # 利用者・計画選択セクション
@@ -143,9 +275,12 @@ col1, col2 = st.columns(2)
 
 with col1:
     # 利用者選択
-    users = get_users()
-    if users:
-        user_options = {f"{user['name']} ({user['user_id'][:8]})": user['user_id'] for user in users}
+    try:
+        user_options = build_user_options()
+    except Exception as e:
+        logger.error(f"Error fetching users: {e}")
+        user_options = {}
+    if user_options:
         selected_user_display = st.selectbox(
             "利用者を選択",
             options=list(user_options.keys()),
@@ -159,30 +294,25 @@ with col1:
 with col2:
     # 計画選択
     if selected_user_id:
-        plans = get_user_plans(selected_user_id)
+        try:
+            plans = get_user_plans(selected_user_id)
+        except Exception as e:
+            logger.error(f"Error fetching plans: {e}")
+            plans = []
         if plans:
-            # 各計画のモニタリング記録数を取得
-            plans_with_monitoring = []
-            for plan in plans:
-                monitoring_count = len(get_monitoring_records(plan['plan_id']))
-                plans_with_monitoring.append({
-                    'plan': plan,
-                    'monitoring_count': monitoring_count
-                })
-
-            # モニタリング記録数でソート（多い順）
-            plans_with_monitoring.sort(key=lambda x: x['monitoring_count'], reverse=True)
-
-            # 表示用のオプションを作成
-            plan_options = {}
-            for item in plans_with_monitoring:
-                plan = item['plan']
-                count = item['monitoring_count']
-                if count > 0:
-                    display_text = f"📊 {plan.get('plan_type', '個別支援計画')} (作成日: {plan.get('created_at', '')[:10]}) - モニタリング: {count}件"
-                else:
-                    display_text = f"📄 {plan.get('plan_type', '個別支援計画')} (作成日: {plan.get('created_at', '')[:10]}) - 記録なし"
-                plan_options[display_text] = plan['plan_id']
+            # 各計画のモニタリング記録を並行して取得（記録数の表示と下の記録一覧で使う）
+            records_by_plan = monitoring_records_result(tuple(plan['plan_id'] for plan in plans))
+
+            # 表示用のオプションを作成（記録数が変わったときだけ作り直す）
+            plan_options = build_plan_options(tuple(
+                (
+                    plan['plan_id'],
+                    plan.get('plan_type', '個別支援計画'),
+                    plan.get('created_at', '')[:10],
+                    len(records_by_plan[plan['plan_id']])
+                )
+                for plan in plans
+            ))
 
             selected_plan_display = st.selectbox(
                 "計画を選択",
@@ -192,9 +322,9 @@ with col2:
             )
             selected_plan_id = plan_options[selected_plan_display]
 
-            # 選択した計画の詳細を取得
-            if selected_plan_id:
-                selected_plan = get_plan(selected_plan_id)
+            # 計画一覧は目標・サービスを含む完全な計画を返すため、詳細は取得し直さない
+            plan_by_id = {plan['plan_id']: plan for plan in plans}
+            selected_plan = plan_by_id[selected_plan_id]
         else:
             st.warning("この利用者の計画がありません")
             st.stop()
@@ -206,12 +336,25 @@ if selected_plan_id:
     st.header("📋 過去のモニタリング記録")
 
 
-    records = get_monitoring_records(selected_plan_id)
+    # 計画選択時に取得済みの記録を使う
+    records = records_by_plan[selected_plan_id]
 
     if records:
         st.write(f"**記録件数**: {len(records)}件")
 
-        for record in records:
+        # 表示中のページの記録だけウィジェットを組み立てる
+        page_count = (len(records) + RECORDS_PAGE_SIZE - 1) // RECORDS_PAGE_SIZE
+        if page_count > 1:
+            page = st.selectbox(
+                "ページ",
+                options=range(page_count),
+                format_func=lambda i: f"{i + 1} / {page_count}（{i * RECORDS_PAGE_SIZE + 1}〜{min((i + 1) * RECORDS_PAGE_SIZE, len(records))}件目）",
+                key=f"records_page_{selected_plan_id}"
+            )
+        else:
+            page = 0
+
+        for record in records[page * RECORDS_PAGE_SIZE:(page + 1) * RECORDS_PAGE_SIZE]:
             with st.expander(
                 f"📅 {record['monitoring_date'][:10]} - {record['monitoring_type']} (ステータス: {record['status']})"
             ):
@@ -253,6 +396,9 @@ if st.button("🆕 新しいモニタリング記録を作成", type="primary",
     st.session_state["creating_monitoring"] = True
     st.session_state["monitoring_plan_id"] = selected_plan_id
     st.session_state["monitoring_plan"] = selected_plan
+    # 前回評価の引き継ぎ用に最新の記録を保持し、目標評価ステップで再取得しない
+    previous_records = records_by_plan[selected_plan_id]
+    st.session_state["monitoring_previous_record"] = previous_records[0] if previous_records else None
     st.rerun()
 
 # モニタリング記録作成フロー
@@ -270,40 +416,46 @@ if st.session_state.get("creating_monitoring"):
 
     st.markdown("---")
 
+    # Step 1〜4 は入力中に再実行しないよう、各ステップをフォームにまとめてボタンで反映する
+    # （フォーム内のウィジェットは送信されるまで前回の値を返すため、毎回の保存処理はそのままでよい）
+
     # Step 1: 基本情報
     if st.session_state["monitoring_step"] == 1:
         st.subheader("1️⃣ 基本情報")
 
-        col1, col2, col3 = st.columns(3)
+        with st.form("monitoring_step1_form", border=False):
+            col1, col2, col3 = st.columns(3)
 
-        with col1:
-            monitoring_date = st.date_input(
-                "記録日",
-                value=date.today(),
-                key="monitoring_date_input"
-            )
-            st.session_state["monitoring_data"]["monitoring_date"] = datetime.combine(
-                monitoring_date, datetime.min.time()
-            )
+            with col1:
+                monitoring_date = st.date_input(
+                    "記録日",
+                    value=date.today(),
+                    key="monitoring_date_input"
+                )
+                st.session_state["monitoring_data"]["monitoring_date"] = datetime.combine(
+                    monitoring_date, datetime.min.time()
+                )
 
-        with col2:
-            monitoring_type = st.selectbox(
-                "モニタリング種別",
-                options=["定期", "臨時", "終結時"],
-                key="monitoring_type_input"
-            )
-            st.session_state["monitoring_data"]["monitoring_type"] = monitoring_type
+            with col2:
+                monitoring_type = st.selectbox(
+                    "モニタリング種別",
+                    options=["定期", "臨時", "終結時"],
+                    key="monitoring_type_input"
+                )
+                st.session_state["monitoring_data"]["monitoring_type"] = monitoring_type
 
-        with col3:
-            status = st.selectbox(
-                "ステータス",
-                options=["進行中", "完了", "要改善"],
-                key="status_input"
-            )
-            st.session_state["monitoring_data"]["status"] = status
+            with col3:
+                status = st.selectbox(
+                    "ステータス",
+                    options=["進行中", "完了", "要改善"],
+                    key="status_input"
+                )
+                st.session_state["monitoring_data"]["status"] = status
+
+            # 次へボタン
+            next_clicked = st.form_submit_button("次へ ➡️", type="primary")
 
-        # 次へボタン
-        if st.button("次へ ➡️", type="primary"):
+        if next_clicked:
             st.session_state["monitoring_step"] = 2
             st.rerun()
 
@@ -313,147 +465,36 @@ if st.session_state.get("creating_monitoring"):
 
         plan = st.session_state["monitoring_plan"]
 
-        # 長期目標評価
-        st.write("**長期目標の評価**")
-        long_term_evaluations = []
-
-        for i, goal in enumerate(plan.get("long_term_goals", []), 1):
-            # 前回の評価を取得
-            previous_eval = get_latest_goal_evaluation(
-                st.session_state["monitoring_plan_id"],
-                goal.get("goal_id")
+        with st.form("monitoring_step2_form", border=False):
+            # 目標ごとにウィジェットを並べず、長期・短期それぞれ1つの表で評価を入力する
+            st.write("**長期目標の評価**")
+            long_term_evaluations = render_goal_evaluations(
+                plan.get("long_term_goals", []), "long_term", "lt_evaluation_editor"
             )
 
-            with st.expander(f"長期目標 {i}: {goal.get('goal_text', goal.get('goal', ''))}"):
-                col1, col2 = st.columns(2)
-
-                with col1:
-                    achievement_rate = st.slider(
-                        "達成率 (%)",
-                        min_value=0,
-                        max_value=100,
-                        value=previous_eval.get("achievement_rate", 50),
-                        key=f"lt_achievement_{i}",
-                        help="前回の評価を引き継いでいます"
-                    )
-
-                    # 達成状況の選択肢インデックスを取得
-                    status_options = ["未達成", "一部達成", "達成", "超過達成"]
-                    previous_status = previous_eval.get("achievement_status", "未達成")
-                    default_index = status_options.index(previous_status) if previous_status in status_options else 0
-
-                    achievement_status = st.selectbox(
-                        "達成状況",
-                        options=status_options,
-                        index=default_index,
-                        key=f"lt_status_{i}"
-                    )
-
-                with col2:
-                    evaluation_comment = st.text_area(
-                        "評価コメント",
-                        key=f"lt_comment_{i}",
-                        height=100
-                    )
-
-                    evidence = st.text_input(
-                        "根拠・具体例",
-                        key=f"lt_evidence_{i}"
-                    )
-
-                next_action = st.text_input(
-                    "次のアクション",
-                    key=f"lt_next_{i}"
-                )
-
-                long_term_evaluations.append({
-                    "goal_id": goal.get("goal_id"),
-                    "goal_type": "long_term",
-                    "achievement_rate": achievement_rate,
-                    "evaluation_comment": evaluation_comment,
-                    "achievement_status": achievement_status,
-                    "evidence": evidence if evidence else None,
-                    "next_action": next_action if next_action else None
-                })
-
-        # 短期目標評価
-        st.write("**短期目標の評価**")
-        short_term_evaluations = []
-
-        for i, goal in enumerate(plan.get("short_term_goals", []), 1):
-            # 前回の評価を取得
-            previous_eval = get_latest_goal_evaluation(
-                st.session_state["monitoring_plan_id"],
-                goal.get("goal_id")
+            st.write("**短期目標の評価**")
+            short_term_evaluations = render_goal_evaluations(
+                plan.get("short_term_goals", []), "short_term", "st_evaluation_editor"
             )
 
-            with st.expander(f"短期目標 {i}: {goal.get('goal_text', goal.get('goal', ''))}"):
-                col1, col2 = st.columns(2)
-
-                with col1:
-                    achievement_rate = st.slider(
-                        "達成率 (%)",
-                        min_value=0,
-                        max_value=100,
-                        value=previous_eval.get("achievement_rate", 50),
-                        key=f"st_achievement_{i}",
-                        help="前回の評価を引き継いでいます"
-                    )
-
-                    # 達成状況の選択肢インデックスを取得
-                    status_options = ["未達成", "一部達成", "達成", "超過達成"]
-                    previous_status = previous_eval.get("achievement_status", "未達成")
-                    default_index = status_options.index(previous_status) if previous_status in status_options else 0
-
-                    achievement_status = st.selectbox(
-                        "達成状況",
-                        options=status_options,
-                        index=default_index,
-                        key=f"st_status_{i}"
-                    )
-
-                with col2:
-                    evaluation_comment = st.text_area(
-                        "評価コメント",
-                        key=f"st_comment_{i}",
-                        height=100
-                    )
-
-                    evidence = st.text_input(
-                        "根拠・具体例",
-                        key=f"st_evidence_{i}"
-                    )
-
-                next_action = st.text_input(
-                    "次のアクション",
-                    key=f"st_next_{i}"
-                )
-
-                short_term_evaluations.append({
-                    "goal_id": goal.get("goal_id"),
-                    "goal_type": "short_term",
-                    "achievement_rate": achievement_rate,
-                    "evaluation_comment": evaluation_comment,
-                    "achievement_status": achievement_status,
-                    "evidence": evidence if evidence else None,
-                    "next_action": next_action if next_action else None
-                })
+            # ナビゲーションボタン
+            col_back, col_next = st.columns(2)
+            with col_back:
+                back_clicked = st.form_submit_button("⬅️ 戻る")
+            with col_next:
+                next_clicked = st.form_submit_button("次へ ➡️", type="primary")
 
         # 評価データを保存
         st.session_state["monitoring_data"]["goal_evaluations"] = (
             long_term_evaluations + short_term_evaluations
         )
 
-        # ナビゲーションボタン
-        col_back, col_next = st.columns(2)
-        with col_back:
-            if st.button("⬅️ 戻る"):
-                st.session_state["monitoring_step"] = 1
-                st.rerun()
-        with col_next:
-            if st.button("次へ ➡️", type="primary"):
-                st.session_state["monitoring_step"] = 3
-                st.rerun()
+        if back_clicked:
+            st.session_state["monitoring_step"] = 1
+            st.rerun()
+        if next_clicked:
+            st.session_state["monitoring_step"] = 3
+            st.rerun()
 
     # Step 3: サービス評価
     elif st.session_state["monitoring_step"] == 3:
@@ -465,123 +506,138 @@ if st.session_state.get("creating_monitoring"):
         if "service_eval_count" not in st.session_state:
             st.session_state["service_eval_count"] = 0
 
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            st.write(f"**登録済みサービス評価**: {st.session_state['service_eval_count']}件")
-        with col2:
-            if st.button("➕ サービス追加"):
-                st.session_state["service_eval_count"] += 1
-                st.rerun()
-
         service_evaluations = []
 
-        # サービス評価フォーム
-        for i in range(1, st.session_state["service_eval_count"] + 1):
-            with st.expander(f"サービス {i}", expanded=(i == st.session_state["service_eval_count"])):
-                service_name = st.text_input(
-                    "サービス名",
-                    key=f"service_name_{i}",
-                    placeholder="例: 生活介護（A事業所）"
-                )
-
-                col1, col2 = st.columns(2)
-
-                with col1:
-                    attendance_rate = st.slider(
-                        "出席率 (%)",
-                        min_value=0,
-                        max_value=100,
-                        value=80,
-                        key=f"service_attendance_{i}"
-                    )
-
-                    satisfaction = st.selectbox(
-                        "満足度",
-                        options=["非常に良好", "良好", "普通", "やや不満", "不満"],
-                        index=1,
-                        key=f"service_satisfaction_{i}"
-                    )
-
-                with col2:
-                    evaluation = st.text_area(
-                        "評価コメント",
-                        key=f"service_evaluation_{i}",
-                        height=100,
-                        placeholder="サービス利用の効果や変化について"
+        with st.form("monitoring_step3_form", border=False):
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.write(f"**登録済みサービス評価**: {st.session_state['service_eval_count']}件")
+            with col2:
+                # 入力途中の内容も一緒に送信されるよう、追加もフォームのボタンで行う
+                add_clicked = st.form_submit_button("➕ サービス追加")
+
+            # サービス評価フォーム
+            for i in range(1, st.session_state["service_eval_count"] + 1):
+                with st.expander(f"サービス {i}", expanded=(i == st.session_state["service_eval_count"])):
+                    service_name = st.text_input(
+                        "サービス名",
+                        key=f"service_name_{i}",
+                        placeholder="例: 生活介護（A事業所）"
                     )
 
-                if service_name:  # サービス名が入力されている場合のみ追加
-                    service_evaluations.append({
-                        "service_name": service_name,
-                        "attendance_rate": attendance_rate,
-                        "satisfaction": satisfaction,
-                        "evaluation": evaluation if evaluation else None
-                    })
+                    col1, col2 = st.columns(2)
+
+                    with col1:
+                        attendance_rate = st.slider(
+                            "出席率 (%)",
+                            min_value=0,
+                            max_value=100,
+                            value=80,
+                            key=f"service_attendance_{i}"
+                        )
+
+                        satisfaction = st.selectbox(
+                            "満足度",
+                            options=["非常に良好", "良好", "普通", "やや不満", "不満"],
+                            index=1,
+                            key=f"service_satisfaction_{i}"
+                        )
+
+                    with col2:
+                        evaluation = st.text_area(
+                            "評価コメント",
+                            key=f"service_evaluation_{i}",
+                            height=100,
+                            placeholder="サービス利用の効果や変化について"
+                        )
+
+                    if service_name:  # サービス名が入力されている場合のみ追加
+                        service_evaluations.append({
+                            "service_name": service_name,
+                            "attendance_rate": attendance_rate,
+                            "satisfaction": satisfaction,
+                            "evaluation": evaluation if evaluation else None
+                        })
+
+            # ナビゲーションボタン
+            col_back, col_next = st.columns(2)
+            with col_back:
+                back_clicked = st.form_submit_button("⬅️ 戻る")
+            with col_next:
+                next_clicked = st.form_submit_button("次へ ➡️", type="primary")
 
         st.session_state["monitoring_data"]["service_evaluations"] = service_evaluations
 
-        # ナビゲーションボタン
-        col_back, col_next = st.columns(2)
-        with col_back:
-            if st.button("⬅️ 戻る"):
-                st.session_state["monitoring_step"] = 2
-                st.rerun()
-        with col_next:
-            if st.button("次へ ➡️", type="primary"):
-                st.session_state["monitoring_step"] = 4
-                st.rerun()
+        if add_clicked:
+            st.session_state["service_eval_count"] += 1
+            st.rerun()
+        if back_clicked:
+            st.session_state["monitoring_step"] = 2
+            st.rerun()
+        if next_clicked:
+            st.session_state["monitoring_step"] = 4
+            st.rerun()
 
     # Step 4: 総合評価
     elif st.session_state["monitoring_step"] == 4:
         st.subheader("4️⃣ 総合評価")
 
-        overall_summary = st.text_area(
-            "総合評価サマリー",
-            height=150,
-            placeholder="全体的な進捗状況や変化について記載してください",
-            key="overall_summary_input"
-        )
-        st.session_state["monitoring_data"]["overall_summary"] = overall_summary
-
+        # 項目数で入力欄の数が変わるため、項目数だけはフォームの外で即時反映する
         col1, col2 = st.columns(2)
-
         with col1:
-            st.write("**良かった点**")
-            strength_count = st.number_input("項目数", min_value=1, max_value=10, value=3, key="strength_count")
-            strengths = []
-            for i in range(strength_count):
-                strength = st.text_input(f"良かった点 {i+1}", key=f"strength_{i}")
-                if strength:
-                    strengths.append(strength)
-            st.session_state["monitoring_data"]["strengths"] = strengths
-
+            strength_count = st.number_input("良かった点の項目数", min_value=1, max_value=10, value=3, key="strength_count")
         with col2:
-            st.write("**課題**")
-            challenge_count = st.number_input("項目数", min_value=1, max_value=10, value=3, key="challenge_count")
-            challenges = []
-            for i in range(challenge_count):
-                challenge = st.text_input(f"課題 {i+1}", key=f"challenge_{i}")
-                if challenge:
-                    challenges.append(challenge)
-            st.session_state["monitoring_data"]["challenges"] = challenges
-
-        family_feedback = st.text_area(
-            "家族の意見",
-            height=100,
-            key="family_feedback_input"
-        )
-        st.session_state["monitoring_data"]["family_feedback"] = family_feedback if family_feedback else None
+            challenge_count = st.number_input("課題の項目数", min_value=1, max_value=10, value=3, key="challenge_count")
+
+        with st.form("monitoring_step4_form", border=False):
+            overall_summary = st.text_area(
+                "総合評価サマリー",
+                height=150,
+                placeholder="全体的な進捗状況や変化について記載してください",
+                key="overall_summary_input"
+            )
+            st.session_state["monitoring_data"]["overall_summary"] = overall_summary
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.write("**良かった点**")
+                strengths = []
+                for i in range(strength_count):
+                    strength = st.text_input(f"良かった点 {i+1}", key=f"strength_{i}")
+                    if strength:
+                        strengths.append(strength)
+                st.session_state["monitoring_data"]["strengths"] = strengths
+
+            with col2:
+                st.write("**課題**")
+                challenges = []
+                for i in range(challenge_count):
+                    challenge = st.text_input(f"課題 {i+1}", key=f"challenge_{i}")
+                    if challenge:
+                        challenges.append(challenge)
+                st.session_state["monitoring_data"]["challenges"] = challenges
+
+            family_feedback = st.text_area(
+                "家族の意見",
+                height=100,
+                key="family_feedback_input"
+            )
+            st.session_state["monitoring_data"]["family_feedback"] = family_feedback if family_feedback else None
 
-        # ナビゲーションボタン
-        col_back, col_next = st.columns(2)
-        with col_back:
-            if st.button("⬅️ 戻る"):
-                st.session_state["monitoring_step"] = 3
-                st.rerun()
-        with col_next:
-            if st.button("次へ ➡️", type="primary"):
-                st.session_state["monitoring_step"] = 5
-                st.rerun()
+            # ナビゲーションボタン
+            col_back, col_next = st.columns(2)
+            with col_back:
+                back_clicked = st.form_submit_button("⬅️ 戻る")
+            with col_next:
+                next_clicked = st.form_submit_button("次へ ➡️", type="primary")
+
+        if back_clicked:
+            st.session_state["monitoring_step"] = 3
+            st.rerun()
+        if next_clicked:
+            st.session_state["monitoring_step"] = 5
+            st.rerun()
 
     # Step 5: 計画変更提案
     elif st.session_state["monitoring_step"] == 5:
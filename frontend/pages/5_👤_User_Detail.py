@@ -4,35 +4,75 @@
 """
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
 API_BASE_URL = "http://localhost:8000/api"
+REQUEST_TIMEOUT = 5  # 秒（APIが応答しない場合に画面が固まらないようにする）
+BATCH_REQUEST_TIMEOUT = 15  # 秒（複数利用者の詳細をまとめて取得する場合）
+DETAIL_PREFETCH_COUNT = 5  # 一覧の先頭から詳細を先読みする利用者数
 
 st.set_page_config(page_title="利用者詳細", page_icon="👤", layout="wide")
 
 
-def fetch_users():
-    """利用者一覧を取得"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/users", params={"page": 1, "page_size": 100})
-        response.raise_for_status()
-        data = response.json()
-        return data.get("users", [])
-    except Exception as e:
-        st.error(f"利用者一覧取得エラー: {e}")
-        return []
+@st.cache_resource
+def get_session() -> requests.Session:
+    """APIサーバーとの接続を使い回すためのHTTPセッション（プロセス内で共有）"""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    session.headers.update({"Accept": "application/json"})
+    return session
 
 
-def fetch_user_detail(user_id: str):
-    """利用者詳細情報を取得"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/users/{user_id}/detail")
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        st.error(f"詳細情報取得エラー: {e}")
-        return None
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """独立したAPI呼び出しを並行実行するためのスレッドプール（プロセス内で共有）"""
+    return ThreadPoolExecutor(max_workers=2)
+
+
+# エラー時は例外を送出し、失敗した結果はキャッシュしない
+@st.cache_data(ttl=60, show_spinner=False, max_entries=4)
+def fetch_users():
+    """利用者一覧を取得（60秒キャッシュ）"""
+    response = get_session().get(
+        f"{API_BASE_URL}/users", params={"page": 1, "page_size": 100}, timeout=REQUEST_TIMEOUT
+    )
+    response.raise_for_status()
+    data = response.json()
+    return data.get("users", [])
+
+
+def request_user_detail(user_id: str):
+    """利用者詳細情報をAPIから取得（ワーカースレッドから呼べるよう st.* は使わない）"""
+    response = get_session().get(f"{API_BASE_URL}/users/{user_id}/detail", timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+@st.cache_data(ttl=120, show_spinner=False, max_entries=64)
+def fetch_user_detail(user_id: str, _pending: Optional[Future] = None):
+    """
+    利用者詳細情報を取得（利用者ごとに2分キャッシュ）
+
+    _pending に先行して投入した request_user_detail を渡すと、その結果を待って使う
+    （先頭が _ の引数はキャッシュキーに含まれない）。
+    """
+    if _pending is not None:
+        return _pending.result()
+    return request_user_detail(user_id)
+
+
+def request_user_details_batch(user_ids: tuple):
+    """複数利用者の詳細情報を1回のリクエストで取得（先読み用。ワーカースレッドから呼ぶため st.* は使わない）。戻り値は利用者ID→詳細"""
+    response = get_session().post(
+        f"{API_BASE_URL}/users/detail_batch",
+        json={"user_ids": list(user_ids)},
+        timeout=BATCH_REQUEST_TIMEOUT
+    )
+    response.raise_for_status()
+    return response.json()
 
 
 def display_alerts(alerts: List[Dict[str, str]]):
@@ -352,15 +392,46 @@ def main():
     利用者の詳細情報、現在のサービス利用状況、目標達成進捗、支援履歴を確認できます。
     """)
 
+    with st.sidebar:
+        if st.button("🔄 再読込", help="利用者一覧を再取得します"):
+            fetch_users.clear()
+
+    # URLで利用者が指定されている場合（?user_id=...）は、初回表示時に詳細を一覧と並行して取得する
+    query_user_id = st.query_params.get("user_id")
+    detail_future = None
+    if query_user_id and "detail_user_id" not in st.session_state:
+        detail_future = get_executor().submit(request_user_detail, query_user_id)
+        st.session_state["detail_user_id"] = query_user_id
+
     # 利用者選択
-    users = fetch_users()
+    try:
+        users = fetch_users()
+    except Exception as e:
+        st.error(f"利用者一覧取得エラー: {e}")
+        users = []
 
     if not users:
         st.warning("利用者データがありません。")
         return
 
     user_options = {f"{user['name']} (ID: {user['user_id'][:8]})": user['user_id'] for user in users}
-    selected_user_label = st.selectbox("利用者を選択", options=list(user_options.keys()))
+    user_ids = list(user_options.values())
+    selected_user_label = st.selectbox(
+        "利用者を選択",
+        options=list(user_options.keys()),
+        index=user_ids.index(query_user_id) if query_user_id in user_ids else 0
+    )
+
+    # 一覧先頭の利用者の詳細を1回のリクエストでまとめて先読みする
+    # （セッションごとに1回だけ。完了は待たずに描画を続ける）
+    if "detail_prefetch_future" not in st.session_state:
+        prefetch_ids = tuple(user_ids[:DETAIL_PREFETCH_COUNT])
+        st.session_state["detail_prefetch_ids"] = set(prefetch_ids)
+        st.session_state["detail_prefetch_future"] = get_executor().submit(
+            request_user_details_batch, prefetch_ids
+        )
+    prefetch_ids = st.session_state["detail_prefetch_ids"]
+    prefetch_future = st.session_state["detail_prefetch_future"]
 
     if not selected_user_label:
         return
@@ -368,38 +439,70 @@ def main():
     selected_user_id = user_options[selected_user_label]
 
     if st.button("詳細情報を表示", type="primary"):
-        with st.spinner("データ取得中..."):
-            detail = fetch_user_detail(selected_user_id)
+        st.session_state["detail_user_id"] = selected_user_id
 
-            if not detail:
-                st.error("詳細情報が取得できませんでした")
-                return
+    # 表示した利用者を選択している間は、他の操作で再実行されても詳細を表示し続ける
+    if st.session_state.get("detail_user_id") != selected_user_id:
+        return
 
-            # アラート表示（最上部）
-            st.markdown("### 🚨 アラート")
-            display_alerts(detail.get("alerts", []))
-            st.divider()
+    refresh_clicked = st.button("🔄 強制再取得", help="この利用者の詳細情報をAPIから取り直します")
+    if refresh_clicked:
+        fetch_user_detail.clear(selected_user_id)
+        # 先読みした詳細は古い可能性があるため、以降は個別に取得する
+        prefetch_ids.discard(selected_user_id)
+
+    with st.spinner("データ取得中..."):
+        detail = None
+        if detail_future is not None and selected_user_id == query_user_id:
+            # 並行取得の完了を待ち、結果をキャッシュに入れる
+            try:
+                detail = fetch_user_detail(selected_user_id, _pending=detail_future)
+            except Exception:
+                # 並行取得に失敗した場合は改めて取得する
+                detail = None
+        elif selected_user_id in prefetch_ids:
+            try:
+                detail = prefetch_future.result().get(selected_user_id)
+            except Exception:
+                # 先読みに失敗した場合は個別に取得する
+                detail = None
+
+        if detail is None:
+            try:
+                detail = fetch_user_detail(selected_user_id)
+            except Exception as e:
+                st.error(f"詳細情報取得エラー: {e}")
+                detail = None
+
+    if not detail:
+        st.error("詳細情報が取得できませんでした")
+        return
 
-            # 基本情報
-            display_basic_info(detail.get("basic_info", {}))
-            st.divider()
+    # アラート表示（最上部）
+    st.markdown("### 🚨 アラート")
+    display_alerts(detail.get("alerts", []))
+    st.divider()
 
-            # 2カラムレイアウト
-            col1, col2 = st.columns(2)
+    # 基本情報
+    display_basic_info(detail.get("basic_info", {}))
+    st.divider()
 
-            with col1:
-                # 現在利用中のサービス
-                display_current_services(detail.get("current_services", []))
+    # 2カラムレイアウト
+    col1, col2 = st.columns(2)
 
-                # 目標達成状況
-                display_goal_progress(detail.get("goal_progress", []))
+    with col1:
+        # 現在利用中のサービス
+        display_current_services(detail.get("current_services", []))
 
-            with col2:
-                # 直近のモニタリング
-                display_recent_monitoring(detail.get("recent_monitoring"))
+        # 目標達成状況
+        display_goal_progress(detail.get("goal_progress", []))
+
+    with col2:
+        # 直近のモニタリング
+        display_recent_monitoring(detail.get("recent_monitoring"))
 
-                # 支援タイムライン
-                display_support_timeline(detail.get("support_timeline", []))
+        # 支援タイムライン
+        display_support_timeline(detail.get("support_timeline", []))
 
 
 if __name__ == "__main__":
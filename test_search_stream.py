@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the streaming facility search API (NDJSON framing).
+"""
+import json
+
+import requests
+
+API_ROOT = "http://localhost:8001"
+
+
+def read_frames(response):
+    """Parse newline-delimited JSON frames from a streaming response."""
+    frames = []
+    for line in response.iter_lines():
+        if not line:
+            continue
+        frame = json.loads(line)
+        assert "type" in frame, f"frame without type: {frame}"
+        frames.append(frame)
+    return frames
+
+
+def test_search_stream(query):
+    """Test that /search/stream sends one result frame, then token frames."""
+    print(f"\n=== Test: Search Stream ({query}) ===")
+
+    with requests.post(
+        f"{API_ROOT}/search/stream", json={"query": query}, stream=True, timeout=120
+    ) as response:
+        print(f"Status: {response.status_code}")
+        assert response.status_code == 200, response.text
+        content_type = response.headers.get("content-type", "")
+        assert content_type.startswith("application/x-ndjson"), content_type
+
+        frames = read_frames(response)
+
+    assert frames, "no frames received"
+    types = [frame["type"] for frame in frames]
+
+    if types[-1] == "error":
+        # An error frame ends the stream and carries the reason
+        assert "detail" in frames[-1]
+        assert "error" not in types[:-1]
+        print(f"Stream ended with error: {frames[-1]['detail']}")
+        return
+
+    # The result frame comes first and only once, then the answer tokens
+    assert types[0] == "result", f"first frame is {types[0]}"
+    assert types.count("result") == 1
+    assert set(types[1:]) <= {"token"}, f"unexpected frame types: {set(types[1:])}"
+
+    result = frames[0]
+    assert result["query"] == query
+    assert result["facility_count"] == len(result["facilities"])
+
+    answer = "".join(frame["token"] for frame in frames[1:])
+    assert answer, "no answer tokens"
+
+    print(f"Facilities: {result['facility_count']}件, token frames: {len(frames) - 1}")
+    print(f"Answer: {answer[:100]}...")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Search Stream API Tests")
+    print("=" * 60)
+
+    test_search_stream("小倉北区の生活介護事業所を教えてください")
+
+    print("\n" + "=" * 60)
+    print("Tests completed!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ Test user management API.
 """
 import requests
 import json
-from datetime import date
+from datetime import date, datetime
 
 API_BASE = "http://localhost:8001/api"
 
@@ -113,6 +113,133 @@ def test_search_users():
         print(f"Error: {response.text}")
 
 
+def test_batch_create_users():
+    """Test creating several users in one request, then reading them back."""
+    print("\n=== Test: Batch Create Users ===")
+
+    suffix = datetime.now().strftime("%H%M%S")
+    users_data = [
+        {
+            "name": f"一括太郎{suffix}",
+            "kana": "イッカツタロウ",
+            "birth_date": "1990-04-01",
+            "gender": "男性",
+            "disability_type": "知的障害",
+            "support_level": "区分3",
+        },
+        {
+            "name": f"一括花子{suffix}",
+            "kana": "イッカツハナコ",
+            "birth_date": "1992-08-20",
+            "gender": "女性",
+            "disability_type": "精神障害",
+            "support_level": "区分2",
+        },
+    ]
+
+    response = requests.post(f"{API_BASE}/users/batch", json={"users": users_data})
+    print(f"Status: {response.status_code}")
+    assert response.status_code == 201, response.text
+
+    created = response.json()
+    assert [u["name"] for u in created] == [u["name"] for u in users_data], "order/name mismatch"
+
+    # Round-trip: every written field comes back from GET
+    for sent, user in zip(users_data, created):
+        fetched = requests.get(f"{API_BASE}/users/{user['user_id']}").json()
+        for key in ("name", "kana", "birth_date", "gender", "disability_type", "support_level"):
+            assert fetched[key] == sent[key], f"{key}: {fetched[key]!r} != {sent[key]!r}"
+        print(f"  ✓ {fetched['name']} (ID: {fetched['user_id']})")
+
+    return created
+
+
+def test_batch_update_users(users):
+    """Test that updates (UNWIND + SET u += props) change only the given fields."""
+    print("\n=== Test: Update Users (bulk write path) ===")
+
+    for user in users:
+        response = requests.put(
+            f"{API_BASE}/users/{user['user_id']}",
+            json={"support_level": "区分6", "living_situation": "グループホーム"},
+        )
+        print(f"Status: {response.status_code}")
+        assert response.status_code == 200, response.text
+
+        fetched = requests.get(f"{API_BASE}/users/{user['user_id']}").json()
+        assert fetched["support_level"] == "区分6"
+        assert fetched["living_situation"] == "グループホーム"
+        # Fields not in the update are kept
+        assert fetched["name"] == user["name"]
+        assert fetched["kana"] == user["kana"]
+        print(f"  ✓ {fetched['name']}: {fetched['support_level']}, {fetched['living_situation']}")
+
+
+def test_lookup_user(user):
+    """Test duplicate lookup by name and birth date (hit, excluded, miss)."""
+    print("\n=== Test: Lookup User ===")
+
+    params = {"name": user["name"], "birth_date": user["birth_date"]}
+
+    response = requests.get(f"{API_BASE}/users/lookup", params=params)
+    print(f"Hit status: {response.status_code}")
+    assert response.status_code == 200, response.text
+    assert response.json()["user_id"] == user["user_id"]
+
+    response = requests.get(
+        f"{API_BASE}/users/lookup", params={**params, "exclude_user_id": user["user_id"]}
+    )
+    print(f"Excluded status: {response.status_code}")
+    assert response.status_code == 404, response.text
+
+    response = requests.get(
+        f"{API_BASE}/users/lookup", params={**params, "name": "存在しない利用者"}
+    )
+    print(f"Miss status: {response.status_code}")
+    assert response.status_code == 404, response.text
+
+
+def test_list_users_include_total():
+    """Test that include_total controls whether total is counted."""
+    print("\n=== Test: List Users include_total ===")
+
+    data = requests.get(f"{API_BASE}/users").json()
+    assert isinstance(data["total"], int), "total should be counted by default"
+    print(f"  default: total={data['total']}")
+
+    data = requests.get(f"{API_BASE}/users", params={"include_total": "true"}).json()
+    assert isinstance(data["total"], int)
+    print(f"  include_total=true: total={data['total']}")
+
+    data = requests.get(f"{API_BASE}/users", params={"include_total": "false"}).json()
+    assert data["total"] is None, f"total should be None, got {data['total']!r}"
+    print("  include_total=false: total=None")
+
+
+def test_detail_batch(users):
+    """Test fetching several user details at once and the 50-ID limit."""
+    print("\n=== Test: User Detail Batch ===")
+
+    user_ids = [u["user_id"] for u in users]
+    response = requests.post(
+        f"{API_BASE}/users/detail_batch", json={"user_ids": user_ids + ["missing-user"]}
+    )
+    print(f"Status: {response.status_code}")
+    assert response.status_code == 200, response.text
+
+    details = response.json()
+    assert set(details) == set(user_ids), "unknown IDs should be omitted"
+    for user_id, detail in details.items():
+        assert detail["basic_info"]["user_id"] == user_id
+        print(f"  ✓ {detail['basic_info']['name']}: alerts={len(detail['alerts'])}")
+
+    response = requests.post(
+        f"{API_BASE}/users/detail_batch", json={"user_ids": [f"user-{i}" for i in range(51)]}
+    )
+    print(f"51 IDs status: {response.status_code}")
+    assert response.status_code == 422, response.text
+
+
 def test_delete_user(user_id):
     """Test deleting a user."""
     print(f"\n=== Test: Delete User {user_id} ===")
@@ -152,6 +279,15 @@ def main():
         # Search users
         test_search_users()
 
+    # include_total on / off
+    test_list_users_include_total()
+
+    # Batch create, bulk update path, lookup and detail batch
+    batch_users = test_batch_create_users()
+    test_batch_update_users(batch_users)
+    test_lookup_user(batch_users[0])
+    test_detail_batch(batch_users)
+
         # Delete user
         # test_delete_user(user_id)  # Commented out to keep test data
 